@@ -2,24 +2,27 @@ import datetime
 import os
 import random
 import re
-import subprocess
+import sys
 import webbrowser
 from importlib.util import find_spec
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Optional
 
-from ..core.config import MODE
-from ..security.permissions import load_permissions, save_permissions, is_blocked_exe
+from ..core.config import MODE, SETTINGS
+from ..core.dialog import Flow, Prompt, run_blocking
+from ..files import FILE_INDEXES
+from ..notes import get_notes_store
+from ..security.permissions import allowed_apps, is_blocked_exe, is_path_allowed, load_permissions, save_permissions
+from ..voice import tts
+from .app_resolver import AppResolver
+from .processes import PROCESSES, kill_by_name
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 NOTES_FILE = BASE_DIR / "notes.txt"
+NOTE_SEARCH_TOP_K = 10
 
-_PYTTSX3_AVAILABLE = find_spec("pyttsx3") is not None
 _SPEECH_RECOGNITION_AVAILABLE = find_spec("speech_recognition") is not None
 
-if _PYTTSX3_AVAILABLE:
-    import pyttsx3
-
 if _SPEECH_RECOGNITION_AVAILABLE:
     import speech_recognition as sr
 
@@ -32,6 +35,10 @@ APP_ALIASES = {
 }
 
 
+# Built once at import; resolving a command costs a few hundred dict lookups.
+APP_RESOLVER = AppResolver(APP_ALIASES)
+
+
 KNOWN_APPS = {
     "chrome": r"C:\Program Files\Google\Chrome\Application\chrome.exe",
     "notepad": "notepad.exe",
@@ -40,7 +47,9 @@ KNOWN_APPS = {
     "explorer": "explorer.exe",
 }
 
-OPENED_PATH_PROCESSES: Dict[str, subprocess.Popen] = {}
+# Minimum trigram similarity for a fuzzy name match to be opened without an exact hit.
+_FUZZY_PATH_MIN_SCORE = 0.5
+
 LAST_OPENED_PATH: Optional[Path] = None
 
 
@@ -55,6 +64,16 @@ def _extract_path_query(text: str) -> str:
     return cleaned
 
 
+def _allowed_roots() -> list[Path]:
+    perms = load_permissions()
+    return [Path(p) for p in perms.get("allowed_folders", [])]
+
+
+def start_file_index_service() -> None:
+    """Keep allowed-folder file indexes fresh in the background."""
+    FILE_INDEXES.start(_allowed_roots, SETTINGS.file_index_refresh_seconds)
+
+
 def _resolve_target_path(query: str) -> Optional[Path]:
     if not query:
         return None
@@ -63,91 +82,101 @@ def _resolve_target_path(query: str) -> Optional[Path]:
     if expanded.exists():
         return expanded.resolve()
 
-    perms = load_permissions()
-    allowed_roots = [Path(p) for p in perms.get("allowed_folders", [])]
-    for root in allowed_roots:
-        if not root.exists() or not root.is_dir():
-            continue
-        matches = list(root.glob(query))
-        if not matches:
-            matches = list(root.rglob(query))
-        if matches:
-            return matches[0].resolve()
+    roots = [root for root in _allowed_roots() if root.is_dir()]
+    for root in roots:
+        for match in FILE_INDEXES.get(root).find(query):
+            if match.exists():
+                return match.resolve()
+
+    for match, score in find_path_candidates(query, roots=roots):
+        if score >= _FUZZY_PATH_MIN_SCORE and match.exists():
+            return match.resolve()
 
     return None
 
 
-def _is_within_allowed_roots(target_path: Path, allowed_roots: list[Path]) -> bool:
-    resolved_target = target_path.resolve()
-    for root in allowed_roots:
-        try:
-            resolved_target.relative_to(root.resolve())
-            return True
-        except ValueError:
-            continue
-    return False
+def find_path_candidates(query: str, k: int = 5, roots: Optional[list[Path]] = None) -> list[tuple[Path, float]]:
+    """Return the top ``k`` fuzzy ``(path, score)`` matches inside allowed folders."""
+    if roots is None:
+        roots = [root for root in _allowed_roots() if root.is_dir()]
+    return FILE_INDEXES.fuzzy_find(roots, query, k=k)
 
 
-def _ensure_folder_permission(target_path: Path) -> bool:
-    perms = load_permissions()
-    allowed_folders = [Path(p) for p in perms.get("allowed_folders", [])]
-    if _is_within_allowed_roots(target_path, allowed_folders):
+def _ask(question: str) -> str:
+    # A question pre-empts a reply still being spoken; the answer depends on hearing it.
+    speak(question, tts.PRIORITY_PROMPT)
+    return listen_text()
+
+
+def _say(text: str) -> str:
+    speak(text)
+    return text
+
+
+def folder_permission_flow(target_path: Path) -> Flow:
+    """Ask once for access to ``target_path``'s folder; returns whether it is allowed."""
+    if is_path_allowed(target_path):
         return True
 
     folder_to_allow = target_path if target_path.is_dir() else target_path.parent
-    speak(f"Allow access to folder {folder_to_allow}? Say yes or no.")
-    if "yes" not in listen_text().lower():
+    answer = yield Prompt(f"Allow access to folder {folder_to_allow}? Say yes or no.")
+    if "yes" not in answer.lower():
         speak("Access denied.")
         return False
 
+    perms = load_permissions()
     perms.setdefault("allowed_folders", []).append(str(folder_to_allow))
     save_permissions(perms)
+    FILE_INDEXES.prune(_allowed_roots())
+    FILE_INDEXES.refresh_in_background([folder_to_allow])
     speak("Folder permission saved.")
     return True
 
 
-def open_path_action(text: str):
+def _ensure_folder_permission(target_path: Path) -> bool:
+    return run_blocking(folder_permission_flow(target_path), _ask)
+
+
+def open_path_flow(text: str) -> Flow:
     global LAST_OPENED_PATH
 
     query = _extract_path_query(text)
     if not query:
-        speak("Which file or folder should I open?")
-        query = listen_text().strip()
+        query = (yield Prompt("Which file or folder should I open?")).strip()
 
     target_path = _resolve_target_path(query)
     if target_path is None:
-        speak("I could not find that file or folder. Try a full path or allow that folder first.")
-        return
+        return _say("I could not find that file or folder. Try a full path or allow that folder first.")
 
-    if not _ensure_folder_permission(target_path):
-        return
+    if not (yield from folder_permission_flow(target_path)):
+        return "Access denied."
 
     LAST_OPENED_PATH = target_path
 
     if MODE == "dev":
         print(f"[DEV] Would open path: {target_path}")
-        speak(f"Opening {target_path.name}.")
-        return
+        return _say(f"Opening {target_path.name}.")
 
     if target_path.is_dir():
         if os.name == "nt":
-            subprocess.Popen(["explorer", str(target_path)])
+            PROCESSES.launch(["explorer", str(target_path)])
         else:
-            subprocess.Popen(["xdg-open", str(target_path)])
-        speak(f"Opening folder {target_path.name}.")
-        return
+            PROCESSES.launch(["xdg-open", str(target_path)])
+        return _say(f"Opening folder {target_path.name}.")
 
     if os.name == "nt" and target_path.suffix.lower() in {".txt", ".log", ".md", ".json", ".csv"}:
-        proc = subprocess.Popen(["notepad.exe", str(target_path)])
-        OPENED_PATH_PROCESSES[str(target_path)] = proc
-        speak(f"Opening file {target_path.name}.")
-        return
+        PROCESSES.launch(["notepad.exe", str(target_path)], key=str(target_path))
+        return _say(f"Opening file {target_path.name}.")
 
     if os.name == "nt":
         os.startfile(str(target_path))
     else:
-        subprocess.Popen(["xdg-open", str(target_path)])
-    speak(f"Opening file {target_path.name}.")
+        PROCESSES.launch(["xdg-open", str(target_path)])
+    return _say(f"Opening file {target_path.name}.")
+
+
+def open_path_action(text: str):
+    return run_blocking(open_path_flow(text), _ask)
 
 
 def close_path_action(text: str):
@@ -158,12 +187,11 @@ def close_path_action(text: str):
         speak("I could not determine which file or folder to close.")
         return
 
-    proc = OPENED_PATH_PROCESSES.get(str(target_path))
-    if proc is not None and proc.poll() is None:
+    if PROCESSES.get(str(target_path)) is not None:
         if MODE == "dev":
             print(f"[DEV] Would close process for: {target_path}")
         else:
-            proc.terminate()
+            PROCESSES.terminate(str(target_path))
         speak(f"Closed file {target_path.name}.")
         return
 
@@ -171,27 +199,19 @@ def close_path_action(text: str):
         if MODE == "dev":
             print("[DEV] Would close explorer windows.")
         else:
-            os.system("taskkill /f /im explorer.exe")
+            kill_by_name("explorer.exe")
         speak("Closed file explorer windows.")
         return
 
     speak("I can only close files opened by me, or File Explorer folders.")
 
-def speak(text: str):
-    if MODE == "local":
-        if _PYTTSX3_AVAILABLE:
-            try:
-                engine = pyttsx3.init()
-                engine.say(text)
-                engine.runAndWait()
-                return
-            except Exception:
-                pass
-        print(text)
-    else:
-        print(text)
+def speak(text: str, priority: int = tts.PRIORITY_NORMAL):
+    """Queue ``text`` on the background speech worker; returns without waiting."""
+    tts.speak(text, priority)
 
 def listen_text():
+    # Let queued speech finish so the prompt is heard before the microphone opens.
+    tts.wait_until_idle()
     if MODE == "local":
         if _SPEECH_RECOGNITION_AVAILABLE:
             try:
@@ -205,48 +225,46 @@ def listen_text():
         return input("You: ")
     return input("You: ")
 
+def resolve_app_with_score(text: str) -> tuple[Optional[str], float]:
+    """Return ``(app, confidence)`` for the app named in ``text``, tolerating small typos; ``(None, 0.0)`` if none."""
+    match = APP_RESOLVER.match(text)
+    return (match.app, match.score) if match else (None, 0.0)
+
 def resolve_app(text: str):
-    t = text.lower()
-    for app, aliases in APP_ALIASES.items():
-        for a in aliases:
-            if a in t:
-                return app
-    return None
+    return resolve_app_with_score(text)[0]
 
-def open_app_action(text: str):
+def open_app_flow(text: str) -> Flow:
     app = resolve_app(text)
     if not app:
-        speak("Which app should I open?")
-        return
+        return _say("Which app should I open?")
 
     exe = os.path.expandvars(KNOWN_APPS.get(app))
     exe_name = os.path.basename(exe)
     if exe and exe_name and is_blocked_exe(exe_name):
-        speak("This app is blocked for safety.")
-        return
-
-    perms = load_permissions()
-    allowed = perms.get("allowed_apps", {})
+        return _say("This app is blocked for safety.")
 
-    if app not in allowed:
-        speak(f"Do you allow me to open {app} in future? Say yes or no.")
-        if "yes" in listen_text().lower():
-            allowed[app] = exe
-            perms["allowed_apps"] = allowed
+    if app not in allowed_apps():
+        answer = yield Prompt(f"Do you allow me to open {app} in future? Say yes or no.")
+        if "yes" in answer.lower():
+            perms = load_permissions()
+            perms["allowed_apps"][app] = exe
             save_permissions(perms)
             speak("Permission saved.")
         else:
-            speak("Okay, not opening it.")
-            return
+            return _say("Okay, not opening it.")
 
     if MODE == "dev":
         print(f"[DEV] Would open: {exe}")
+        return f"Opening {app}."
+    if exe.startswith("http"):
+        webbrowser.open(exe)
     else:
-        if exe.startswith("http"):
-            webbrowser.open(exe)
-        else:
-            subprocess.Popen(exe)
-        speak(f"Opening {app}.")
+        PROCESSES.launch(exe, key=f"app:{app}")
+    return _say(f"Opening {app}.")
+
+
+def open_app_action(text: str):
+    return run_blocking(open_app_flow(text), _ask)
 
 def close_app_action(text: str):
     app = resolve_app(text)
@@ -254,8 +272,7 @@ def close_app_action(text: str):
         speak("Which app should I close?")
         return
 
-    perms = load_permissions()
-    allowed = perms.get("allowed_apps", {})
+    allowed = allowed_apps()
     if app not in allowed:
         speak("This app is not approved to close.")
         return
@@ -263,21 +280,21 @@ def close_app_action(text: str):
     exe = os.path.basename(allowed[app])
     if MODE == "dev":
         print(f"[DEV] Would close: {exe}")
-    else:
-        os.system(f"taskkill /f /im {exe}")
-        speak(f"Closed {app}.")
+        return
+    # An instance we launched goes first; then any other process running the same executable.
+    closed = PROCESSES.terminate(f"app:{app}")
+    closed = kill_by_name(exe) > 0 or closed
+    speak(f"Closed {app}." if closed else f"{app} is not running.")
 
-def search_action(text: str):
+def search_flow(text: str) -> Flow:
     q = text.lower()
     for phrase in ["search", "find", "look for", "google", "on youtube", "youtube"]:
         q = re.sub(rf"\b{re.escape(phrase)}\b", "", q)
     q = re.sub(r"\s+", " ", q).strip()
     if not q:
-        speak("What should I search for?")
-        q = listen_text().strip()
+        q = (yield Prompt("What should I search for?")).strip()
         if not q:
-            speak("Cancelled.")
-            return
+            return _say("Cancelled.")
 
     if re.search(r"\byoutube\b", text.lower()):
         url = f"https://www.youtube.com/results?search_query={q}"
@@ -288,6 +305,11 @@ def search_action(text: str):
         print(f"[DEV] Would open: {url}")
     else:
         webbrowser.open(url)
+    return f"Searching for {q}."
+
+
+def search_action(text: str):
+    return run_blocking(search_flow(text), _ask)
 
 def time_action(text: str):
     now = datetime.datetime.now()
@@ -315,47 +337,49 @@ def joke_action(text: str):
     _last_joke = joke
     speak(joke)
 
-def write_file_action():
-    speak("What should I write?")
-    content = listen_text()
+def write_file_flow() -> Flow:
+    content = yield Prompt("What should I write?")
     if not content:
-        speak("Nothing to save.")
-        return
+        return _say("Nothing to save.")
 
-    speak("Append to notes or overwrite?")
-    mode = listen_text().lower()
+    mode = (yield Prompt("Append to notes or overwrite?")).lower()
     write_mode = "a" if "append" in mode else "w"
 
     if write_mode == "w":
-        speak("This will overwrite existing notes. Say yes to continue.")
-        if "yes" not in listen_text().lower():
-            speak("Cancelled.")
-            return
+        answer = yield Prompt("This will overwrite existing notes. Say yes to continue.")
+        if "yes" not in answer.lower():
+            return _say("Cancelled.")
+
+    store = get_notes_store(NOTES_FILE)
+    if write_mode == "w":
+        store.replace(content)
+    else:
+        store.append(content)
+    return _say("Saved.")
 
-    with open(NOTES_FILE, write_mode, encoding="utf-8") as f:
-        f.write(content + "\n")
-    speak("Saved.")
+def write_file_action():
+    return run_blocking(write_file_flow(), _ask)
 
-def read_file_action(text: str):
+def read_file_flow(text: str) -> Flow:
     if not os.path.exists(NOTES_FILE):
-        speak("No notes found.")
-        return
-
-    with open(NOTES_FILE, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+        return _say("No notes found.")
 
+    store = get_notes_store(NOTES_FILE)
     if "last" in text.lower():
-        print("".join(lines[-3:]))
-        speak("Here are the last notes.")
-    elif "search" in text.lower():
-        speak("What keyword should I search for?")
-        kw = listen_text().lower()
-        matches = [l for l in lines if kw in l.lower()]
-        print("".join(matches) if matches else "No matches.")
-        speak("Search complete.")
-    else:
-        print("".join(lines))
-        speak("Here are your notes.")
+        print("".join(f"{line}\n" for line in store.tail(3)))
+        return _say("Here are the last notes.")
+    if "search" in text.lower():
+        kw = (yield Prompt("What keyword should I search for?")).lower()
+        hits = store.ranked_search(kw, k=NOTE_SEARCH_TOP_K)
+        print("".join(f"{hit.snippet}\n" for hit in hits) if hits else "No matches.")
+        return _say("Search complete.")
+    for chunk in store.iter_text():
+        sys.stdout.write(chunk)
+    print()
+    return _say("Here are your notes.")
+
+def read_file_action(text: str):
+    return run_blocking(read_file_flow(text), _ask)
 
 def reply_action(_text: str):
     responses = [
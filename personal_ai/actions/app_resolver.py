@@ -0,0 +1,167 @@
+"""Typo-tolerant lookup of app names in spoken commands.
+
+Alias words are indexed once, SymSpell style: every string reachable from
+a word by deleting up to two characters maps back to that word. A word
+from the command is matched by generating its own deletions and looking
+them up. Candidates found that way are checked with a real edit distance
+(optimal string alignment, so a swapped pair of letters counts once). A
+multi-word alias ("google chrome") matches when each of its words matches
+a consecutive word of the command. Every alias is also indexed with its
+spaces removed when that is short, so "vs cod" finds "vscode". A lookup costs a few hundred
+dictionary probes however many aliases there are.
+
+Short words must match exactly: "note" or "code" one edit away from an
+everyday word would open apps by accident. Words of five to eight
+characters may be one edit off ("crome"), longer ones two.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_MAX_DISTANCE = 2
+# Closest index words tried per command word when matching multi-word aliases.
+_CANDIDATES_PER_WORD = 3
+# Multi-word aliases are also indexed without spaces up to this length ("vs code" -> "vscode").
+_MAX_JOINED_LENGTH = 10
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+def allowed_distance(length: int) -> int:
+    """Edits tolerated for a term of ``length`` characters."""
+    if length < 5:
+        return 0
+    if length < 9:
+        return 1
+    return _MAX_DISTANCE
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    found = {term}
+    frontier = {term}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1 :] for word in frontier for i in range(len(word))} - found
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it is known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+@dataclass(frozen=True)
+class AppMatch:
+    app: str
+    alias: str
+    # 1.0 for an exact alias, less the more edits were needed.
+    score: float
+    distance: int = 0
+
+
+class AppResolver:
+    def __init__(self, aliases: Mapping[str, Iterable[str]]) -> None:
+        self._words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._deletes: Dict[str, List[int]] = {}
+        # Word ids of an alias -> (alias, app).
+        self._aliases: Dict[Tuple[int, ...], Tuple[str, str]] = {}
+        self._max_words = 1
+        for app, names in aliases.items():
+            for name in [app, *names]:
+                alias = _normalize(name)
+                joined = alias.replace(" ", "")
+                for variant in (alias, joined) if len(joined) <= _MAX_JOINED_LENGTH else (alias,):
+                    if variant:
+                        key = tuple(self._word_id(word) for word in variant.split())
+                        self._aliases.setdefault(key, (variant, app))
+                        self._max_words = max(self._max_words, len(key))
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self._words)
+            self._words.append(word)
+            for deleted in _deletes(word, allowed_distance(len(word))):
+                self._deletes.setdefault(deleted, []).append(word_id)
+        return word_id
+
+    def _candidates(self, word: str) -> List[Tuple[int, int]]:
+        """Closest index words to ``word`` as ``(word_id, distance)``, nearest first."""
+        exact = self._word_ids.get(word)
+        if exact is not None:
+            return [(exact, 0)]
+        limit = allowed_distance(len(word))
+        if not limit:
+            return []
+        found: Dict[int, int] = {}
+        probed: Set[str] = set()
+        # Every word within ``level`` edits shares a deletion of at most ``level`` characters,
+        # so a close match found at a lower level ends the search early.
+        for level in range(1, limit + 1):
+            for deleted in _deletes(word, level) - probed:
+                probed.add(deleted)
+                for word_id in self._deletes.get(deleted, ()):
+                    if word_id in found:
+                        continue
+                    candidate = self._words[word_id]
+                    word_limit = min(limit, allowed_distance(len(candidate)))
+                    distance = edit_distance(word, candidate, word_limit)
+                    found[word_id] = distance if distance <= word_limit else limit + 1
+            ranked = sorted((distance, word_id) for word_id, distance in found.items() if distance <= level)
+            if ranked:
+                return [(word_id, distance) for distance, word_id in ranked[:_CANDIDATES_PER_WORD]]
+        return []
+
+    def _window_matches(
+        self, words: List[str], cache: Dict[str, List[Tuple[int, int]]]
+    ) -> Iterable[Tuple[str, str, int, int]]:
+        """``(alias, app, distance, length)`` for each alias matching all of ``words``."""
+        joined = "".join(words)
+        forms = [words, [joined]] if len(words) > 1 and len(joined) <= _MAX_JOINED_LENGTH + _MAX_DISTANCE else [words]
+        for form in forms:
+            for word in form:
+                if word not in cache:
+                    cache[word] = self._candidates(word)
+            for combo in product(*(cache[word] for word in form)):
+                hit = self._aliases.get(tuple(word_id for word_id, _distance in combo))
+                if hit is not None:
+                    yield hit[0], hit[1], sum(distance for _word_id, distance in combo), len(" ".join(form))
+
+    def match(self, text: str) -> Optional[AppMatch]:
+        """Best app mentioned in ``text``: highest score, then the longest alias, then the earliest."""
+        words = _normalize(text).split()
+        cache: Dict[str, List[Tuple[int, int]]] = {}
+        best: Optional[Tuple[float, int, int, AppMatch]] = None
+        for start in range(len(words)):
+            for count in range(1, min(self._max_words, len(words) - start) + 1):
+                for alias, app, distance, length in self._window_matches(words[start : start + count], cache):
+                    score = 1.0 - distance / max(len(alias), length)
+                    candidate = (score, len(alias), -start, AppMatch(app, alias, round(score, 3), distance))
+                    if best is None or candidate[:3] > best[:3]:
+                        best = candidate
+        return best[3] if best is not None else None
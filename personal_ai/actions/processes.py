@@ -0,0 +1,229 @@
+"""Tracking and closing the processes the assistant works with.
+
+:class:`ProcessRegistry` holds the children started by open actions, keyed
+by what was opened (an app name, a file path). A daemon reaper thread polls
+them every few seconds, collects exited children so none are left as
+zombies, and forgets them. At most ``max_entries`` are tracked; past that
+the oldest entry is dropped from tracking, but its process is left running.
+
+:func:`find_pids` finds running processes by executable name directly. It
+reads ``/proc`` on Linux and uses a Toolhelp snapshot on Windows, with
+``psutil`` as a fallback elsewhere when it is installed. :func:`kill_pid`
+uses ``os.kill`` or ``TerminateProcess``. Closing an app therefore never
+starts a shell or a ``taskkill`` process.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+_PSUTIL_AVAILABLE = find_spec("psutil") is not None
+_PROC = Path("/proc")
+
+# Anonymous entries (e.g. ``xdg-open`` helpers) are tracked only to be reaped.
+_ANONYMOUS = "\0anonymous"
+
+
+class ProcessRegistry:
+    def __init__(self, max_entries: int = 256, reap_interval: float = 2.0) -> None:
+        self.max_entries = max(1, max_entries)
+        self.reap_interval = reap_interval
+        self._entries: "OrderedDict[str, subprocess.Popen]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._anonymous = 0
+
+    def launch(self, args: Sequence[str] | str, key: Optional[str] = None) -> subprocess.Popen:
+        """Start ``args`` without a shell and track it under ``key``."""
+        proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.track(proc, key)
+        return proc
+
+    def track(self, proc: subprocess.Popen, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._anonymous += 1
+                key = f"{_ANONYMOUS}{self._anonymous}"
+            self._entries.pop(key, None)
+            self._entries[key] = proc
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._reap_forever, name="process-reaper", daemon=True)
+                self._thread.start()
+
+    def get(self, key: str) -> Optional[subprocess.Popen]:
+        """The tracked process for ``key`` if it is still running."""
+        with self._lock:
+            proc = self._entries.get(key)
+            if proc is not None and proc.poll() is not None:
+                del self._entries[key]
+                proc = None
+        return proc
+
+    def terminate(self, key: str) -> bool:
+        """Terminate the running process tracked under ``key``; ``False`` if there is none."""
+        proc = self.get(key)
+        if proc is None:
+            return False
+        proc.terminate()
+        with self._lock:
+            if self._entries.get(key) is proc:
+                del self._entries[key]
+        # Let the reaper collect it without waiting for the next interval.
+        self.track(proc)
+        self._wake.set()
+        return True
+
+    def reap(self) -> int:
+        """Forget (and collect) every exited child; returns how many there were."""
+        with self._lock:
+            exited = [key for key, proc in self._entries.items() if proc.poll() is not None]
+            for key in exited:
+                del self._entries[key]
+        return len(exited)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _reap_forever(self) -> None:
+        while True:
+            self._wake.wait(self.reap_interval)
+            self._wake.clear()
+            self.reap()
+            with self._lock:
+                if not self._entries:
+                    # Restarted by the next track().
+                    self._thread = None
+                    return
+
+
+def _image_name(name: str) -> str:
+    name = os.path.basename(name).lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+def _proc_names(pid_dir: Path) -> List[str]:
+    names = []
+    try:
+        names.append((pid_dir / "comm").read_text(encoding="utf-8", errors="replace").strip())
+    except OSError:
+        return []
+    try:
+        argv0 = (pid_dir / "cmdline").read_bytes().split(b"\0", 1)[0]
+        if argv0:
+            names.append(argv0.decode("utf-8", errors="replace"))
+    except OSError:
+        pass
+    return names
+
+
+def _find_pids_proc(image: str) -> List[int]:
+    pids = []
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        names = [_image_name(name) for name in _proc_names(entry)]
+        # comm is cut to 15 characters, so a long name is matched by its prefix there.
+        if image in names[1:] or (names and (names[0] == image or (len(names[0]) == 15 and image.startswith(names[0])))):
+            pids.append(int(entry.name))
+    return pids
+
+
+def _find_pids_toolhelp(image: str) -> List[int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_void_p),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", wintypes.WCHAR * 260),
+        ]
+
+    TH32CS_SNAPPROCESS = 0x2
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot in (None, wintypes.HANDLE(-1).value):
+        return []
+    pids = []
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while ok:
+            if _image_name(entry.szExeFile) == image:
+                pids.append(int(entry.th32ProcessID))
+            ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return pids
+
+
+def _find_pids_psutil(image: str) -> List[int]:
+    import psutil
+
+    return [proc.pid for proc in psutil.process_iter(["name"]) if _image_name(proc.info.get("name") or "") == image]
+
+
+def find_pids(name: str) -> List[int]:
+    """PIDs of running processes whose executable is ``name`` (case-insensitive, ``.exe`` optional)."""
+    image = _image_name(name)
+    if not image:
+        return []
+    if sys.platform == "win32":
+        pids = _find_pids_toolhelp(image)
+    elif _PROC.is_dir():
+        pids = _find_pids_proc(image)
+    elif _PSUTIL_AVAILABLE:
+        pids = _find_pids_psutil(image)
+    else:
+        pids = []
+    return [pid for pid in pids if pid != os.getpid()]
+
+
+def kill_pid(pid: int) -> bool:
+    """Terminate ``pid`` without spawning anything; ``False`` if it is gone or not ours to kill."""
+    if sys.platform == "win32":
+        import ctypes
+
+        PROCESS_TERMINATE = 0x0001
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(PROCESS_TERMINATE, False, pid)
+        if not handle:
+            return False
+        try:
+            return bool(kernel32.TerminateProcess(handle, 1))
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+def kill_by_name(name: str) -> int:
+    """Terminate every process running ``name``; returns how many were signalled."""
+    return sum(kill_pid(pid) for pid in find_pids(name))
+
+
+PROCESSES = ProcessRegistry()
@@ -1,12 +1,13 @@
 """Optional FastAPI app for future web UI integration."""
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 
-from personal_ai.core.assistant import MODE, handle_input, model
+from personal_ai.core.assistant import MODE, SESSIONS, handle_chat_input, handle_input, model
 from personal_ai.core.config import SETTINGS
+from personal_ai.core.sessions import is_valid_session_id, new_session_id
 from personal_ai.core.logging_config import get_logger
 from personal_ai.reminders import list_reminders
 
@@ -29,12 +30,43 @@ class AskRequest(BaseModel):
     """Request payload for assistant text interactions."""
 
     text: str = Field(..., min_length=1, description="User message to process")
+    continuation: Optional[str] = Field(
+        None, description="Token from a previous reply that asked a question; the text answers it"
+    )
 
 
 @app.post("/ask")
 def ask(payload: AskRequest) -> Dict[str, Any]:
-    """Process user text through the shared assistant backend."""
-    return handle_input(payload.text)
+    """Process user text through the shared assistant backend.
+
+    A reply that asks a question includes a ``continuation`` token; send the
+    answer with it to resume that action.
+    """
+    return handle_input(payload.text, continuation=payload.continuation)
+
+
+class ChatRequest(BaseModel):
+    """Request payload for chat turns; history is kept server-side per session."""
+
+    text: str = Field(..., min_length=1, description="New user message")
+    session_id: Optional[str] = Field(None, description="Session from a previous reply; omit to start one")
+    continuation: Optional[str] = Field(None, description="Token from a reply that asked a question")
+
+
+@app.post("/chat")
+def chat(payload: ChatRequest) -> Dict[str, Any]:
+    """Chat with server-side history; the response carries the ``session_id`` to send next time."""
+    session_id = payload.session_id or new_session_id()
+    if not is_valid_session_id(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session_id")
+    return handle_chat_input(payload.text, continuation=payload.continuation, session_id=session_id)
+
+
+@app.delete("/chat/{session_id}")
+def end_chat(session_id: str) -> Dict[str, Any]:
+    """Forget a chat session's history."""
+    SESSIONS.clear(session_id)
+    return {"session_id": session_id, "cleared": True}
 
 
 @app.get("/status")
@@ -4,7 +4,7 @@ import os
 import random
 from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 joblib = None
 np = None
@@ -14,6 +14,10 @@ if find_spec("numpy") is not None:
     import numpy as np  # type: ignore[assignment]
 
 from .config import MODE, CONF_THRESHOLD, AUTO_LEARN, AUTO_LEARN_MIN_CONF, SETTINGS
+from .cancellation import CancelToken
+from .dialog import DialogManager, Flow, Prompt, run_blocking
+from .executor import CommandExecutor, PlannedCommand, execution_levels
+from .sessions import build_session_store
 from .logging_config import get_logger
 from .profile import load_profile, save_profile
 from ..llm import OpenAICompatibleProvider
@@ -22,33 +26,42 @@ from ..parser import split_commands
 from ..entities import extract_entities
 from ..actions.app_actions import resolve_app
 from ..actions.app_actions import (
-    open_app_action,
+    open_app_flow,
     close_app_action,
-    open_path_action,
+    open_path_flow,
     close_path_action,
-    search_action,
+    search_flow,
     time_action,
     joke_action,
-    write_file_action,
-    read_file_action,
+    write_file_flow,
+    read_file_flow,
     speak,
     listen_text,
+    start_file_index_service,
 )
 from ..learning.collector import log_sample
+from ..learning.registry import current_model_path
 from ..reminders import schedule_reminder, start_reminder_service
+from ..voice.tts import PRIORITY_PROMPT, interrupt as interrupt_speech, prerender
 
 
 print(f"🔧 Running in {MODE.upper()} mode")
 
 BASE_DIR = Path(__file__).resolve().parents[1]
-MODEL_PATH = BASE_DIR / "models" / "intent_model.pkl"
-if MODEL_PATH.exists() and joblib is not None:
+LEGACY_MODEL_PATH = BASE_DIR / "models" / "intent_model.pkl"
+# The registry's active version wins; a plain intent_model.pkl is still honoured.
+MODEL_PATH = current_model_path(LEGACY_MODEL_PATH)
+model = None
+if SETTINGS.intent_backend == "online" and find_spec("sklearn") is not None:
+    from ..learning.online import start_online_learning
+
+    model = start_online_learning()
+elif MODEL_PATH is not None and joblib is not None:
     model = joblib.load(MODEL_PATH)
 else:
-    model = None
     if joblib is None:
         print("⚠️ joblib is not installed. Install requirements to enable the model.")
-    elif not MODEL_PATH.exists():
+    elif MODEL_PATH is None:
         print("⚠️ Model not found. Train it with: python -m personal_ai.ml.train")
 
 RULE_KEYWORDS = {
@@ -65,8 +78,16 @@ RULE_KEYWORDS = {
 }
 
 start_reminder_service()
+start_file_index_service()
 logger = get_logger(__name__)
 _NO_KEY_TIP_SHOWN = False
+# Interactive flows waiting for the user's next message, by continuation token.
+DIALOGS = DialogManager(SETTINGS.dialog_ttl_seconds)
+_cli_continuation: str | None = None
+# Chat history for clients that send a session id instead of the whole conversation.
+SESSIONS = build_session_store()
+# Runs independent commands of a chained request side by side.
+EXECUTOR = CommandExecutor(SETTINGS.command_workers)
 
 
 def _api_key_help_text() -> str:
@@ -80,14 +101,28 @@ def _api_key_help_text() -> str:
     )
 
 
+LOCAL_CHAT_REPLIES = (
+    "Hi! How can I help you?",
+    "Hello there! What would you like to do?",
+    "Hey 🙂 What can I do for you?",
+)
+
+# Constant replies rendered to the phrase audio cache at startup in local mode.
+FIXED_SPOKEN_PHRASES = (
+    "hello",
+    "Exiting.",
+    "Saved.",
+    "Cancelled.",
+    "Permission saved.",
+    "Thanks! I’ll learn from this. Please say the command again.",
+    *LOCAL_CHAT_REPLIES,
+    _api_key_help_text(),
+)
+prerender(FIXED_SPOKEN_PHRASES)
+
+
 def _local_chat_reply() -> str:
-    return random.choice(
-        [
-            "Hi! How can I help you?",
-            "Hello there! What would you like to do?",
-            "Hey 🙂 What can I do for you?",
-        ]
-    )
+    return random.choice(LOCAL_CHAT_REPLIES)
 
 
 def _llm_chat_reply(text: str) -> str | None:
@@ -161,28 +196,78 @@ def get_chat_provider() -> LLMProvider | None:
         return None
 
 
-def _as_chat_messages(history: list[dict[str, str]], user_text: str) -> list[dict[str, str]]:
+def _as_chat_messages(
+    history: list[dict[str, str]], user_text: str, earlier: Sequence[str] = ()
+) -> list[dict[str, str]]:
     """Build a short ChatML-style payload for the provider."""
     turns = max(0, SETTINGS.chat_history_turns)
     trimmed = history[-(turns * 2) :] if turns else []
     return [
         {"role": "system", "content": CHAT_SYSTEM_PROMPT},
         *trimmed,
+        *({"role": "user", "content": earlier_text} for earlier_text in earlier),
         {"role": "user", "content": user_text},
     ]
 
 
-def handle_chat_input(text: str, history: list[dict[str, str]] | None = None) -> Dict[str, Any]:
-    """Handle desktop chat mode with optional LLM and safe fallback."""
-    history = history or []
+def handle_chat_input(
+    text: str,
+    history: list[dict[str, str]] | None = None,
+    continuation: str | None = None,
+    session_id: str | None = None,
+    cancel: CancelToken | None = None,
+    earlier: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Handle desktop chat mode with optional LLM and safe fallback.
+
+    With ``session_id`` the history comes from the server-side session store
+    (unless ``history`` is passed explicitly), and the turn is recorded there.
+    Cancelling ``cancel`` aborts the LLM call and raises ``RequestCancelled``
+    without recording the turn; when its deadline passes first, the built-in
+    reply is used as for any other LLM error. ``earlier`` holds messages
+    whose LLM call was superseded by this one; they go to the LLM (and the
+    session) as user turns before ``text``, and are never run as commands.
+    """
+    response = _chat_response(text, history, continuation, session_id, cancel, earlier)
+    if cancel is not None:
+        # Fallback replies don't watch the token; a cancelled turn must still not be recorded.
+        cancel.raise_if_cancelled()
+    if session_id:
+        for earlier_text in earlier:
+            SESSIONS.append(session_id, "user", earlier_text)
+        SESSIONS.record_turn(session_id, text, str(response.get("reply", "")))
+        response["session_id"] = session_id
+    return response
+
+
+def _chat_response(
+    text: str,
+    history: list[dict[str, str]] | None,
+    continuation: str | None,
+    session_id: str | None,
+    cancel: CancelToken | None = None,
+    earlier: Sequence[str] = (),
+) -> Dict[str, Any]:
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    if continuation:
+        # An answer to an assistant question goes back to the waiting flow, not to the LLM.
+        return handle_input(text, continuation=continuation)
     provider = get_chat_provider()
     if provider is None:
         print("ℹ️ Falling back to built-in assistant reply behavior.")
         return handle_input(text)
 
-    messages = _as_chat_messages(history=history, user_text=text)
+    if history is None:
+        history = SESSIONS.history(session_id) if session_id else []
+    messages = _as_chat_messages(history=history, user_text=text, earlier=earlier)
     try:
-        reply = provider.generate(messages)
+        if cancel is None:
+            reply = provider.generate(messages)
+        else:
+            # Only here may a newer message supersede this one: nothing has run on its behalf yet.
+            with cancel.interruptible():
+                reply = provider.generate(messages, cancel=cancel)
     except RuntimeError as exc:
         print(f"⚠️ LLM error, using fallback behavior: {exc}")
         return handle_input(text)
@@ -209,17 +294,50 @@ def predict_intent_with_confidence(text: str):
     return labels[best_idx], float(probs[best_idx])
 
 
+_FEEDBACK_INTENTS = ("open_app", "close_app", "search", "time", "read_file", "write_file", "reply", "joke", "exit")
+
+
+def active_learning_feedback_flow(text: str, predicted_intent: str) -> Flow:
+    """Confirm or correct a low-confidence prediction and log it as a corrected sample.
+
+    With ``INTENT_BACKEND=online`` the learner applies corrected samples
+    within seconds, so saying the command again already uses them; with the
+    batch model they count toward the next retrain.
+    """
+    label = predicted_intent.replace("_", " ")
+    ans = (yield Prompt(f"I'm not sure what you meant. Did you mean {label}? Say yes or no.")).lower()
+    correct = predicted_intent if "yes" in ans else ""
+    if not correct and "no" in ans:
+        answer = yield Prompt(f"Okay, what did you mean? Say one of: {', '.join(_FEEDBACK_INTENTS)}.")
+        correct = "_".join(answer.lower().split())
+    if correct not in _FEEDBACK_INTENTS:
+        return "Okay."
+    log_sample(text=text, intent=correct, confidence=1.0, source="corrected")
+    speak("Thanks! I’ll learn from this. Please say the command again.")
+    return "Thanks! I’ll learn from this. Please say the command again."
+
+
 def active_learning_feedback(text: str, predicted_intent: str):
-    speak("Was that correct? Say yes or no.")
-    ans = listen_text().lower()
-    if "no" in ans:
-        speak(
-            "Okay, what did you mean? Say one of: open_app, close_app, search, time, read_file, write_file, reply, joke, exit."
-        )
-        correct = listen_text().strip()
-        if correct:
-            log_sample(text=text, intent=correct, confidence=1.0, source="corrected")
-            speak("Thanks! I’ll learn from this next time.")
+    def ask(question: str) -> str:
+        speak(question, PRIORITY_PROMPT)
+        return listen_text()
+
+    return run_blocking(active_learning_feedback_flow(text, predicted_intent), ask)
+
+
+def _run_flow(result: Dict[str, Any], flow: Flow, action: str, reply: str) -> None:
+    """Start ``flow``; if it asks a question, park it and make the question the reply.
+
+    The question is spoken by :func:`_run_commands`, which keeps only the
+    first one when commands running side by side both ask.
+    """
+    result["actions"].append(action)
+    step = DIALOGS.start(flow, {"input": result["input"], "intent": result["intent"]})
+    if step.finished:
+        result["reply"] = step.result if isinstance(step.result, str) else reply
+        return
+    result["reply"] = step.prompt.text
+    result["continuation"] = step.prompt.token
 
 
 def allow_low_confidence(text, conf):
@@ -232,8 +350,48 @@ def allow_low_confidence(text, conf):
     return conf >= CONF_THRESHOLD
 
 
-def _handle_single_command(command_text: str) -> Dict[str, Any]:
-    """Handle one command and return structured metadata for UI/API consumers."""
+_PATH_TERMS = [" file", " folder", " directory", " document"]
+# Intents that always ask a question (or end the session): nothing runs alongside them.
+_EXCLUSIVE_INTENTS = {"write_file", "read_file", "exit"}
+
+
+def _mentions_path(command_text: str) -> bool:
+    return any(term in f" {command_text.lower()}" for term in _PATH_TERMS)
+
+
+def _classify_command(index: int, command_text: str) -> PlannedCommand:
+    """Predict the intent of one command and note what it acts on, without running it."""
+    plan = PlannedCommand(index=index, text=command_text)
+    if not command_text or command_text.strip().lower() == "help":
+        return plan
+
+    entities = extract_entities(command_text)
+    intent, conf = predict_intent_with_confidence(command_text)
+
+    # Explicit reminder phrasing gets reminder intent priority.
+    if entities.get("reminder_time") and entities.get("reminder_message"):
+        if any(k in command_text.lower() for k in ["remind me", "set reminder", "reminder"]):
+            intent, conf = "reminder", 0.99
+
+    plan.intent, plan.confidence, plan.entities = intent, conf, entities
+    print(f"🧠 Intent: {intent} (conf={conf:.2f})")
+    logger.info("intent_predicted input=%s intent=%s conf=%.3f", command_text, intent, conf)
+
+    if intent in {"open_app", "close_app"}:
+        plan.target = "paths" if _mentions_path(command_text) else f"app:{resolve_app(command_text) or ''}"
+    elif intent in {"write_file", "read_file"}:
+        plan.target = "notes"
+    plan.exclusive = intent in _EXCLUSIVE_INTENTS
+    return plan
+
+
+def _execute_command(plan: PlannedCommand) -> Dict[str, Any]:
+    """Run one classified command and return structured metadata for UI/API consumers.
+
+    ``result["learned"]`` is set when the command was acted on, so its intent
+    counts as the profile's last intent.
+    """
+    command_text = plan.text
     result: Dict[str, Any] = {
         "input": command_text,
         "intent": None,
@@ -252,41 +410,23 @@ def _handle_single_command(command_text: str) -> Dict[str, Any]:
         result["reply"] = _api_key_help_text()
         return result
 
-    entities = extract_entities(command_text)
-    intent, conf = predict_intent_with_confidence(command_text)
-
-    # Explicit reminder phrasing gets reminder intent priority.
-    if entities.get("reminder_time") and entities.get("reminder_message"):
-        if any(k in command_text.lower() for k in ["remind me", "set reminder", "reminder"]):
-            intent, conf = "reminder", 0.99
-
+    intent, conf, entities = plan.intent, plan.confidence, plan.entities
     result["intent"] = intent
     result["confidence"] = conf
-    print(f"🧠 Intent: {intent} (conf={conf:.2f})")
-    logger.info("intent_predicted input=%s intent=%s conf=%.3f", command_text, intent, conf)
 
     if intent != "reminder" and not allow_low_confidence(command_text, conf):
-        result["reply"] = (
-            f"I'm not sure what you mean by '{command_text}'. Try: open chrome, search python, "
-            "write a note, tell me a joke, or time."
-        )
-        speak(result["reply"])
+        # Nothing runs on a guess; the user's answer becomes a corrected training sample.
+        _run_flow(result, active_learning_feedback_flow(command_text, intent), "active_learning_feedback", "Okay.")
         return result
 
-    path_terms = [" file", " folder", " directory", " document"]
-
     if intent == "open_app":
-        if any(term in f" {command_text.lower()}" for term in path_terms):
-            open_path_action(command_text)
-            result["actions"].append("open_path_action")
-            result["reply"] = "Attempted to open requested file or folder."
+        if _mentions_path(command_text):
+            _run_flow(result, open_path_flow(command_text), "open_path_action", "Attempted to open requested file or folder.")
         else:
-            open_app_action(command_text)
-            result["actions"].append("open_app_action")
-            result["reply"] = "Attempted to open requested application."
+            _run_flow(result, open_app_flow(command_text), "open_app_action", "Attempted to open requested application.")
 
     elif intent == "close_app":
-        if any(term in f" {command_text.lower()}" for term in path_terms):
+        if _mentions_path(command_text):
             close_path_action(command_text)
             result["actions"].append("close_path_action")
             result["reply"] = "Attempted to close requested file or folder."
@@ -300,9 +440,7 @@ def _handle_single_command(command_text: str) -> Dict[str, Any]:
             result["reply"] = "Attempted to close requested application."
 
     elif intent == "search":
-        search_action(command_text)
-        result["actions"].append("search_action")
-        result["reply"] = "Search action triggered."
+        _run_flow(result, search_flow(command_text), "search_action", "Search action triggered.")
 
     elif intent == "reminder":
         reminder_time = entities.get("reminder_time")
@@ -331,14 +469,10 @@ def _handle_single_command(command_text: str) -> Dict[str, Any]:
         result["reply"] = "Told a joke."
 
     elif intent == "write_file":
-        write_file_action()
-        result["actions"].append("write_file_action")
-        result["reply"] = "Write-note flow started."
+        _run_flow(result, write_file_flow(), "write_file_action", "Write-note flow started.")
 
     elif intent == "read_file":
-        read_file_action(command_text)
-        result["actions"].append("read_file_action")
-        result["reply"] = "Read-note flow started."
+        _run_flow(result, read_file_flow(command_text), "read_file_action", "Read-note flow started.")
 
     elif intent == "reply":
         chat_reply = _chat_reply(command_text)
@@ -358,41 +492,118 @@ def _handle_single_command(command_text: str) -> Dict[str, Any]:
     if model is not None and AUTO_LEARN and conf >= AUTO_LEARN_MIN_CONF:
         log_sample(text=command_text, intent=intent, confidence=conf, source="auto")
 
-    profile = load_profile()
-    profile["last_intent"] = intent
-    save_profile(profile)
-
+    result["learned"] = True
     return result
 
 
-def handle_input(text: str) -> Dict[str, Any]:
-    """Process text input and return structured response without changing CLI behavior."""
-    if not text:
-        logger.error("empty_input_received")
-        return {"reply": "Please type something.", "commands": [], "mode": MODE, "model_loaded": model is not None}
+def _save_last_intent(results: List[Dict[str, Any]]) -> None:
+    """One profile write per request, for the last command that was acted on."""
+    learned = [result for result in results if result.pop("learned", False)]
+    if learned:
+        profile = load_profile()
+        profile["last_intent"] = learned[-1]["intent"]
+        save_profile(profile)
 
-    commands = split_commands(text)
-    if not commands:
-        return {"reply": "I could not detect a command.", "commands": [], "mode": MODE, "model_loaded": model is not None}
 
-    command_results: List[Dict[str, Any]] = []
-    for command in commands:
-        command_results.append(_handle_single_command(command))
+def _run_commands(commands: List[str], command_results: List[Dict[str, Any]]) -> None:
+    """Run a chained request, independent commands concurrently; results stay in command order.
+
+    When a command asks a question, commands that depend on it wait for the
+    answer. If several commands running side by side ask, the first keeps
+    its question and the others are re-run after it is answered.
+    """
+    plans = [_classify_command(index, command) for index, command in enumerate(commands)]
+    finished: Dict[int, Dict[str, Any]] = {}
+    deferred: List[int] = []
+    question: Dict[str, Any] | None = None
+    try:
+        for level in execution_levels(plans):
+            if question is not None:
+                deferred.extend(plan.index for plan in level)
+                continue
+            for plan, result in zip(level, EXECUTOR.run_level(level, _execute_command)):
+                token = result.get("continuation")
+                if token and question is None:
+                    question = result
+                elif token:
+                    DIALOGS.cancel(token)
+                    deferred.append(plan.index)
+                    continue
+                finished[plan.index] = result
+    finally:
+        # Also on "exit", which ends the session from inside its command.
+        results = [finished[index] for index in sorted(finished)]
+        _save_last_intent(results)
+    command_results.extend(results)
+    if question is not None:
+        # The rest of a chained request runs once the question is answered.
+        DIALOGS.context(question["continuation"])["remaining"] = [commands[index] for index in sorted(deferred)]
+        speak(question["reply"], PRIORITY_PROMPT)
+
+
+def _resume_dialog(text: str, continuation: str, command_results: List[Dict[str, Any]]) -> None:
+    result: Dict[str, Any] = {"input": text, "intent": None, "confidence": 1.0, "reply": "", "actions": ["dialog_resume"]}
+    command_results.append(result)
+    try:
+        step = DIALOGS.resume(continuation, text)
+    except LookupError:
+        result["reply"] = "That question has expired. Please say the command again."
+        speak(result["reply"])
+        return
+
+    result["intent"] = step.context.get("intent")
+    if not step.finished:
+        result["reply"] = step.prompt.text
+        result["continuation"] = step.prompt.token
+        speak(step.prompt.text, PRIORITY_PROMPT)
+        return
+    result["reply"] = step.result if isinstance(step.result, str) else "Done."
+    _run_commands(step.context.get("remaining", []), command_results)
+
 
-    final_reply = command_results[-1].get("reply", "Done.") if command_results else "Done."
+def handle_input(text: str, continuation: str | None = None) -> Dict[str, Any]:
+    """Process text input and return structured response without changing CLI behavior.
+
+    When an action needs more input, the reply is its question and the
+    response carries a ``continuation`` token. Sending the answer with that
+    token resumes the action; no thread waits for it in between.
+    """
+    command_results: List[Dict[str, Any]] = []
+    if continuation:
+        _resume_dialog(text or "", continuation, command_results)
+    else:
+        if not text:
+            logger.error("empty_input_received")
+            return {"reply": "Please type something.", "commands": [], "mode": MODE, "model_loaded": model is not None}
+
+        # Whatever is still being said about the previous request is stale now.
+        interrupt_speech()
+        commands = split_commands(text)
+        if not commands:
+            return {"reply": "I could not detect a command.", "commands": [], "mode": MODE, "model_loaded": model is not None}
+        _run_commands(commands, command_results)
+
+    # A pending question is the reply even when commands after it already ran.
+    pending = next((result for result in command_results if result.get("continuation")), None)
+    final = pending or (command_results[-1] if command_results else {})
     return {
-        "reply": final_reply,
+        "reply": final.get("reply", "Done."),
         "commands": command_results,
+        "continuation": final.get("continuation"),
         "mode": MODE,
         "model_loaded": model is not None,
     }
 
 
 def handle_text(text: str):
-    """Backward-compatible CLI helper that performs side-effects only."""
-    if not text:
+    """Backward-compatible CLI helper that performs side-effects only.
+
+    Answers to the assistant's questions are routed back to the waiting flow.
+    """
+    global _cli_continuation
+    if not text and _cli_continuation is None:
         return
-    handle_input(text)
+    _cli_continuation = handle_input(text, continuation=_cli_continuation).get("continuation")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""Cancellation tokens for long-running requests.
+
+A :class:`CancelToken` is handed down from whoever started a request (the
+desktop client, say) to the code doing the slow part (an LLM HTTP call).
+Cancelling it runs the registered callbacks, which abort blocking I/O such
+as closing the socket an HTTP response is being read from. An optional
+deadline turns into the timeout of each blocking call made on its behalf.
+
+Work that can be abandoned without leaving anything half done, like
+waiting for an LLM reply, runs inside :meth:`CancelToken.interruptible`.
+:meth:`CancelToken.cancel_if_interruptible` cancels only while such work is
+in progress. So a caller can drop a request it no longer needs, and be sure
+no command of that request has run or will run.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+
+class RequestCancelled(Exception):
+    """Raised by work whose :class:`CancelToken` was cancelled."""
+
+
+class CancelToken:
+    def __init__(self, timeout_seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self.deadline = clock() + timeout_seconds if timeout_seconds is not None else None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._interruptible = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            callbacks = self._cancel_locked()
+        self._run(callbacks)
+
+    def cancel_if_interruptible(self) -> bool:
+        """Cancel only while work inside :meth:`interruptible` is running; returns whether it did."""
+        with self._lock:
+            if self._event.is_set() or not self._interruptible:
+                return False
+            callbacks = self._cancel_locked()
+        self._run(callbacks)
+        return True
+
+    @contextmanager
+    def interruptible(self) -> Iterator[None]:
+        """Mark work that can be abandoned safely; raises ``RequestCancelled`` on exit if it was cancelled."""
+        with self._lock:
+            self._interruptible += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._interruptible -= 1
+            # Cancellation wins over whatever the interrupted work raised.
+            self.raise_if_cancelled()
+
+    def _cancel_locked(self) -> List[Callable[[], None]]:
+        self._event.set()
+        callbacks, self._callbacks = self._callbacks, []
+        return callbacks
+
+    @staticmethod
+    def _run(callbacks: List[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                continue
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run ``callback`` on cancellation (at once if already cancelled); returns an unregister function."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def remaining(self, default: float) -> float:
+        """Seconds left before the deadline, capped at ``default``."""
+        if self.deadline is None:
+            return default
+        return max(0.0, min(default, self.deadline - self._clock()))
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise RequestCancelled("Request was cancelled.")
+
+    def _discard(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
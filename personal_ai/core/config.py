@@ -36,6 +36,8 @@ class Settings:
     conf_threshold: float
     auto_learn: bool
     auto_learn_min_conf: float
+    auto_learn_max_per_intent: int
+    train_memory_limit_mb: float
     model_improvement_threshold: float
     model_random_state: int
     api_key: str
@@ -50,6 +52,38 @@ class Settings:
     groq_base_url: str
     groq_model: str
     chat_history_turns: int
+    file_index_refresh_seconds: int
+    file_fuzzy_max_entries: int
+    intent_backend: str
+    online_batch_size: int
+    online_checkpoint_seconds: int
+    feature_cache: bool
+    model_compression: str
+    model_max_features: int
+    compression_accuracy_tolerance: float
+    promotion_max_p99_ms: float
+    promotion_max_load_seconds: float
+    promotion_max_size_mb: float
+    promotion_max_memory_mb: float
+    promotion_max_slowdown: float
+    model_registry_keep: int
+    retrain_min_samples: int
+    retrain_min_corrections: int
+    retrain_debounce_seconds: int
+    retrain_min_interval_seconds: int
+    retrain_max_interval_seconds: int
+    retrain_poll_seconds: int
+    retrain_nice: int
+    phrase_cache_max_mb: float
+    phrase_cache_min_uses: int
+    dialog_ttl_seconds: int
+    session_max_sessions: int
+    session_max_chars: int
+    session_idle_seconds: int
+    session_spill: bool
+    transcript_max_messages: int
+    desktop_request_timeout_seconds: int
+    command_workers: int
 
 
 SETTINGS = Settings(
@@ -57,6 +91,8 @@ SETTINGS = Settings(
     conf_threshold=float(os.getenv("CONF_THRESHOLD", "0.55")),
     auto_learn=_env_flag("AUTO_LEARN", "1"),
     auto_learn_min_conf=float(os.getenv("AUTO_LEARN_MIN_CONF", "0.75")),
+    auto_learn_max_per_intent=int(os.getenv("AUTO_LEARN_MAX_PER_INTENT", "5000")),
+    train_memory_limit_mb=float(os.getenv("TRAIN_MEMORY_LIMIT_MB", "0")),
     model_improvement_threshold=float(os.getenv("MODEL_IMPROVEMENT_THRESHOLD", "0.01")),
     model_random_state=int(os.getenv("MODEL_RANDOM_STATE", "42")),
     api_key=os.getenv("API_KEY", ""),
@@ -71,6 +107,38 @@ SETTINGS = Settings(
     groq_base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
     groq_model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
     chat_history_turns=int(os.getenv("CHAT_HISTORY_TURNS", "6")),
+    file_index_refresh_seconds=int(os.getenv("FILE_INDEX_REFRESH_SECONDS", "300")),
+    file_fuzzy_max_entries=int(os.getenv("FILE_FUZZY_MAX_ENTRIES", "200000")),
+    intent_backend=os.getenv("INTENT_BACKEND", "batch").lower(),
+    online_batch_size=int(os.getenv("ONLINE_BATCH_SIZE", "16")),
+    online_checkpoint_seconds=int(os.getenv("ONLINE_CHECKPOINT_SECONDS", "60")),
+    feature_cache=_env_flag("FEATURE_CACHE", "1"),
+    model_compression=os.getenv("MODEL_COMPRESSION", "").lower(),
+    model_max_features=int(os.getenv("MODEL_MAX_FEATURES", "5000")),
+    compression_accuracy_tolerance=float(os.getenv("COMPRESSION_ACCURACY_TOLERANCE", "0.01")),
+    promotion_max_p99_ms=float(os.getenv("PROMOTION_MAX_P99_MS", "0")),
+    promotion_max_load_seconds=float(os.getenv("PROMOTION_MAX_LOAD_SECONDS", "0")),
+    promotion_max_size_mb=float(os.getenv("PROMOTION_MAX_SIZE_MB", "0")),
+    promotion_max_memory_mb=float(os.getenv("PROMOTION_MAX_MEMORY_MB", "0")),
+    promotion_max_slowdown=float(os.getenv("PROMOTION_MAX_SLOWDOWN", "0")),
+    model_registry_keep=int(os.getenv("MODEL_REGISTRY_KEEP", "5")),
+    retrain_min_samples=int(os.getenv("RETRAIN_MIN_SAMPLES", "200")),
+    retrain_min_corrections=int(os.getenv("RETRAIN_MIN_CORRECTIONS", "5")),
+    retrain_debounce_seconds=int(os.getenv("RETRAIN_DEBOUNCE_SECONDS", "120")),
+    retrain_min_interval_seconds=int(os.getenv("RETRAIN_MIN_INTERVAL_SECONDS", "1800")),
+    retrain_max_interval_seconds=int(os.getenv("RETRAIN_MAX_INTERVAL_SECONDS", "86400")),
+    retrain_poll_seconds=int(os.getenv("RETRAIN_POLL_SECONDS", "60")),
+    retrain_nice=int(os.getenv("RETRAIN_NICE", "10")),
+    phrase_cache_max_mb=float(os.getenv("PHRASE_CACHE_MAX_MB", "20")),
+    phrase_cache_min_uses=int(os.getenv("PHRASE_CACHE_MIN_USES", "2")),
+    dialog_ttl_seconds=int(os.getenv("DIALOG_TTL_SECONDS", "300")),
+    session_max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "256")),
+    session_max_chars=int(os.getenv("SESSION_MAX_CHARS", "16000")),
+    session_idle_seconds=int(os.getenv("SESSION_IDLE_SECONDS", "3600")),
+    session_spill=_env_flag("SESSION_SPILL", "0"),
+    transcript_max_messages=int(os.getenv("TRANSCRIPT_MAX_MESSAGES", "500")),
+    desktop_request_timeout_seconds=int(os.getenv("DESKTOP_REQUEST_TIMEOUT_SECONDS", "30")),
+    command_workers=int(os.getenv("COMMAND_WORKERS", "4")),
 )
 
 MODE = SETTINGS.mode
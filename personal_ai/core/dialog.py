@@ -0,0 +1,132 @@
+"""Resumable multi-turn dialogs.
+
+An interactive action is written as a generator (a *flow*). When it needs
+input, it yields a :class:`Prompt` and receives the answer as the value of
+the ``yield`` expression. What the generator returns is the final reply.
+
+:class:`DialogManager` parks a suspended flow under a random continuation
+token and returns the prompt. The next request that carries the token sends
+its text into the flow. No thread waits for the user between turns, so
+an API worker is never tied up by someone thinking. Parked flows expire
+after ``DIALOG_TTL_SECONDS``.
+
+:func:`run_blocking` drives a flow to completion by asking synchronously,
+for the CLI and the old ``*_action`` helpers.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generator, Optional
+
+# Parked dialogs kept at most; the oldest are dropped first.
+_MAX_PENDING = 1000
+
+
+@dataclass
+class Prompt:
+    text: str
+    token: Optional[str] = None
+
+
+Flow = Generator[Prompt, str, Any]
+
+
+@dataclass
+class DialogStep:
+    """Outcome of starting or resuming a flow: a new prompt, or the flow's final result."""
+
+    prompt: Optional[Prompt] = None
+    result: Any = None
+    context: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def finished(self) -> bool:
+        return self.prompt is None
+
+
+@dataclass
+class _Parked:
+    flow: Flow
+    context: Dict[str, Any]
+    expires_at: float
+
+
+class DialogManager:
+    """Holds suspended flows by continuation token."""
+
+    def __init__(self, ttl_seconds: float, max_pending: int = _MAX_PENDING, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self._clock = clock
+        self._parked: "OrderedDict[str, _Parked]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, flow: Flow, context: Optional[Dict[str, Any]] = None) -> DialogStep:
+        """Run ``flow`` until its first prompt, or to the end if it needs no input."""
+        return self._advance(flow, None, context or {}, first=True)
+
+    def resume(self, token: str, answer: str) -> DialogStep:
+        """Send ``answer`` to the flow parked under ``token``; raises ``LookupError`` if it is unknown or expired."""
+        with self._lock:
+            self._expire()
+            parked = self._parked.pop(token, None)
+        if parked is None:
+            raise LookupError("Unknown or expired continuation token.")
+        return self._advance(parked.flow, answer, parked.context, first=False)
+
+    def context(self, token: str) -> Dict[str, Any]:
+        """Mutable context of a parked flow, for callers that resume more work after it."""
+        with self._lock:
+            return self._parked[token].context
+
+    def cancel(self, token: str) -> bool:
+        with self._lock:
+            parked = self._parked.pop(token, None)
+        if parked is None:
+            return False
+        parked.flow.close()
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._parked)
+
+    def _advance(self, flow: Flow, answer: Optional[str], context: Dict[str, Any], first: bool) -> DialogStep:
+        try:
+            prompt = next(flow) if first else flow.send(answer or "")
+        except StopIteration as stop:
+            return DialogStep(result=stop.value, context=context)
+        token = secrets.token_urlsafe(16)
+        prompt = Prompt(prompt.text, token)
+        with self._lock:
+            self._expire()
+            while len(self._parked) >= self.max_pending:
+                _token, oldest = self._parked.popitem(last=False)
+                oldest.flow.close()
+            self._parked[token] = _Parked(flow, context, self._clock() + self.ttl_seconds)
+        return DialogStep(prompt=prompt, context=context)
+
+    def _expire(self) -> None:
+        now = self._clock()
+        while self._parked:
+            token, parked = next(iter(self._parked.items()))
+            if parked.expires_at > now:
+                break
+            del self._parked[token]
+            parked.flow.close()
+
+
+def run_blocking(flow: Flow, ask: Callable[[str], str]) -> Any:
+    """Drive ``flow`` to completion, answering each prompt with ``ask(prompt_text)``."""
+    try:
+        prompt = next(flow)
+        while True:
+            prompt = flow.send(ask(prompt.text))
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,85 @@
+"""Concurrent execution of the commands in one utterance.
+
+"search python tutorials and tell me the time and open youtube" splits into
+three commands that don't touch each other, so there is no reason for the
+time to wait on the browser launch. Every command is classified first. Then
+a dependency graph orders the pairs that must stay in sequence:
+
+* commands on the same target (opening then closing the same app, or any
+  two file/folder operations) keep their original order;
+* an *exclusive* command (writing notes, exiting) runs after everything
+  before it and before everything after it.
+
+The graph is run level by level: all commands whose dependencies have
+finished run together on a thread pool. Results always come back in the
+original order.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class PlannedCommand:
+    index: int
+    text: str
+    intent: Optional[str] = None
+    confidence: float = 0.0
+    entities: Dict[str, Any] = field(default_factory=dict)
+    # Resource the command acts on; commands on the same target keep their order.
+    target: Optional[str] = None
+    exclusive: bool = False
+
+
+def dependencies(plans: List[PlannedCommand]) -> Dict[int, Set[int]]:
+    """Map each command index to the indexes of earlier commands it must wait for."""
+    graph: Dict[int, Set[int]] = {plan.index: set() for plan in plans}
+    for later_pos, later in enumerate(plans):
+        for earlier in plans[:later_pos]:
+            same_target = later.target is not None and later.target == earlier.target
+            if same_target or later.exclusive or earlier.exclusive:
+                graph[later.index].add(earlier.index)
+    return graph
+
+
+def execution_levels(plans: List[PlannedCommand]) -> List[List[PlannedCommand]]:
+    """Group commands so that each group depends only on earlier groups; each group is in original order."""
+    graph = dependencies(plans)
+    level: Dict[int, int] = {}
+    for plan in plans:
+        level[plan.index] = 1 + max((level[dep] for dep in graph[plan.index]), default=-1)
+    levels: List[List[PlannedCommand]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for plan in plans:
+        levels[level[plan.index]].append(plan)
+    return levels
+
+
+class CommandExecutor:
+    """Runs groups of independent commands on a shared thread pool."""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def run_level(self, plans: List[PlannedCommand], run: Callable[[PlannedCommand], T]) -> List[T]:
+        """Run ``plans`` concurrently and return their results in the given order.
+
+        A single command, or a pool of one worker, runs on the calling thread.
+        If any command raises, the first exception in order is re-raised once
+        the others have finished.
+        """
+        if len(plans) <= 1 or self.max_workers == 1:
+            return [run(plan) for plan in plans]
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="command")
+        futures = [self._pool.submit(run, plan) for plan in plans]
+        wait(futures)
+        return [future.result() for future in futures]
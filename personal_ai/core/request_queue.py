@@ -0,0 +1,91 @@
+"""Ordering and superseding of one client's chat requests.
+
+A chat client runs at most one request at a time, so replies arrive in the
+order the messages were sent, and each reply sees the previous turn in the
+session history. Every message is its own request; messages sent while one
+is running wait in a queue, each to be sent on its own.
+
+The one exception is a message sent while the running request is only
+waiting for an LLM reply. Nothing has run on its behalf yet, so that call is
+cancelled and the new message supersedes it. The superseded message is not
+lost: it is sent again as an earlier user turn of the new request. Once a
+request has moved past the LLM call (a fallback running commands, say, or
+an answer resuming an assistant question), it is never superseded, since
+sending its message again could repeat what it did.
+
+Every request gets an increasing id. A result is delivered only if its id
+is the active one, so late results from cancelled requests are dropped.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+from .cancellation import CancelToken
+
+
+@dataclass
+class PendingRequest:
+    request_id: int
+    text: str
+    token: CancelToken
+    # Set by the client when the request starts; an answer to a question can't be superseded.
+    continuation: Optional[str] = None
+    # Messages whose LLM call this request superseded, oldest first; sent as separate user turns.
+    earlier: Tuple[str, ...] = ()
+
+    @property
+    def supersedable(self) -> bool:
+        return self.continuation is None
+
+
+class RequestQueue:
+    def __init__(self, timeout_seconds: Optional[float] = None) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.active: Optional[PendingRequest] = None
+        # Messages waiting for the active request to finish, oldest first.
+        self.queued: Deque[str] = deque()
+        self._ids = itertools.count(1)
+
+    def submit(self, text: str) -> Optional[PendingRequest]:
+        """Add a message; returns the request to start now, or ``None`` if it waits its turn."""
+        if self.active is None:
+            self.active = self._new(text)
+            return self.active
+        # Only a queue-free request can be superseded, or the new message would jump the queue.
+        if not self.queued and self.active.supersedable and self.active.token.cancel_if_interruptible():
+            self.active = self._new(text, earlier=(*self.active.earlier, self.active.text))
+            return self.active
+        self.queued.append(text)
+        return None
+
+    def is_current(self, request_id: int) -> bool:
+        return self.active is not None and self.active.request_id == request_id
+
+    def finish(self, request_id: int) -> tuple[bool, Optional[PendingRequest]]:
+        """Record that ``request_id`` ended; returns ``(deliver, next_request_to_start)``."""
+        if not self.is_current(request_id):
+            return False, None
+        self.active = None
+        if self.queued:
+            # The timeout starts counting when the request does.
+            self.active = self._new(self.queued.popleft())
+        return True, self.active
+
+    def expire(self, request_id: int) -> tuple[bool, Optional[PendingRequest]]:
+        """Give up on ``request_id``: cancel it and move on as :meth:`finish` does."""
+        if self.is_current(request_id):
+            self.active.token.cancel()
+        return self.finish(request_id)
+
+    def cancel_all(self) -> None:
+        if self.active is not None:
+            self.active.token.cancel()
+        self.active = None
+        self.queued.clear()
+
+    def _new(self, text: str, earlier: Tuple[str, ...] = ()) -> PendingRequest:
+        return PendingRequest(next(self._ids), text, CancelToken(self.timeout_seconds), earlier=earlier)
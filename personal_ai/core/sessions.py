@@ -0,0 +1,184 @@
+"""Server-side chat history, keyed by session id.
+
+Clients send only the new message and a session id; the recent turns live
+here. Each session keeps at most ``SESSION_MAX_TURNS`` user/assistant pairs
+and ``SESSION_MAX_CHARS`` characters, dropping its oldest messages first.
+At most ``SESSION_MAX_SESSIONS`` sessions stay in memory. Past that, the
+least recently used one is evicted: it is written to
+``personal_ai/data/sessions/`` when ``SESSION_SPILL`` is on, and otherwise
+forgotten. A session idle for ``SESSION_IDLE_SECONDS`` is forgotten, from
+memory and disk alike.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import BASE_DIR, SETTINGS
+
+SESSION_DIR = BASE_DIR / "data" / "sessions"
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_\-]{8,128}$")
+# Expired spill files are swept at most this often.
+_SWEEP_SECONDS = 300.0
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def is_valid_session_id(session_id: str) -> bool:
+    return bool(_SESSION_ID.match(session_id or ""))
+
+
+@dataclass
+class _Session:
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    chars: int = 0
+    last_used: float = 0.0
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        max_turns: int = 6,
+        max_chars: int = 16_000,
+        idle_seconds: float = 3600.0,
+        spill_dir: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self.max_messages = max(0, max_turns) * 2
+        self.max_chars = max_chars
+        self.idle_seconds = idle_seconds
+        self.spill_dir = spill_dir
+        self._clock = clock
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """Recent messages for ``session_id``, oldest first; empty for a new or expired session."""
+        with self._lock:
+            session = self._get(session_id, create=False)
+            return [dict(message) for message in session.messages] if session else []
+
+    def append(self, session_id: str, role: str, content: str) -> None:
+        with self._lock:
+            session = self._get(session_id, create=True)
+            session.messages.append({"role": role, "content": content})
+            session.chars += len(content)
+            self._trim(session)
+
+    def record_turn(self, session_id: str, user_text: str, reply: str) -> None:
+        self.append(session_id, "user", user_text)
+        self.append(session_id, "assistant", reply)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self.spill_dir is not None:
+                self._spill_path(session_id).unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _get(self, session_id: str, create: bool) -> Optional[_Session]:
+        now = self._clock()
+        self._expire(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._load_spilled(session_id, now)
+            if session is None:
+                if not create:
+                    return None
+                session = _Session()
+            self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        session.last_used = now
+        self._evict()
+        return session
+
+    def _trim(self, session: _Session) -> None:
+        while session.messages and (len(session.messages) > self.max_messages or session.chars > self.max_chars):
+            session.chars -= len(session.messages.pop(0)["content"])
+
+    def _evict(self) -> None:
+        while len(self._sessions) > self.max_sessions:
+            session_id, session = self._sessions.popitem(last=False)
+            self._spill(session_id, session)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.idle_seconds
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self._sessions[session_id]
+            if self.spill_dir is not None:
+                self._spill_path(session_id).unlink(missing_ok=True)
+        if self.spill_dir is not None and now - self._last_sweep >= _SWEEP_SECONDS:
+            self._last_sweep = now
+            for path in self.spill_dir.glob("*.json"):
+                try:
+                    if path.stat().st_mtime <= cutoff:
+                        path.unlink()
+                except OSError:
+                    continue
+
+    def _spill_path(self, session_id: str) -> Path:
+        # Hashed so a client-chosen id can never name a path.
+        return self.spill_dir / f"{hashlib.sha256(session_id.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def _spill(self, session_id: str, session: _Session) -> None:
+        if self.spill_dir is None or not session.messages:
+            return
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self._spill_path(session_id)
+        tmp_path = path.with_name(path.name + ".tmp")
+        payload = {"messages": session.messages, "last_used": session.last_used}
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        os.utime(path, (session.last_used, session.last_used))
+
+    def _load_spilled(self, session_id: str, now: float) -> Optional[_Session]:
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(session_id)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        path.unlink(missing_ok=True)
+        if float(payload.get("last_used", 0.0)) <= now - self.idle_seconds:
+            return None
+        messages = [
+            {"role": str(item["role"]), "content": str(item["content"])}
+            for item in payload.get("messages", [])
+            if isinstance(item, dict) and "role" in item and "content" in item
+        ]
+        session = _Session(messages=messages, chars=sum(len(item["content"]) for item in messages))
+        self._trim(session)
+        return session
+
+
+def build_session_store() -> SessionStore:
+    return SessionStore(
+        max_sessions=SETTINGS.session_max_sessions,
+        max_turns=SETTINGS.chat_history_turns,
+        max_chars=SETTINGS.session_max_chars,
+        idle_seconds=SETTINGS.session_idle_seconds,
+        spill_dir=SESSION_DIR if SETTINGS.session_spill else None,
+    )
@@ -0,0 +1,148 @@
+"""Chat transcript on disk with a bounded window in memory.
+
+Every message is appended to a JSONL file. Only a contiguous window of at
+most ``max_messages`` of them is held in memory; that is what a chat view
+displays. Scrolling past either end of the window loads the neighbouring
+messages from disk, and the window drops as many from its far end, so long
+sessions cost the same memory and layout work as short ones.
+
+Byte offsets of each line are kept in a compact array, so any range can be
+read back with one seek.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List
+
+from .config import BASE_DIR
+
+TRANSCRIPT_DIR = BASE_DIR / "data" / "transcripts"
+
+
+@dataclass
+class TranscriptMessage:
+    role: str
+    text: str
+    at: float = field(default_factory=time.time)
+
+
+class Transcript:
+    """Append-only message log; ``messages`` is the in-memory window ``[start, end)``."""
+
+    def __init__(self, path: Path, max_messages: int = 500) -> None:
+        self.path = path
+        self.max_messages = max(1, max_messages)
+        self.messages: List[TranscriptMessage] = []
+        self.start = 0
+        self._offsets = array("q")
+        self._size = 0
+        if path.exists():
+            self._index()
+            self.jump_to_end()
+
+    def __len__(self) -> int:
+        """Messages in the whole transcript, on disk included."""
+        return len(self._offsets)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.messages)
+
+    @property
+    def at_end(self) -> bool:
+        return self.end == len(self)
+
+    @property
+    def older_available(self) -> int:
+        return self.start
+
+    @property
+    def newer_available(self) -> int:
+        return len(self) - self.end
+
+    @property
+    def overflow(self) -> int:
+        """How many messages the window holds beyond ``max_messages``."""
+        return max(0, len(self.messages) - self.max_messages)
+
+    def append(self, role: str, text: str) -> TranscriptMessage:
+        """Write a message to disk; it joins the window only when the window is at the end."""
+        message = TranscriptMessage(role, text)
+        line = (json.dumps(asdict(message), ensure_ascii=False) + "\n").encode("utf-8")
+        was_at_end = self.at_end
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as handle:
+            handle.write(line)
+        self._offsets.append(self._size)
+        self._size += len(line)
+        if was_at_end:
+            self.messages.append(message)
+        return message
+
+    def load_older(self, count: int) -> int:
+        """Prepend up to ``count`` messages from disk; returns how many were added."""
+        count = min(count, self.older_available)
+        if count > 0:
+            self.messages[:0] = self._read(self.start - count, self.start)
+            self.start -= count
+        return max(0, count)
+
+    def load_newer(self, count: int) -> int:
+        """Append up to ``count`` messages from disk; returns how many were added."""
+        count = min(count, self.newer_available)
+        if count > 0:
+            self.messages.extend(self._read(self.end, self.end + count))
+        return max(0, count)
+
+    def drop_oldest(self, count: int) -> None:
+        count = min(count, len(self.messages))
+        del self.messages[:count]
+        self.start += count
+
+    def drop_newest(self, count: int) -> None:
+        count = min(count, len(self.messages))
+        del self.messages[len(self.messages) - count :]
+
+    def jump_to_end(self) -> None:
+        """Replace the window with the latest ``max_messages`` messages."""
+        start = max(0, len(self) - self.max_messages)
+        self.messages = self._read(start, len(self))
+        self.start = start
+
+    def _index(self) -> None:
+        offset = 0
+        with self.path.open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    # A line cut short by a crash; later appends start after it.
+                    break
+                self._offsets.append(offset)
+                offset += len(line)
+        self._size = offset
+        with self.path.open("rb+") as handle:
+            handle.truncate(offset)
+
+    def _read(self, first: int, last: int) -> List[TranscriptMessage]:
+        if first >= last:
+            return []
+        begin = self._offsets[first]
+        stop = self._offsets[last] if last < len(self._offsets) else self._size
+        with self.path.open("rb") as handle:
+            handle.seek(begin)
+            data = handle.read(stop - begin)
+        messages = []
+        # Split on the newline byte only: text may hold U+2028 and the like,
+        # which ``json.dumps(ensure_ascii=False)`` leaves unescaped and
+        # ``str.splitlines`` would treat as line breaks.
+        for line in data.split(b"\n")[: last - first]:
+            try:
+                payload = json.loads(line.decode("utf-8", errors="replace"))
+                messages.append(TranscriptMessage(str(payload["role"]), str(payload["text"]), float(payload["at"])))
+            except (ValueError, KeyError, TypeError):
+                messages.append(TranscriptMessage("System", "[unreadable message]", 0.0))
+        return messages
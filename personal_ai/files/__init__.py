@@ -0,0 +1,6 @@
+"""File lookup helpers for user-approved folders."""
+
+from .fuzzy import TrigramIndex
+from .index import FILE_INDEXES, FileIndex, FileIndexRegistry
+
+__all__ = ["FILE_INDEXES", "FileIndex", "FileIndexRegistry", "TrigramIndex"]
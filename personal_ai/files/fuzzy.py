@@ -0,0 +1,109 @@
+"""Trigram index for typo-tolerant file and folder name matching.
+
+Spoken queries rarely match a file name exactly ("budget spreadsheet" vs
+``Budget_2024.xlsx``), so names are reduced to a lowercase word key without
+the extension and scored by trigram overlap (Dice coefficient). Postings are
+kept in compact ``array('I')`` buffers and the number of indexed names is
+capped so memory stays bounded for very large folders.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_SPOKEN_DOT_RE = re.compile(r"\s+dot\s+")
+
+# Trigrams present in more names than this are only used when nothing rarer matches.
+_COMMON_GRAM_RATIO = 0.05
+_CANDIDATES_PER_RESULT = 20
+
+
+def _split_extension(name: str) -> Tuple[str, str]:
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem or " " in ext or len(ext) > 5:
+        return name, ""
+    return stem, ext
+
+
+def search_key(name: str) -> Tuple[str, str]:
+    """Return ``(word key, extension)`` for a file name or spoken query."""
+    lowered = _SPOKEN_DOT_RE.sub(".", name.strip().lower())
+    stem, ext = _split_extension(lowered)
+    return " ".join(_NON_WORD_RE.sub(" ", stem).split()), ext
+
+
+def trigrams(key: str) -> set[str]:
+    grams: set[str] = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Ranked fuzzy matcher over a bounded set of names."""
+
+    def __init__(self, max_entries: int = 200_000) -> None:
+        self.max_entries = max_entries
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._payloads: List[Sequence[str]] = []
+        self._postings: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def build(self, entries: Iterable[Tuple[str, Sequence[str]]]) -> None:
+        """Index ``(name, payload)`` pairs, keeping the shallowest names past the cap."""
+        ranked = sorted(entries, key=lambda item: min((p.count("/") for p in item[1]), default=0))
+        names: List[str] = []
+        keys: List[str] = []
+        payloads: List[Sequence[str]] = []
+        postings: Dict[str, array] = {}
+
+        for name, payload in ranked[: self.max_entries]:
+            key, _ext = search_key(name)
+            if not key:
+                continue
+            entry_id = len(names)
+            names.append(name)
+            keys.append(key)
+            payloads.append(payload)
+            for gram in trigrams(key):
+                bucket = postings.get(gram)
+                if bucket is None:
+                    bucket = postings[gram] = array("I")
+                bucket.append(entry_id)
+
+        self._names, self._keys, self._payloads, self._postings = names, keys, payloads, postings
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[str, Sequence[str], float]]:
+        """Return up to ``k`` ``(name, payload, score)`` tuples ordered by score."""
+        query_key, query_ext = search_key(query)
+        query_grams = trigrams(query_key)
+        if not query_grams or not self._names:
+            return []
+
+        buckets = [self._postings[g] for g in query_grams if g in self._postings]
+        common_cutoff = max(1000, int(len(self._names) * _COMMON_GRAM_RATIO))
+        selective = [b for b in buckets if len(b) <= common_cutoff] or buckets
+
+        overlap: Counter[int] = Counter()
+        for bucket in selective:
+            overlap.update(bucket)
+
+        scored: List[Tuple[float, int]] = []
+        for entry_id, _hits in overlap.most_common(k * _CANDIDATES_PER_RESULT):
+            entry_grams = trigrams(self._keys[entry_id])
+            score = 2 * len(query_grams & entry_grams) / (len(query_grams) + len(entry_grams))
+            if query_ext and _split_extension(self._names[entry_id])[1] == query_ext:
+                score = min(1.0, score + 0.05)
+            if score >= min_score:
+                scored.append((score, entry_id))
+
+        scored.sort(key=lambda item: (-item[0], self._names[item[1]]))
+        return [(self._names[i], self._payloads[i], round(score, 4)) for score, i in scored[:k]]
@@ -0,0 +1,300 @@
+"""Persistent file-name index for user-approved folders.
+
+Each allowed root gets a name -> paths map that is refreshed incrementally:
+only directories whose mtime changed since the last pass are re-listed.
+The index is persisted under ``data/file_index`` so restarts start warm, and
+a background thread keeps it current so lookups never walk the filesystem.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import SETTINGS
+from .fuzzy import TrigramIndex
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+INDEX_DIR = BASE_DIR / "data" / "file_index"
+
+_INDEX_FORMAT_VERSION = 1
+_SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache"}
+_GLOB_CHARS = set("*?[")
+
+# rel dir -> (mtime_ns, file names, sub-directory names)
+DirListing = Tuple[int, List[str], List[str]]
+
+
+def _store_path_for(root: Path) -> Path:
+    digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:16]
+    return INDEX_DIR / f"{digest}.json"
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+class FileIndex:
+    """Name-to-paths index for a single allowed root folder."""
+
+    def __init__(self, root: Path, store_path: Optional[Path] = None) -> None:
+        self.root = root
+        self.store_path = store_path or _store_path_for(root)
+        self._dirs: Dict[str, DirListing] = {}
+        self._names: Dict[str, List[str]] = {}
+        self._fuzzy: Optional[TrigramIndex] = None
+        self._refresh_lock = threading.Lock()
+        self._fuzzy_lock = threading.Lock()
+        self.ready = False
+
+    def load(self) -> bool:
+        """Load a previously persisted index; returns True when one was found."""
+        try:
+            payload = json.loads(self.store_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+
+        if payload.get("version") != _INDEX_FORMAT_VERSION or payload.get("root") != str(self.root):
+            return False
+
+        dirs = {
+            rel: (int(entry[0]), list(entry[1]), list(entry[2]))
+            for rel, entry in payload.get("dirs", {}).items()
+        }
+        self._swap(dirs)
+        return True
+
+    def save(self) -> None:
+        payload = {
+            "version": _INDEX_FORMAT_VERSION,
+            "root": str(self.root),
+            "dirs": self._dirs,
+        }
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.store_path)
+
+    def refresh(self) -> bool:
+        """Re-list directories whose mtime changed; returns True if the index changed."""
+        with self._refresh_lock:
+            previous = self._dirs
+            current: Dict[str, DirListing] = {}
+            changed = False
+            pending = [""]
+
+            while pending:
+                rel_dir = pending.pop()
+                abs_dir = os.path.join(self.root, rel_dir) if rel_dir else str(self.root)
+                try:
+                    mtime_ns = os.stat(abs_dir).st_mtime_ns
+                except OSError:
+                    changed = True
+                    continue
+
+                listing = previous.get(rel_dir)
+                if listing is None or listing[0] != mtime_ns:
+                    listing = self._scan_dir(abs_dir, mtime_ns)
+                    changed = True
+
+                current[rel_dir] = listing
+                pending.extend(_join(rel_dir, sub) for sub in listing[2])
+
+            if len(current) != len(previous):
+                changed = True
+
+            if changed or not self.ready:
+                self._swap(current)
+                self.save()
+            return changed
+
+    def find(self, query: str) -> List[Path]:
+        """Return indexed paths matching a file name, relative path, or glob pattern."""
+        normalized = query.strip().replace("\\", "/").strip("/").lower()
+        if not normalized:
+            return []
+
+        names = self._names
+        if _GLOB_CHARS & set(normalized):
+            if "/" in normalized:
+                rel_paths = [
+                    rel for paths in names.values() for rel in paths if fnmatch.fnmatchcase(rel.lower(), normalized)
+                ]
+            else:
+                rel_paths = [
+                    rel for name in fnmatch.filter(names.keys(), normalized) for rel in names[name]
+                ]
+        else:
+            rel_paths = list(names.get(normalized.rsplit("/", 1)[-1], ()))
+            if "/" in normalized:
+                rel_paths = [
+                    rel for rel in rel_paths if rel.lower() == normalized or rel.lower().endswith("/" + normalized)
+                ]
+
+        rel_paths.sort(key=lambda rel: (rel.count("/"), rel))
+        return [self.root / rel for rel in rel_paths]
+
+    def fuzzy(self) -> TrigramIndex:
+        """Return the trigram index for the current names, building it on first use."""
+        fuzzy = self._fuzzy
+        if fuzzy is not None:
+            return fuzzy
+        with self._fuzzy_lock:
+            if self._fuzzy is None:
+                fuzzy = TrigramIndex(max_entries=SETTINGS.file_fuzzy_max_entries)
+                fuzzy.build(self._names.items())
+                self._fuzzy = fuzzy
+            return self._fuzzy
+
+    def fuzzy_find(self, query: str, k: int = 5) -> List[Tuple[Path, float]]:
+        """Return up to ``k`` ``(path, score)`` candidates for a loosely spoken name."""
+        candidates: List[Tuple[Path, float]] = []
+        for _name, rel_paths, score in self.fuzzy().search(query, k=k):
+            for rel in sorted(rel_paths, key=lambda rel: (rel.count("/"), rel)):
+                candidates.append((self.root / rel, score))
+        return candidates[:k]
+
+    def _scan_dir(self, abs_dir: str, mtime_ns: int) -> DirListing:
+        files: List[str] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(abs_dir) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if entry.name not in _SKIP_DIRS:
+                            subdirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            pass
+        return mtime_ns, files, subdirs
+
+    def _swap(self, dirs: Dict[str, DirListing]) -> None:
+        names: Dict[str, List[str]] = {}
+        for rel_dir, (_mtime, files, subdirs) in dirs.items():
+            for name in files:
+                names.setdefault(name.lower(), []).append(_join(rel_dir, name))
+            for name in subdirs:
+                names.setdefault(name.lower(), []).append(_join(rel_dir, name))
+        # Readers use whichever maps are current; rebinding keeps lookups lock-free.
+        self._dirs = dirs
+        self._names = names
+        self._fuzzy = None
+        self.ready = True
+
+
+class FileIndexRegistry:
+    """Tracks one :class:`FileIndex` per allowed root and refreshes them in the background."""
+
+    def __init__(self) -> None:
+        self._indexes: Dict[Path, FileIndex] = {}
+        self._lock = threading.Lock()
+        self._refreshing: set[Path] = set()
+        self._worker_started = False
+
+    def _index(self, root: Path) -> FileIndex:
+        with self._lock:
+            index = self._indexes.get(root)
+            if index is None:
+                index = FileIndex(root)
+                self._indexes[root] = index
+                index.load()
+        return index
+
+    def get(self, root: Path) -> FileIndex:
+        """Return the persisted (or, for a brand-new root, empty) index for ``root``.
+
+        Lookups never walk the filesystem: a root with nothing persisted is
+        built once on a background thread and is empty until then.
+        """
+        index = self._index(root)
+        if not index.ready:
+            self.refresh_in_background([root])
+        return index
+
+    def find(self, roots: Iterable[Path], query: str) -> List[Path]:
+        matches: List[Path] = []
+        for root in roots:
+            matches.extend(self.get(root).find(query))
+        return matches
+
+    def fuzzy_find(self, roots: Iterable[Path], query: str, k: int = 5) -> List[Tuple[Path, float]]:
+        """Return the top ``k`` fuzzy candidates across ``roots``, best score first."""
+        candidates: List[Tuple[Path, float]] = []
+        for root in roots:
+            candidates.extend(self.get(root).fuzzy_find(query, k=k))
+        candidates.sort(key=lambda item: -item[1])
+        return candidates[:k]
+
+    def refresh_all(self, roots: Iterable[Path]) -> None:
+        for root in roots:
+            if not root.is_dir():
+                continue
+            try:
+                index = self._index(root)
+                index.refresh()
+                index.fuzzy()
+            except OSError:
+                continue
+
+    def refresh_in_background(self, roots: Iterable[Path]) -> None:
+        """Refresh ``roots`` on a daemon thread, skipping any already being refreshed that way."""
+        with self._lock:
+            pending = [root for root in roots if root not in self._refreshing]
+            self._refreshing.update(pending)
+        if not pending:
+            return
+
+        def _run() -> None:
+            try:
+                self.refresh_all(pending)
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(pending)
+
+        threading.Thread(target=_run, name="file-indexer-warmup", daemon=True).start()
+
+    def prune(self, roots: Iterable[Path]) -> int:
+        """Forget indexes, in memory and on disk, of roots no longer in ``roots``; returns files deleted."""
+        keep = {_store_path_for(root) for root in roots}
+        with self._lock:
+            for root in [root for root, index in self._indexes.items() if index.store_path not in keep]:
+                del self._indexes[root]
+        deleted = 0
+        for path in INDEX_DIR.glob("*.json"):
+            if path not in keep:
+                path.unlink(missing_ok=True)
+                deleted += 1
+        return deleted
+
+    def start(self, roots_provider: Callable[[], Iterable[Path]], interval_seconds: float) -> None:
+        """Start the background refresher once per process."""
+        if self._worker_started:
+            return
+
+        def _loop() -> None:
+            while True:
+                try:
+                    roots = list(roots_provider())
+                    self.prune(roots)
+                    self.refresh_all(roots)
+                except Exception:  # noqa: BLE001
+                    pass
+                time.sleep(interval_seconds)
+
+        thread = threading.Thread(target=_loop, name="file-indexer", daemon=True)
+        thread.start()
+        self._worker_started = True
+
+
+FILE_INDEXES = FileIndexRegistry()
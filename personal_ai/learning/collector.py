@@ -1,30 +1,89 @@
 import csv
 import re
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import IO, Callable, Iterator, List, Optional
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 AUTO_DATA_PATH = BASE_DIR / "data" / "auto_intents.csv"
 FIELDNAMES = ["text", "intent", "confidence", "source", "timestamp"]
 
+SampleListener = Callable[[str, str, float, str], None]
+_listeners: List[SampleListener] = []
+_write_lock = threading.Lock()
+
+
+def _lock_file(handle: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        handle.seek(0)
+        while True:
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten seconds; keep waiting.
+                continue
+    else:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(handle: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def write_lock(csv_path: Optional[Path] = None) -> Iterator[None]:
+    """Exclusive access to the auto-learn CSV, across threads and processes.
+
+    The assistant appends samples while compaction may run from the CLI or
+    the retrain scheduler, so a lock file next to the CSV is held as well.
+    """
+    csv_path = csv_path or AUTO_DATA_PATH
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    with _write_lock, csv_path.with_name(csv_path.name + ".lock").open("a+b") as handle:
+        _lock_file(handle)
+        try:
+            yield
+        finally:
+            _unlock_file(handle)
+
 def _normalize(text: str) -> str:
     text = text.lower().strip()
     text = re.sub(r"[^a-z0-9\s]", " ", text)
     text = re.sub(r"\s+", " ", text).strip()
     return text
 
+def _normalize_intent(intent: str) -> str:
+    # Intent labels are identifiers like "open_app"; spoken corrections may say "open app".
+    return "_".join(_normalize(intent).split())
+
+def add_sample_listener(listener: SampleListener) -> None:
+    """Register a callback invoked with ``(text, intent, confidence, source)`` for each logged sample."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
 def log_sample(text: str, intent: str, confidence: float, source: str = "auto") -> None:
     text = _normalize(text or "")
-    intent = _normalize(intent or "")
+    intent = _normalize_intent(intent or "")
     if not text or not intent:
         return
     if len(text.split()) < 1:
         return
 
-    AUTO_DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    file_exists = AUTO_DATA_PATH.exists()
-
-    with AUTO_DATA_PATH.open("a", newline="", encoding="utf-8") as handle:
+    with write_lock(), AUTO_DATA_PATH.open("a", newline="", encoding="utf-8") as handle:
+        file_exists = handle.tell() > 0
         writer = csv.DictWriter(handle, fieldnames=FIELDNAMES)
         if not file_exists:
             writer.writeheader()
@@ -37,3 +96,6 @@ def log_sample(text: str, intent: str, confidence: float, source: str = "auto")
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
         )
+
+    for listener in list(_listeners):
+        listener(text, intent, confidence, source)
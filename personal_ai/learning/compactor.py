@@ -0,0 +1,229 @@
+"""Compaction of the auto-learn CSV into a deduplicated ``.npz`` store.
+
+``log_sample`` appends one CSV row per accepted command, so the same phrase
+is often stored many times. Compaction folds the CSV into
+``auto_intents.npz``: one row per normalized (text, intent) pair, with an
+occurrence count, the highest confidence seen and the last timestamp. Each
+intent is capped at ``AUTO_LEARN_MAX_PER_INTENT`` rows, keeping the most
+frequent and most recent ones. The compacted rows are removed from the CSV.
+Rows appended while compaction runs are kept.
+
+Training streams both files through
+:func:`~personal_ai.learning.data_loader.iter_training_chunks`; the
+evaluator reads them whole through :func:`load_auto_samples`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from personal_ai.core.config import SETTINGS
+
+from . import collector
+from .data_loader import normalize_series
+from .trainer import AUTO_DATA_PATH
+
+_CHUNK_ROWS = 50_000
+_SCAN_BYTES = 1 << 16
+_COLUMNS = ("text", "intent", "count", "confidence", "last_seen")
+
+
+@dataclass
+class CompactionReport:
+    csv_rows: int
+    stored_rows: int
+    dropped_rows: int
+    csv_bytes_before: int
+    store_bytes: int
+
+
+def store_path_for(csv_path: Path) -> Path:
+    return csv_path.with_suffix(".npz")
+
+
+def read_store(store_path: Path) -> pd.DataFrame:
+    """Rows of a compacted store, with the columns in ``_COLUMNS``; empty if there is none yet."""
+    if not store_path.exists():
+        return pd.DataFrame({column: [] for column in _COLUMNS})
+    with np.load(store_path, allow_pickle=False) as data:
+        return pd.DataFrame({column: data[column] for column in _COLUMNS})
+
+
+def _write_store(store_path: Path, df: pd.DataFrame) -> None:
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_name(store_path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        np.savez_compressed(
+            handle,
+            text=df["text"].to_numpy(dtype=str),
+            intent=df["intent"].to_numpy(dtype=str),
+            count=df["count"].to_numpy(dtype=np.int64),
+            confidence=df["confidence"].to_numpy(dtype=np.float32),
+            last_seen=df["last_seen"].to_numpy(dtype=str),
+        )
+    os.replace(tmp_path, store_path)
+
+
+class _Prefix(io.RawIOBase):
+    """The first ``limit`` bytes of ``handle``, read lazily."""
+
+    def __init__(self, handle: IO[bytes], limit: int) -> None:
+        self._handle = handle
+        self._left = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._left)
+        if size <= 0:
+            return 0
+        read = self._handle.readinto(memoryview(buffer)[:size])
+        self._left -= read
+        return read
+
+
+def _complete_rows_end(handle: IO[bytes]) -> int:
+    """Offset just past the last newline, scanning back from the end of the file."""
+    position = handle.seek(0, os.SEEK_END)
+    while position > 0:
+        start = max(0, position - _SCAN_BYTES)
+        handle.seek(start)
+        newline = handle.read(position - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def _read_csv_rows(csv_path: Path) -> Tuple[pd.DataFrame, int, int]:
+    """Aggregate the complete rows of the CSV; returns the groups, the raw row count and bytes consumed."""
+    empty = pd.DataFrame({column: [] for column in _COLUMNS})
+    if not csv_path.exists():
+        return empty, 0, 0
+
+    groups: List[pd.DataFrame] = []
+    rows = 0
+    with csv_path.open("rb") as handle:
+        # Only whole rows: a concurrent append may have left a partial last line.
+        end = _complete_rows_end(handle)
+        if not end:
+            return empty, 0, 0
+        handle.seek(0)
+        rows_only = io.BufferedReader(_Prefix(handle, end))
+        for chunk in pd.read_csv(rows_only, chunksize=_CHUNK_ROWS, dtype=str, keep_default_na=False):
+            if not {"text", "intent"}.issubset(chunk.columns):
+                break
+            rows += len(chunk)
+            chunk = chunk.assign(
+                text=normalize_series(chunk["text"]),
+                intent=chunk["intent"].str.strip(),
+                confidence=pd.to_numeric(chunk.get("confidence", "1"), errors="coerce").fillna(0.0),
+                last_seen=chunk.get("timestamp", ""),
+                count=1,
+            )
+            chunk = chunk[(chunk["text"] != "") & (chunk["intent"] != "")]
+            groups.append(_aggregate(chunk[list(_COLUMNS)]))
+    return (pd.concat(groups, ignore_index=True) if groups else empty), rows, end
+
+
+def _aggregate(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(["text", "intent"], as_index=False, sort=False).agg(
+        count=("count", "sum"), confidence=("confidence", "max"), last_seen=("last_seen", "max")
+    )
+
+
+def _cap_per_intent(df: pd.DataFrame, max_per_intent: int) -> pd.DataFrame:
+    if max_per_intent <= 0:
+        return df
+    ranked = df.sort_values(["intent", "count", "last_seen"], ascending=[True, False, False])
+    return ranked.groupby("intent", sort=False).head(max_per_intent).reset_index(drop=True)
+
+
+def _truncate_csv(csv_path: Path, consumed: int) -> None:
+    """Drop the first ``consumed`` bytes of rows, keeping the header and anything appended since."""
+    # The assistant may be appending from another process; hold its lock until the swap.
+    with collector.write_lock(csv_path):
+        with csv_path.open("rb") as handle:
+            handle.seek(consumed)
+            tail = handle.read()
+        tmp_path = csv_path.with_name(csv_path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            if tail:
+                header = io.StringIO()
+                csv.writer(header, lineterminator="\r\n").writerow(collector.FIELDNAMES)
+                handle.write(header.getvalue().encode("utf-8"))
+                handle.write(tail)
+        os.replace(tmp_path, csv_path)
+
+
+def compact_auto_samples(
+    csv_path: Path | None = None,
+    max_per_intent: int | None = None,
+) -> CompactionReport:
+    """Fold ``csv_path`` into its ``.npz`` store and trim the compacted rows from the CSV."""
+    csv_path = csv_path or AUTO_DATA_PATH
+    store_path = store_path_for(csv_path)
+    max_per_intent = SETTINGS.auto_learn_max_per_intent if max_per_intent is None else max_per_intent
+
+    fresh, csv_rows, end = _read_csv_rows(csv_path)
+    combined = pd.concat([read_store(store_path), fresh], ignore_index=True)
+    aggregated = _aggregate(combined) if len(combined) else combined
+    kept = _cap_per_intent(aggregated, max_per_intent)
+
+    _write_store(store_path, kept)
+    if end:
+        _truncate_csv(csv_path, end)
+
+    return CompactionReport(
+        csv_rows=csv_rows,
+        stored_rows=len(kept),
+        dropped_rows=len(aggregated) - len(kept),
+        csv_bytes_before=end,
+        store_bytes=store_path.stat().st_size,
+    )
+
+
+def load_auto_samples(csv_path: Path | None = None, min_conf: float | None = None) -> pd.DataFrame:
+    """Auto-learned ``text``/``intent`` rows from the compacted store plus the uncompacted CSV."""
+    csv_path = csv_path or AUTO_DATA_PATH
+    min_conf = SETTINGS.auto_learn_min_conf if min_conf is None else min_conf
+    frames = []
+
+    store = read_store(store_path_for(csv_path))
+    frames.append(store.loc[store["confidence"] >= min_conf, ["text", "intent"]])
+
+    if csv_path.exists() and csv_path.stat().st_size:
+        auto_df = pd.read_csv(csv_path)
+        if {"text", "intent"}.issubset(auto_df.columns):
+            if "confidence" in auto_df.columns:
+                auto_df = auto_df[auto_df["confidence"].astype(float) >= min_conf]
+            frames.append(auto_df[["text", "intent"]])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact auto-learned samples into a deduplicated store.")
+    parser.add_argument("--max-per-intent", type=int, help="Override AUTO_LEARN_MAX_PER_INTENT.")
+    args = parser.parse_args()
+
+    report = compact_auto_samples(max_per_intent=args.max_per_intent)
+    for key, value in asdict(report).items():
+        print(f"- {key}: {value}")
+    counts = read_store(store_path_for(AUTO_DATA_PATH)).groupby("intent")["count"].sum()
+    for intent, count in counts.items():
+        print(f"  {intent}: {int(count)} samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Feature pruning and coefficient quantization for the intent model.
+
+The char n-gram vocabulary dominates model size and the cost of the sparse
+dot product in ``predict_proba``. :func:`compress_model` keeps the
+``max_features`` columns with the highest chi2 score against the labels. It
+rebuilds each vectorizer with only its kept terms and idf weights, then refits
+the classifier on the reduced features. The classifier's coefficients are
+finally stored as int8 (with one scale per class) or float16.
+
+The result is a :class:`CompressedIntentModel`, which has the
+``predict``/``predict_proba``/``classes_`` surface of the trained pipeline
+but cannot be fitted again.
+"""
+
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Sequence, Tuple
+
+import joblib
+import numpy as np
+from scipy.special import expit, softmax
+from sklearn.base import clone
+from sklearn.feature_selection import chi2
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import FeatureUnion, Pipeline
+
+from .trainer import DatasetSplit, _evaluate_model
+
+QUANTIZATION_DTYPES = ("int8", "float16")
+
+
+class QuantizedLinearClassifier:
+    """Inference-only linear classifier with int8 or float16 coefficients.
+
+    Built from a fitted model with :meth:`from_linear`; it cannot be fitted
+    itself, so it is not a scikit-learn estimator. It only predicts, as the
+    last step of a fitted pipeline. Probabilities follow the source logistic
+    regression: softmax over classes, or a sigmoid for two classes.
+    """
+
+    def __init__(self, dtype: str = "int8") -> None:
+        self.dtype = dtype
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(dtype={self.dtype!r})"
+
+    @classmethod
+    def from_linear(cls, clf: LogisticRegression, dtype: str = "int8") -> "QuantizedLinearClassifier":
+        if dtype not in QUANTIZATION_DTYPES:
+            raise ValueError(f"Unsupported quantization dtype: {dtype!r}; use one of {', '.join(QUANTIZATION_DTYPES)}")
+        model = cls(dtype=dtype)
+        coef = np.asarray(clf.coef_, dtype=np.float64)
+        if dtype == "int8":
+            scale = np.abs(coef).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            model.coef_q_ = np.round(coef / scale[:, None]).astype(np.int8)
+            model.scale_ = scale.astype(np.float32)
+        else:
+            model.coef_q_ = coef.astype(np.float16)
+            model.scale_ = None
+        model.intercept_ = np.asarray(clf.intercept_, dtype=np.float32)
+        model.classes_ = clf.classes_
+        return model
+
+    def _weights(self) -> np.ndarray:
+        # Dequantized once per process; not pickled, so the stored artifact stays small.
+        weights = self.__dict__.get("_weights_cache")
+        if weights is None:
+            weights = self.coef_q_.astype(np.float32)
+            if self.scale_ is not None:
+                weights *= self.scale_[:, None]
+            weights = np.ascontiguousarray(weights.T)
+            self.__dict__["_weights_cache"] = weights
+        return weights
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state.pop("_weights_cache", None)
+        return state
+
+    def decision_function(self, X) -> np.ndarray:
+        scores = np.asarray(X @ self._weights()) + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            positive = expit(scores)
+            return np.column_stack([1.0 - positive, positive])
+        return softmax(scores, axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class CompressedIntentModel:
+    """Pruned vectorizers + quantized classifier with the ``predict_proba``/``classes_`` surface."""
+
+    def __init__(self, features: FeatureUnion, clf: QuantizedLinearClassifier) -> None:
+        self.features = features
+        self.clf = clf
+
+    @property
+    def named_steps(self) -> Dict[str, object]:
+        return {"features": self.features, "clf": self.clf}
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.clf.classes_
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self.clf.predict_proba(self.features.transform(texts))
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.clf.predict(self.features.transform(texts))
+
+
+def _select_columns(X, y, max_features: int) -> np.ndarray:
+    if X.shape[1] <= max_features:
+        return np.arange(X.shape[1])
+    scores, _pvalues = chi2(X, y)
+    scores = np.nan_to_num(scores, nan=0.0)
+    return np.sort(np.argpartition(-scores, max_features - 1)[:max_features])
+
+
+def _prune_features(features: FeatureUnion, keep: np.ndarray) -> FeatureUnion:
+    """Copy of ``features`` whose vectorizers only know the kept columns."""
+    pruned = clone(features)
+    offset = 0
+    for (_name, fitted), (_same, vectorizer) in zip(features.transformer_list, pruned.transformer_list):
+        size = len(fitted.vocabulary_)
+        local = keep[(keep >= offset) & (keep < offset + size)] - offset
+        terms = np.empty(size, dtype=object)
+        for term, idx in fitted.vocabulary_.items():
+            terms[idx] = term
+        vectorizer.vocabulary_ = {term: new for new, term in enumerate(terms[local])}
+        vectorizer.idf_ = fitted.idf_[local]
+        offset += size
+    return pruned
+
+
+def _artifact_size(model) -> int:
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
+
+
+@dataclass
+class CompressionReport:
+    dtype: str
+    max_features: int
+    original: Dict[str, float] = field(default_factory=dict)
+    compressed: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _profile(model: "Pipeline | CompressedIntentModel", split: DatasetSplit) -> Dict[str, float]:
+    from .evaluator import measure_latency
+
+    result = _evaluate_model(model, split.X_test, split.y_test)
+    start = time.perf_counter()
+    size = _artifact_size(model)
+    dump_seconds = time.perf_counter() - start
+    latency = measure_latency(model, split.X_test.tolist())
+    features = model.named_steps["features"]
+    return {
+        "accuracy": result.accuracy,
+        "f1_macro": result.f1_macro,
+        "n_features": sum(len(vec.vocabulary_) for _name, vec in features.transformer_list),
+        "size_bytes": size,
+        "dump_seconds": round(dump_seconds, 4),
+        "single_p50_ms": latency.get("single_p50", 0.0),
+        "single_p99_ms": latency.get("single_p99", 0.0),
+        "batch_per_item_ms": latency.get("batch_per_item", 0.0),
+    }
+
+
+def compress_model(
+    model: Pipeline, split: DatasetSplit, max_features: int, dtype: str = "int8"
+) -> Tuple[CompressedIntentModel, CompressionReport]:
+    """Prune ``model`` to ``max_features`` columns, refit and quantize; report both versions."""
+    features = model.named_steps["features"]
+    clf = model.named_steps["clf"]
+    X_train = features.transform(split.X_train)
+
+    keep = _select_columns(X_train, split.y_train, max_features)
+    pruned = _prune_features(features, keep)
+    refit = clone(clf)
+    refit.fit(pruned.transform(split.X_train), split.y_train)
+    compressed = CompressedIntentModel(pruned, QuantizedLinearClassifier.from_linear(refit, dtype=dtype))
+
+    report = CompressionReport(
+        dtype=dtype,
+        max_features=max_features,
+        original=_profile(model, split),
+        compressed=_profile(compressed, split),
+    )
+    return compressed, report
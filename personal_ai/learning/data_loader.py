@@ -0,0 +1,236 @@
+"""Streaming, memory-bounded loader for intent training data.
+
+CSV files are read in chunks and normalized with vectorized string
+operations, so no file is ever held in memory whole. Rows are kept in one
+reservoir per intent. A row's estimated size is its text plus the sparse
+features training builds from it: an upper bound on its word and char
+n-grams, times the number of feature matrices alive at once (the TF-IDF
+matrix and its counts, the feature cache, one pair per search worker).
+While the kept rows stay under ``TRAIN_MEMORY_LIMIT_MB`` every unique row
+is kept. Past the limit,
+each intent keeps a uniform random sample of its rows (reservoir sampling),
+and all intents get the same share of the budget. ``0`` means no limit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from personal_ai.core.config import SETTINGS
+
+CHUNK_ROWS = 50_000
+# Tuple, list slot and set entry per kept row, on top of the text itself.
+_ROW_OVERHEAD_BYTES = 160
+# Shrink below the ceiling so one new row does not trigger another resample.
+_SHRINK_TARGET = 0.9
+# Per nonzero of a sparse feature matrix: a float64 value and an int32 column index.
+_NNZ_BYTES = 12
+# The TF-IDF training matrix and the count matrix it is computed from.
+DEFAULT_FEATURE_COPIES = 2
+
+
+def normalize_series(texts: pd.Series) -> pd.Series:
+    """Vectorized equivalent of ``trainer._normalize``: runs of non-alphanumerics become one space."""
+    return texts.astype(str).str.lower().str.replace(r"[\W_]+", " ", regex=True).str.strip()
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Order-independent hash of the ``text``/``intent`` rows; equal fingerprints train equal models."""
+    rows = df[["text", "intent"]].sort_values(["text", "intent"], kind="stable")
+    digest = hashlib.sha256(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def estimated_nnz(text: str, word_ngram_range: Tuple[int, int], char_ngram_range: Tuple[int, int]) -> int:
+    """Upper bound on the nonzeros one normalized row adds to a word plus char n-gram matrix."""
+    words = len(text.split())
+    chars = len(text)
+    word = sum(max(0, words - n + 1) for n in range(word_ngram_range[0], word_ngram_range[1] + 1))
+    char = sum(max(0, chars - n + 1) for n in range(char_ngram_range[0], char_ngram_range[1] + 1))
+    return word + char
+
+
+def iter_csv_chunks(path: Path, min_conf: Optional[float] = None, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield normalized ``text``/``intent`` chunks, dropping rows below ``min_conf`` when a confidence column exists."""
+    if not path.exists() or not path.stat().st_size:
+        return
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if not {"text", "intent"}.issubset(chunk.columns):
+            return
+        if min_conf is not None and "confidence" in chunk.columns:
+            chunk = chunk[pd.to_numeric(chunk["confidence"], errors="coerce") >= min_conf]
+        chunk = chunk.dropna(subset=["text", "intent"])
+        yield pd.DataFrame({"text": normalize_series(chunk["text"]), "intent": chunk["intent"].astype(str).str.strip()})
+
+
+def iter_training_chunks(data_path: Path, auto_path: Path, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Base dataset, then the compacted auto-learn store, then the uncompacted auto-learn CSV."""
+    from .compactor import read_store, store_path_for
+
+    yield from iter_csv_chunks(data_path, chunksize=chunksize)
+
+    store = read_store(store_path_for(auto_path))
+    store = store[store["confidence"] >= SETTINGS.auto_learn_min_conf]
+    if len(store):
+        yield pd.DataFrame({"text": normalize_series(store["text"]), "intent": store["intent"].astype(str)})
+
+    yield from iter_csv_chunks(auto_path, min_conf=SETTINGS.auto_learn_min_conf, chunksize=chunksize)
+
+
+@dataclass
+class LoadReport:
+    rows_read: int = 0
+    rows_kept: int = 0
+    duplicates: int = 0
+    memory_limit_mb: float = 0.0
+    feature_copies: int = DEFAULT_FEATURE_COPIES
+    estimated_mb: float = 0.0
+    peak_estimated_mb: float = 0.0
+    sampled: bool = False
+    per_intent_seen: Dict[str, int] = field(default_factory=dict)
+    per_intent_kept: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_kept": self.rows_kept,
+            "duplicates": self.duplicates,
+            "memory_limit_mb": self.memory_limit_mb,
+            "feature_copies": self.feature_copies,
+            "estimated_mb": round(self.estimated_mb, 3),
+            "peak_estimated_mb": round(self.peak_estimated_mb, 3),
+            "sampled": self.sampled,
+            "per_intent_seen": dict(self.per_intent_seen),
+            "per_intent_kept": dict(self.per_intent_kept),
+        }
+
+
+class _Reservoir:
+    """Unique rows for one intent; uniform sample of size ``capacity`` once one is set."""
+
+    __slots__ = ("rows", "texts", "seen", "bytes", "capacity", "row_bytes")
+
+    def __init__(self, row_bytes: Callable[[str], int]) -> None:
+        self.row_bytes = row_bytes
+        self.rows: List[Tuple[int, str]] = []
+        self.texts: set[str] = set()
+        self.seen = 0
+        self.bytes = 0
+        self.capacity: Optional[int] = None
+
+    def offer(self, order: int, text: str, rng: random.Random) -> Optional[int]:
+        """Consider one row; returns the change in estimated bytes, or ``None`` for a duplicate."""
+        if text in self.texts:
+            return None
+        self.seen += 1
+        size = self.row_bytes(text)
+        if self.capacity is None or len(self.rows) < self.capacity:
+            self.rows.append((order, text))
+            self.texts.add(text)
+            self.bytes += size
+            return size
+        slot = rng.randrange(self.seen)
+        if slot >= self.capacity:
+            return 0
+        _old_order, old_text = self.rows[slot]
+        self.texts.discard(old_text)
+        self.rows[slot] = (order, text)
+        self.texts.add(text)
+        delta = size - self.row_bytes(old_text)
+        self.bytes += delta
+        return delta
+
+    def shrink(self, capacity: int, rng: random.Random) -> int:
+        """Downsample to ``capacity`` rows; a random subset of a uniform sample is still uniform."""
+        self.capacity = capacity
+        if len(self.rows) <= capacity:
+            return 0
+        keep = rng.sample(self.rows, capacity)
+        before = self.bytes
+        self.rows = keep
+        self.texts = {text for _order, text in keep}
+        self.bytes = sum(self.row_bytes(text) for _order, text in keep)
+        return self.bytes - before
+
+
+def load_training_data(
+    data_path: Path,
+    auto_path: Path,
+    memory_limit_mb: Optional[float] = None,
+    chunksize: int = CHUNK_ROWS,
+    feature_copies: int = DEFAULT_FEATURE_COPIES,
+) -> Tuple[pd.DataFrame, LoadReport]:
+    """Stream, normalize and dedupe training rows within the memory ceiling.
+
+    The ceiling covers each kept row's text and its share of
+    ``feature_copies`` sparse feature matrices. Returns the rows in file
+    order, as ``text``/``intent`` columns, with a report of what was read,
+    kept and sampled.
+    """
+    from .trainer import DEFAULT_MODEL_CONFIG
+
+    features = DEFAULT_MODEL_CONFIG.features
+    feature_row_bytes = max(0, feature_copies) * _NNZ_BYTES
+
+    def row_bytes(text: str) -> int:
+        nnz = estimated_nnz(text, features.word_ngram_range, features.char_ngram_range)
+        return sys.getsizeof(text) + _ROW_OVERHEAD_BYTES + nnz * feature_row_bytes
+
+    limit_mb = SETTINGS.train_memory_limit_mb if memory_limit_mb is None else memory_limit_mb
+    limit_bytes = int(limit_mb * 1024 * 1024)
+    report = LoadReport(memory_limit_mb=limit_mb, feature_copies=feature_copies)
+    rng = random.Random(SETTINGS.model_random_state)
+    reservoirs: Dict[str, _Reservoir] = {}
+    total_bytes = 0
+    order = 0
+
+    for chunk in iter_training_chunks(data_path, auto_path, chunksize):
+        for text, intent in zip(chunk["text"].tolist(), chunk["intent"].tolist()):
+            report.rows_read += 1
+            if not text or not intent:
+                continue
+            reservoir = reservoirs.get(intent)
+            if reservoir is None:
+                reservoir = reservoirs[intent] = _Reservoir(row_bytes)
+                if report.sampled:
+                    reservoir.capacity = _per_intent_capacity(limit_bytes, reservoirs)
+            delta = reservoir.offer(order, text, rng)
+            order += 1
+            if delta is None:
+                report.duplicates += 1
+                continue
+            total_bytes += delta
+            report.peak_estimated_mb = max(report.peak_estimated_mb, total_bytes / (1024 * 1024))
+            if limit_bytes and total_bytes > limit_bytes:
+                report.sampled = True
+                capacity = _per_intent_capacity(limit_bytes, reservoirs)
+                for item in reservoirs.values():
+                    total_bytes += item.shrink(capacity, rng)
+
+    rows = sorted(
+        (row_order, text, intent)
+        for intent, reservoir in reservoirs.items()
+        for row_order, text in reservoir.rows
+    )
+    df = pd.DataFrame(
+        {"text": [text for _o, text, _i in rows], "intent": [intent for _o, _t, intent in rows]},
+        columns=["text", "intent"],
+    )
+    report.rows_kept = len(df)
+    report.estimated_mb = total_bytes / (1024 * 1024)
+    report.per_intent_seen = {intent: item.seen for intent, item in sorted(reservoirs.items())}
+    report.per_intent_kept = {intent: len(item.rows) for intent, item in sorted(reservoirs.items())}
+    return df, report
+
+
+def _per_intent_capacity(limit_bytes: int, reservoirs: Dict[str, _Reservoir]) -> int:
+    rows = sum(len(item.rows) for item in reservoirs.values())
+    row_bytes = sum(item.bytes for item in reservoirs.values()) / max(1, rows)
+    return max(1, int(limit_bytes * _SHRINK_TARGET / max(1.0, row_bytes) / max(1, len(reservoirs))))
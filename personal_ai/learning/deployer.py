@@ -1,18 +1,300 @@
+"""Change-driven retraining.
+
+The scheduler polls the auto-learn CSV for rows appended since the last
+retrain, counting spoken corrections apart from auto-accepted commands. It
+also watches the base dataset for edits. A retrain starts when enough
+corrections or samples have arrived, when the dataset changes, or when new
+data has waited ``RETRAIN_MAX_INTERVAL_SECONDS``. It waits until no new
+rows have arrived for ``RETRAIN_DEBOUNCE_SECONDS``, so a burst of
+corrections produces one run. Runs are at least
+``RETRAIN_MIN_INTERVAL_SECONDS`` apart.
+
+Training runs in a child process at lowered priority, so the assistant
+keeps serving at full speed and the training memory is released when the
+child exits. The child skips training when the deduplicated training rows
+hash to the same fingerprint as the last run.
+
+``RUN_ONCE=1`` compacts and retrains once in-process, then exits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
 import os
+import subprocess
+import sys
+import tempfile
 import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from personal_ai.core.config import SETTINGS
+from personal_ai.core.logging_config import get_logger
+
+from .compactor import compact_auto_samples
+from .trainer import AUTO_DATA_PATH, DATA_PATH, MODEL_DIR, train_and_compare
+
+STATE_PATH = MODEL_DIR / "retrain_state.json"
+# However busy the collector is, a pending retrain waits at most this many debounce windows.
+_MAX_DEBOUNCE_WINDOWS = 5
+
+logger = get_logger(__name__)
+
+TrainingRunner = Callable[[Optional[str]], dict]
+
+
+@dataclass
+class RetrainPolicy:
+    min_samples: int
+    min_corrections: int
+    debounce_seconds: float
+    min_interval_seconds: float
+    max_interval_seconds: float
+    poll_seconds: float
+
+    @classmethod
+    def from_settings(cls) -> "RetrainPolicy":
+        return cls(
+            min_samples=SETTINGS.retrain_min_samples,
+            min_corrections=SETTINGS.retrain_min_corrections,
+            debounce_seconds=SETTINGS.retrain_debounce_seconds,
+            min_interval_seconds=SETTINGS.retrain_min_interval_seconds,
+            max_interval_seconds=SETTINGS.retrain_max_interval_seconds,
+            poll_seconds=SETTINGS.retrain_poll_seconds,
+        )
+
+
+@dataclass
+class RetrainState:
+    """What the last run consumed; persisted so a restarted scheduler recounts only newer rows."""
+
+    fingerprint: Optional[str] = None
+    csv_offset: int = 0
+    dataset_stat: List[int] = field(default_factory=list)
+    last_run_at: Optional[float] = None
+    last_action: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "RetrainState":
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        known = {name: payload[name] for name in cls.__dataclass_fields__ if name in payload}
+        return cls(**known)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(self), indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def _file_stat(path: Path) -> List[int]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return []
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _scan_new_rows(path: Path, offset: int) -> tuple[int, int, int]:
+    """Count complete rows appended after ``offset``; returns ``(samples, corrections, new_offset)``."""
+    size = _file_size(path)
+    if size < offset:
+        # Compacted or replaced since we last looked: everything left in it is new.
+        offset = 0
+    if size == offset:
+        return 0, 0, offset
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        data = handle.read(size - offset)
+    end = data.rfind(b"\n") + 1
+    if not end:
+        return 0, 0, offset
+    samples = corrections = 0
+    for row in csv.reader(io.StringIO(data[:end].decode("utf-8", errors="replace"))):
+        if len(row) < 4 or row[0] == "text":
+            continue
+        if row[3] == "corrected":
+            corrections += 1
+        else:
+            samples += 1
+    return samples, corrections, offset + end
+
+
+def _lower_priority(nice: int) -> None:
+    if nice > 0 and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+def run_training_subprocess(previous_fingerprint: Optional[str]) -> dict:
+    """Retrain in a low-priority child process and return its result."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = Path(tmp_dir) / "result.json"
+        command = [sys.executable, "-m", "personal_ai.learning.deployer", "--train", "--json-output", str(output)]
+        if previous_fingerprint:
+            command += ["--previous-fingerprint", previous_fingerprint]
+        kwargs: dict = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+        completed = subprocess.run(command, check=False, **kwargs)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Training process exited with code {completed.returncode}")
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+class RetrainScheduler:
+    """Decides when to retrain from new collector rows and dataset edits."""
+
+    def __init__(
+        self,
+        policy: Optional[RetrainPolicy] = None,
+        state_path: Path = STATE_PATH,
+        data_path: Path = DATA_PATH,
+        auto_path: Path = AUTO_DATA_PATH,
+        runner: TrainingRunner = run_training_subprocess,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.policy = policy or RetrainPolicy.from_settings()
+        self.state_path = state_path
+        self.data_path = data_path
+        self.auto_path = auto_path
+        self.runner = runner
+        self.clock = clock
+        self.state = RetrainState.load(state_path)
+        self._offset = self.state.csv_offset
+        self.pending_samples = 0
+        self.pending_corrections = 0
+        self._first_change_at: Optional[float] = None
+        self._last_change_at: Optional[float] = None
+
+    @property
+    def dataset_changed(self) -> bool:
+        return _file_stat(self.data_path) != self.state.dataset_stat
+
+    def poll(self) -> None:
+        """Pick up rows appended to the auto-learn CSV since the last poll."""
+        samples, corrections, self._offset = _scan_new_rows(self.auto_path, self._offset)
+        self.pending_samples += samples
+        self.pending_corrections += corrections
+        if samples or corrections or (self.dataset_changed and self._last_change_at is None):
+            now = self.clock()
+            self._last_change_at = now
+            if self._first_change_at is None:
+                self._first_change_at = now
+
+    def due(self) -> Optional[str]:
+        """Why a retrain should start now, or ``None``."""
+        if self._first_change_at is None:
+            return None
+        policy = self.policy
+        now = self.clock()
+        since_run = now - self.state.last_run_at if self.state.last_run_at is not None else float("inf")
+        if since_run < policy.min_interval_seconds:
+            return None
+
+        if self.dataset_changed:
+            reason = "dataset changed"
+        elif policy.min_corrections and self.pending_corrections >= policy.min_corrections:
+            reason = f"{self.pending_corrections} corrections"
+        elif policy.min_samples and self.pending_samples >= policy.min_samples:
+            reason = f"{self.pending_samples} new samples"
+        elif now - self._first_change_at >= policy.max_interval_seconds:
+            reason = "pending data reached max interval"
+        else:
+            return None
+
+        quiet = now - self._last_change_at
+        waited = now - self._first_change_at
+        if quiet < policy.debounce_seconds and waited < policy.debounce_seconds * _MAX_DEBOUNCE_WINDOWS:
+            return None
+        return reason
+
+    def run(self, reason: str) -> dict:
+        """Compact, retrain in the child process and record what was consumed."""
+        logger.info("Retraining: %s", reason)
+        compaction = compact_auto_samples(self.auto_path)
+        offset = _file_size(self.auto_path)
+        dataset_stat = _file_stat(self.data_path)
+        started = self.clock()
+        try:
+            result = self.runner(self.state.fingerprint)
+        except Exception as exc:
+            # Back off for min_interval before trying again; pending counts are kept.
+            logger.error("Retraining failed: %s", exc)
+            self.state.last_run_at = started
+            self.state.last_action = "failed"
+            self.state.save(self.state_path)
+            return {"action": "failed", "reason": reason, "error": str(exc)}
+
+        self.state = RetrainState(
+            fingerprint=result.get("data_fingerprint", self.state.fingerprint),
+            csv_offset=offset,
+            dataset_stat=dataset_stat,
+            last_run_at=started,
+            last_action=result.get("action"),
+        )
+        self.state.save(self.state_path)
+        # Rows appended during compaction were trained on; only later rows are pending.
+        self._offset = offset
+        self.pending_samples = self.pending_corrections = 0
+        self._first_change_at = self._last_change_at = None
+        logger.info("Retraining result: %s", result.get("action"))
+        return {**result, "reason": reason, "compaction": asdict(compaction)}
+
+    def step(self) -> Optional[dict]:
+        self.poll()
+        reason = self.due()
+        return self.run(reason) if reason else None
+
+    def serve_forever(self) -> None:
+        while True:
+            result = self.step()
+            if result is not None:
+                print(f"Retraining result: {result}")
+            time.sleep(self.policy.poll_seconds)
+
+
+def _train_once(previous_fingerprint: Optional[str], json_output: Optional[Path], nice: int) -> None:
+    _lower_priority(nice)
+    result = train_and_compare(previous_fingerprint=previous_fingerprint)
+    if json_output is not None:
+        json_output.write_text(json.dumps(result, default=str), encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Retrain the intent model when its data changes.")
+    parser.add_argument("--train", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json-output", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--previous-fingerprint", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.train:
+        _train_once(args.previous_fingerprint, args.json_output, SETTINGS.retrain_nice)
+        return
 
-from .trainer import train_and_compare
+    if os.getenv("RUN_ONCE", "0").lower() in {"1", "true", "yes"}:
+        print(f"Auto-learn compaction: {compact_auto_samples()}")
+        print(f"Training result: {train_and_compare()}")
+        return
 
-DAY_SECONDS = 24 * 60 * 60
+    RetrainScheduler().serve_forever()
 
-def run_daily_loop() -> None:
-    run_once = os.getenv("RUN_ONCE", "0").lower() in {"1", "true", "yes"}
-    while True:
-        result = train_and_compare()
-        print(f"Daily training result: {result}")
-        if run_once:
-            break
-        time.sleep(DAY_SECONDS)
 
 if __name__ == "__main__":
-    run_daily_loop()
+    main()
@@ -1,22 +1,328 @@
+"""Model evaluation and side-by-side benchmarking.
+
+``evaluate_model`` scores one model on the labelled dataset. The benchmark
+functions compare several model files. Each model is scored in batch on the
+dataset and on :data:`HARD_TEST_CASES`. The benchmark also records
+single-item and batched inference latency, load time, size on disk and the
+change in process RSS from loading it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import pickle
+import sys
+import time
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
 
-from .trainer import _normalize, DATA_PATH
+from .compactor import load_auto_samples
+from .data_loader import normalize_series
+from .trainer import AUTO_DATA_PATH, DATA_PATH, _current_model_path, _registry
+
+LATENCY_SAMPLES = 200
+BATCH_SIZE = 32
 
+HARD_TEST_CASES = [
+    ("yo", "reply"),
+    ("sup", "reply"),
+    ("hello bhai", "reply"),
+    ("hey yaar", "reply"),
+    ("could you please open my browser for me", "open_app"),
+    ("can you start vs code right now", "open_app"),
+    ("i want you to open chrome asap", "open_app"),
+    ("pls launch youtube app", "open_app"),
+    ("i am done with chrome, close it", "close_app"),
+    ("this browser is annoying, quit it", "close_app"),
+    ("can you stop youtube now", "close_app"),
+    ("umm can you maybe search best python scraping libs", "search"),
+    ("bro find me dotnet fresher jobs near rajkot", "search"),
+    ("hey google sql joins example", "search"),
+    ("look something up about entity framework", "search"),
+    ("bro what's the time right now", "time"),
+    ("tell me today's date please yaar", "time"),
+    ("what day is it today actually", "time"),
+    ("opn chorme", "open_app"),
+    ("cls crome", "close_app"),
+    ("serch pythn", "search"),
+    ("wat tym", "time"),
+    ("jok", "joke"),
+    ("make a note of this please", "write_file"),
+    ("can you save this message for me", "write_file"),
+    ("show me whatever i wrote earlier", "read_file"),
+    ("read out my notes", "read_file"),
+    ("open chrome and search python tutorials", "open_app"),
+    ("close youtube and tell me a joke", "close_app"),
+    ("search sql joins then open vs code", "search"),
+    ("i think i'm done here", "exit"),
+    ("you can stop now", "exit"),
+    ("let's end this", "exit"),
+    ("open", "open_app"),
+    ("close", "close_app"),
+    ("search something", "search"),
+    ("do something", "reply"),
+]
 
-def evaluate_model(model_path: Path) -> dict:
+
+def _load_eval_dataset(include_auto: bool = False) -> pd.DataFrame:
     df = pd.read_csv(DATA_PATH)
-    df["text"] = df["text"].astype(str).apply(_normalize)
+    if include_auto:
+        df = pd.concat([df[["text", "intent"]], load_auto_samples(AUTO_DATA_PATH)], ignore_index=True)
+    df["text"] = normalize_series(df["text"])
     df["intent"] = df["intent"].astype(str)
-    model = joblib.load(model_path)
-    pred = model.predict(df["text"])
-    labels = sorted(set(df["intent"]) | set(pred))
+    return df
+
+
+def _score(y_true: Sequence[str], pred: Sequence[str]) -> dict:
+    labels = sorted(set(y_true) | set(pred))
     return {
-        "accuracy": float(accuracy_score(df["intent"], pred)),
-        "f1_macro": float(f1_score(df["intent"], pred, average="macro")),
+        "accuracy": float(accuracy_score(y_true, pred)),
+        "f1_macro": float(f1_score(y_true, pred, average="macro")),
         "labels": labels,
-        "confusion_matrix": confusion_matrix(df["intent"], pred, labels=labels).tolist(),
+        "confusion_matrix": confusion_matrix(y_true, pred, labels=labels).tolist(),
     }
+
+
+def evaluate_model(model_path: Path, include_auto: bool = False) -> dict:
+    df = _load_eval_dataset(include_auto)
+    model = joblib.load(model_path)
+    return _score(df["intent"], model.predict(df["text"]))
+
+
+def hard_case_results(model, cases: Sequence[tuple[str, str]] = HARD_TEST_CASES) -> List[dict]:
+    """Predict every hard case in one batch, lowercased the way the assistant does at runtime."""
+    texts = [text.lower() for text, _expected in cases]
+    probs = model.predict_proba(texts)
+    best = np.argmax(probs, axis=1)
+    return [
+        {
+            "text": text,
+            "expected": expected,
+            "predicted": str(model.classes_[idx]),
+            "confidence": float(row[idx]),
+        }
+        for (text, expected), idx, row in zip(cases, best, probs)
+    ]
+
+
+def measure_latency(model, texts: Sequence[str], batch_size: int = BATCH_SIZE) -> Dict[str, float]:
+    """Single-item and per-batch ``predict_proba`` latency percentiles in milliseconds."""
+    texts = list(texts)
+    if not texts:
+        return {}
+    sample = texts[:LATENCY_SAMPLES]
+    model.predict_proba(sample[:1])  # warm-up
+
+    single = []
+    for text in sample:
+        start = time.perf_counter()
+        model.predict_proba([text])
+        single.append((time.perf_counter() - start) * 1000)
+
+    batches = []
+    batched_items = 0
+    for offset in range(0, len(texts), batch_size):
+        batch = texts[offset : offset + batch_size]
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batches.append((time.perf_counter() - start) * 1000)
+        batched_items += len(batch)
+
+    return {
+        "single_p50": round(float(np.percentile(single, 50)), 4),
+        "single_p99": round(float(np.percentile(single, 99)), 4),
+        "batch_p50": round(float(np.percentile(batches, 50)), 4),
+        "batch_p99": round(float(np.percentile(batches, 99)), 4),
+        "batch_per_item": round(sum(batches) / batched_items, 4),
+    }
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, or ``None`` where it cannot be read cheaply."""
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        try:
+            return int(statm.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return int(counters.WorkingSetSize)
+    return None
+
+
+def benchmark_corpus() -> List[str]:
+    """Fixed texts for promotion gates: the base dataset and hard cases, lowercased as at runtime."""
+    texts = pd.read_csv(DATA_PATH)["text"].dropna().astype(str).str.lower().tolist()
+    return texts + [text.lower() for text, _expected in HARD_TEST_CASES]
+
+
+def profile_model(model, corpus: Sequence[str]) -> dict:
+    """Serialized size, load time, RSS increase from loading, and latency on ``corpus``.
+
+    The model is round-tripped through an in-memory pickle, so the numbers do not
+    depend on disk caching and the candidate need not be written out first.
+    """
+    payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    gc.collect()
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    loaded = pickle.loads(payload)
+    load_seconds = time.perf_counter() - start
+    rss_after = _rss_bytes()
+    memory_mb = None
+    if rss_before is not None and rss_after is not None:
+        memory_mb = round(max(0, rss_after - rss_before) / (1024 * 1024), 3)
+    return {
+        "size_mb": round(len(payload) / (1024 * 1024), 4),
+        "load_seconds": round(load_seconds, 4),
+        "memory_mb": memory_mb,
+        "latency_ms": measure_latency(loaded, corpus),
+    }
+
+
+@dataclass
+class ModelBenchmark:
+    name: str
+    path: str
+    size_bytes: int
+    load_seconds: float
+    rss_delta_mb: Optional[float]
+    accuracy: float
+    f1_macro: float
+    hard_accuracy: float
+    hard_failures: List[dict] = field(default_factory=list)
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def benchmark_model(
+    model_path: Path,
+    dataset: Optional[pd.DataFrame] = None,
+    name: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+) -> ModelBenchmark:
+    """Load ``model_path`` and measure quality, latency and resource use."""
+    df = _load_eval_dataset() if dataset is None else dataset
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    model = joblib.load(model_path)
+    load_seconds = time.perf_counter() - start
+    rss_after = _rss_bytes()
+    rss_delta = None
+    if rss_before is not None and rss_after is not None:
+        rss_delta = round((rss_after - rss_before) / (1024 * 1024), 3)
+
+    scores = _score(df["intent"], model.predict(df["text"]))
+    hard = hard_case_results(model)
+    failures = [row for row in hard if row["predicted"] != row["expected"]]
+
+    return ModelBenchmark(
+        name=name or Path(model_path).name,
+        path=str(model_path),
+        size_bytes=Path(model_path).stat().st_size,
+        load_seconds=round(load_seconds, 4),
+        rss_delta_mb=rss_delta,
+        accuracy=scores["accuracy"],
+        f1_macro=scores["f1_macro"],
+        hard_accuracy=(len(hard) - len(failures)) / max(1, len(hard)),
+        hard_failures=failures,
+        latency_ms=measure_latency(model, df["text"].tolist(), batch_size),
+    )
+
+
+def benchmark_models(model_paths: Sequence[Path], include_auto: bool = False) -> List[ModelBenchmark]:
+    """Benchmark each model against the same dataset, in the order given."""
+    df = _load_eval_dataset(include_auto)
+    return [benchmark_model(path, dataset=df) for path in model_paths]
+
+
+_REPORT_ROWS = [
+    ("accuracy", lambda b: f"{b.accuracy:.4f}"),
+    ("f1_macro", lambda b: f"{b.f1_macro:.4f}"),
+    ("hard_accuracy", lambda b: f"{b.hard_accuracy:.4f}"),
+    ("single_p50_ms", lambda b: f"{b.latency_ms.get('single_p50', 0.0):.3f}"),
+    ("single_p99_ms", lambda b: f"{b.latency_ms.get('single_p99', 0.0):.3f}"),
+    ("batch_p50_ms", lambda b: f"{b.latency_ms.get('batch_p50', 0.0):.3f}"),
+    ("batch_p99_ms", lambda b: f"{b.latency_ms.get('batch_p99', 0.0):.3f}"),
+    ("batch_per_item_ms", lambda b: f"{b.latency_ms.get('batch_per_item', 0.0):.4f}"),
+    ("load_seconds", lambda b: f"{b.load_seconds:.3f}"),
+    ("size_kb", lambda b: f"{b.size_bytes / 1024:.1f}"),
+    ("rss_delta_mb", lambda b: "n/a" if b.rss_delta_mb is None else f"{b.rss_delta_mb:.1f}"),
+]
+
+
+def format_report(benchmarks: Sequence[ModelBenchmark]) -> str:
+    """Plain-text table with one column per model."""
+    header = ["metric"] + [b.name for b in benchmarks]
+    rows = [header] + [[label] + [render(b) for b in benchmarks] for label, render in _REPORT_ROWS]
+    widths = [max(len(row[col]) for row in rows) for col in range(len(header))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark intent models side by side.")
+    parser.add_argument(
+        "models",
+        nargs="*",
+        type=Path,
+        help="Model files to compare (default: the active model and the one rollback would restore).",
+    )
+    parser.add_argument("--include-auto", action="store_true", help="Also score on auto-learned samples.")
+    parser.add_argument("--json-output", type=Path, help="Optional path to write the full results as JSON.")
+    args = parser.parse_args()
+
+    paths = args.models or [path for path in (_current_model_path(), _registry().previous_path()) if path is not None]
+    if not paths:
+        raise SystemExit("No models found. Train one with: python scripts/retrain_model.py")
+
+    benchmarks = benchmark_models(paths, include_auto=args.include_auto)
+    print(format_report(benchmarks))
+    for bench in benchmarks:
+        for row in bench.hard_failures:
+            print(f"[{bench.name}] FAIL '{row['text']}' -> {row['predicted']} ({row['confidence']:.2f}), expected {row['expected']}")
+
+    if args.json_output:
+        args.json_output.parent.mkdir(parents=True, exist_ok=True)
+        args.json_output.write_text(
+            json.dumps([bench.as_dict() for bench in benchmarks], indent=2, sort_keys=True), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
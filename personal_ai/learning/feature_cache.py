@@ -0,0 +1,298 @@
+"""Content-addressed cache of n-gram counts for retraining.
+
+Each training row is keyed by a hash of its normalized text. For every
+vectorizer in the feature union the cache keeps one shared vocabulary and
+the rows' term counts as CSR blocks, one block per retrain that brought new
+rows. A retrain only tokenizes rows it has not seen before, in a single
+``CountVectorizer`` pass. The TF-IDF vocabulary, idf weights and training
+matrix are then sliced out of the cached counts with sparse indexing,
+giving the same model as fitting on raw text.
+
+On disk a cache is a directory with a manifest of its blocks. A block is
+stored as its row keys and, per vectorizer, a ``scipy.sparse.save_npz``
+file plus the terms it added to the vocabulary. Saving appends the new
+block; only when rows leave the corpus is everything compacted into one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.pipeline import FeatureUnion
+
+from .trainer import FeatureConfig, _build_features
+
+_CACHE_FORMAT_VERSION = 3
+_MANIFEST = "manifest.json"
+
+
+def row_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _widen(matrix: sparse.csr_matrix, columns: int) -> sparse.csr_matrix:
+    """``matrix`` with ``columns`` columns; blocks written before the vocabulary grew are narrower."""
+    if matrix.shape[1] == columns:
+        return matrix
+    return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], columns))
+
+
+def _read_terms(path: Path) -> List[str]:
+    # Normalized text has no NUL characters, so it separates terms.
+    blob = path.read_bytes().decode("utf-8")
+    return blob.split("\0") if blob else []
+
+
+def _atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp{path.suffix}")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class _Counts:
+    """Cached term counts of one vectorizer: a shared vocabulary plus CSR blocks of rows."""
+
+    def __init__(self, analyzer: Callable[[str], List[str]]) -> None:
+        self.analyzer = analyzer
+        self.terms: List[str] = []
+        self.blocks: List[sparse.csr_matrix] = []
+        # Built on demand: a warm retrain with no new rows never needs them.
+        self._columns: Optional[Dict[str, int]] = None
+        self._term_array: Optional[np.ndarray] = None
+        self._stacked: Optional[sparse.csr_matrix] = None
+
+    def reset(self, terms: List[str], blocks: List[sparse.csr_matrix]) -> None:
+        self.terms = terms
+        self.blocks = blocks
+        self._columns = self._term_array = self._stacked = None
+
+    def term_array(self) -> np.ndarray:
+        if self._term_array is None:
+            self._term_array = np.asarray(self.terms, dtype=str)
+        return self._term_array
+
+    def add(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """Count ``texts`` in one pass, growing the vocabulary; returns the new block."""
+        counter = CountVectorizer(analyzer=self.analyzer, dtype=np.int32)
+        try:
+            local = counter.fit_transform(texts).tocsr()
+            local_terms = counter.get_feature_names_out().tolist()
+        except ValueError:
+            # No text produced a single term.
+            local = sparse.csr_matrix((len(texts), 0), dtype=np.int32)
+            local_terms = []
+        if not self.terms:
+            self.terms = local_terms
+            indices = local.indices
+        else:
+            if self._columns is None:
+                self._columns = {term: idx for idx, term in enumerate(self.terms)}
+            remap = np.empty(len(local_terms), dtype=np.int64)
+            for idx, term in enumerate(local_terms):
+                column = self._columns.get(term)
+                if column is None:
+                    column = self._columns[term] = len(self.terms)
+                    self.terms.append(term)
+                remap[idx] = column
+            indices = remap[local.indices]
+        block = sparse.csr_matrix((local.data, indices, local.indptr), shape=(len(texts), len(self.terms)))
+        block.sort_indices()
+        self.blocks.append(block)
+        self._term_array = self._stacked = None
+        return block
+
+    def matrix(self) -> sparse.csr_matrix:
+        """All cached rows, in insertion order, at the current vocabulary width."""
+        if self._stacked is None:
+            width = len(self.terms)
+            if not self.blocks:
+                self._stacked = sparse.csr_matrix((0, width), dtype=np.int32)
+            else:
+                self._stacked = sparse.vstack([_widen(block, width) for block in self.blocks], format="csr")
+        return self._stacked
+
+
+class FeatureCache:
+    """Per-row n-gram counts for one feature configuration."""
+
+    def __init__(self, config: FeatureConfig, directory: Path) -> None:
+        self.config = config
+        self.features = _build_features(config)
+        signature = hashlib.sha1(repr(config).encode("utf-8")).hexdigest()[:12]
+        self.path = directory / f"features-{signature}"
+        self._counts = {name: _Counts(vec.build_analyzer()) for name, vec in self.features.transformer_list}
+        self._tfidf: Dict[str, TfidfTransformer] = {}
+        # Global column of each fitted vocabulary term, in vocabulary order.
+        self._fitted_columns: Dict[str, np.ndarray] = {}
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Block ids on disk, in row order; ``None`` for blocks not saved yet.
+        self._block_ids: List[Optional[int]] = []
+        self._block_keys: List[List[str]] = []
+        # Ids are never reused, so a save never overwrites a file the current manifest names.
+        self._next_block_id = 0
+        self._seen: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> "FeatureCache":
+        try:
+            manifest = json.loads((self.path / _MANIFEST).read_text(encoding="utf-8"))
+            if manifest.get("version") != _CACHE_FORMAT_VERSION:
+                return self
+            block_ids = [int(block_id) for block_id in manifest["blocks"]]
+            block_keys = [
+                np.load(self.path / f"block-{block_id}.keys.npy", allow_pickle=False).tolist() for block_id in block_ids
+            ]
+            terms: Dict[str, List[str]] = {}
+            blocks: Dict[str, List[sparse.csr_matrix]] = {}
+            for name in self._counts:
+                terms[name], blocks[name] = [], []
+                for block_id, keys in zip(block_ids, block_keys):
+                    block = sparse.load_npz(self.path / f"block-{block_id}.{name}.npz").tocsr()
+                    terms[name].extend(_read_terms(self.path / f"block-{block_id}.{name}.terms"))
+                    if block.shape != (len(keys), len(terms[name])):
+                        return self
+                    blocks[name].append(block)
+        except (OSError, ValueError, KeyError, TypeError):
+            return self
+
+        for name, counts in self._counts.items():
+            counts.reset(terms[name], blocks[name])
+        self._next_block_id = max(block_ids, default=-1) + 1
+        self._block_ids = list(block_ids)
+        self._block_keys = block_keys
+        self._keys = [key for keys in block_keys for key in keys]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        return self
+
+    def save(self, keep: Iterable[str] | None = None) -> None:
+        """Persist rows in ``keep`` (default: rows seen this run), so the cache tracks the current corpus.
+
+        New rows are appended as one block; if any cached row is dropped,
+        the cache is rewritten as a single compacted block.
+        """
+        keep = self._seen if keep is None else set(keep)
+        kept = sorted(self._rows[key] for key in keep if key in self._rows)
+        if len(kept) != len(self._keys):
+            self._compact(np.asarray(kept, dtype=np.int64))
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        for position, block_id in enumerate(self._block_ids):
+            if block_id is not None:
+                continue
+            block_id = self._next_block_id
+            self._next_block_id += 1
+            keys = np.asarray(self._block_keys[position], dtype="<U32")
+            _atomic_write(self.path / f"block-{block_id}.keys.npy", lambda path: np.save(path, keys))
+            for name, counts in self._counts.items():
+                block = counts.blocks[position]
+                # Each block stores the terms it added to the shared vocabulary.
+                start = counts.blocks[position - 1].shape[1] if position else 0
+                blob = "\0".join(counts.terms[start : block.shape[1]]).encode("utf-8")
+                _atomic_write(self.path / f"block-{block_id}.{name}.terms", lambda path: path.write_bytes(blob))
+                _atomic_write(self.path / f"block-{block_id}.{name}.npz", lambda path: sparse.save_npz(path, block))
+            self._block_ids[position] = block_id
+        manifest = {"version": _CACHE_FORMAT_VERSION, "blocks": self._block_ids}
+        _atomic_write(self.path / _MANIFEST, lambda path: path.write_text(json.dumps(manifest), encoding="utf-8"))
+
+        live = {f"block-{block_id}." for block_id in self._block_ids}
+        for path in self.path.iterdir():
+            if path.name != _MANIFEST and path.name.partition(".")[0] + "." not in live:
+                path.unlink(missing_ok=True)
+        # Single-file cache written by earlier versions.
+        self.path.with_suffix(".joblib").unlink(missing_ok=True)
+
+    def index(self, texts: Sequence[str]) -> List[str]:
+        """Return the row key of each normalized text, counting n-grams only for unseen rows."""
+        keys = [row_key(text) for text in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in self._rows or key in missing:
+                self.hits += 1
+            else:
+                missing[key] = text
+                self.misses += 1
+        if missing:
+            new_keys = list(missing)
+            new_texts = list(missing.values())
+            for counts in self._counts.values():
+                counts.add(new_texts)
+            self._rows.update((key, len(self._keys) + offset) for offset, key in enumerate(new_keys))
+            self._keys.extend(new_keys)
+            self._block_keys.append(new_keys)
+            self._block_ids.append(None)
+        self._seen.update(keys)
+        return keys
+
+    def fit_features(self, keys: Sequence[str]) -> Tuple[FeatureUnion, sparse.csr_matrix]:
+        """Return a fitted feature union and the training matrix for ``keys`` without re-tokenizing."""
+        rows = self._row_ids(keys)
+        blocks = []
+        for name, vectorizer in self.features.transformer_list:
+            counts = self._counts[name]
+            matrix = counts.matrix()[rows]
+            columns = np.flatnonzero(np.bincount(matrix.indices, minlength=len(counts.terms)))
+            terms = counts.term_array()[columns]
+            # The vectorizer's vocabulary is the sorted set of terms in the training rows.
+            order = np.argsort(terms, kind="stable")
+            columns = columns[order]
+            matrix = matrix[:, columns]
+            matrix.sort_indices()
+            tfidf = TfidfTransformer(
+                norm=vectorizer.norm,
+                use_idf=vectorizer.use_idf,
+                smooth_idf=vectorizer.smooth_idf,
+                sublinear_tf=vectorizer.sublinear_tf,
+            ).fit(matrix)
+            vectorizer.vocabulary_ = dict(zip(terms[order].tolist(), range(len(columns))))
+            vectorizer.idf_ = tfidf.idf_
+            self._tfidf[name] = tfidf
+            self._fitted_columns[name] = columns
+            blocks.append(tfidf.transform(matrix).astype(vectorizer.dtype))
+        return self.features, sparse.hstack(blocks, format="csr")
+
+    def transform(self, keys: Sequence[str]) -> sparse.csr_matrix:
+        """Feature matrix for cached rows using the vocabulary from :meth:`fit_features`."""
+        rows = self._row_ids(keys)
+        blocks = []
+        for name, vectorizer in self.features.transformer_list:
+            matrix = self._counts[name].matrix()[rows][:, self._fitted_columns[name]]
+            matrix.sort_indices()
+            blocks.append(self._tfidf[name].transform(matrix).astype(vectorizer.dtype))
+        return sparse.hstack(blocks, format="csr")
+
+    def pruned(self) -> bool:
+        """Whether saving would drop entries for rows no longer in the corpus."""
+        return len(self._keys) != len(self._seen)
+
+    def stats(self) -> dict:
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
+
+    def _row_ids(self, keys: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def _compact(self, rows: np.ndarray) -> None:
+        """Keep only ``rows`` (in order) as one unsaved block, dropping terms no kept row uses."""
+        for counts in self._counts.values():
+            matrix = counts.matrix()[rows]
+            columns = np.flatnonzero(np.bincount(matrix.indices, minlength=len(counts.terms)))
+            remap = np.zeros(len(counts.terms), dtype=np.int64)
+            remap[columns] = np.arange(len(columns))
+            block = sparse.csr_matrix(
+                (matrix.data, remap[matrix.indices], matrix.indptr), shape=(len(rows), len(columns))
+            )
+            counts.reset([counts.terms[column] for column in columns.tolist()], [block])
+        self._keys = [self._keys[row] for row in rows.tolist()]
+        self._rows = {key: row for row, key in enumerate(self._keys)}
+        self._block_keys = [list(self._keys)]
+        self._block_ids = [None]
+        self._fitted_columns = {}
+        self._tfidf = {}
@@ -0,0 +1,216 @@
+"""Online intent learning with ``partial_fit`` on newly collected samples.
+
+The batch TF-IDF pipeline only improves after a full retrain. This module
+keeps a hashing-feature SGD classifier that is updated in mini-batches from
+samples the collector logs, so corrections take effect within seconds.
+Hashing features need no vocabulary, so new words need no refit.
+
+Updates are checkpointed at most every ``ONLINE_CHECKPOINT_SECONDS`` but
+never later than that, even when no further sample arrives, and once more
+when the learner is closed at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import FeatureUnion
+
+from personal_ai.core.config import SETTINGS
+from personal_ai.core.logging_config import get_logger
+
+from .collector import add_sample_listener
+from .data_loader import load_training_data
+from .trainer import AUTO_DATA_PATH, DATA_PATH, MODEL_DIR
+
+ONLINE_MODEL = MODEL_DIR / "intent_model.online.pkl"
+
+_BOOTSTRAP_EPOCHS = 5
+_FLUSH_SECONDS = 2.0
+_SOURCE_WEIGHTS = {"corrected": 5.0, "auto": 1.0}
+
+logger = get_logger(__name__)
+
+
+class OnlineIntentModel:
+    """Hashing vectorizer + SGD logistic regression with the ``predict_proba``/``classes_`` surface."""
+
+    def __init__(self, classes: Sequence[str], random_state: int = 42) -> None:
+        self.features = FeatureUnion(
+            [
+                ("word", HashingVectorizer(ngram_range=(1, 2), n_features=2**18, alternate_sign=False)),
+                ("char", HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=2**18, alternate_sign=False)),
+            ]
+        )
+        self.clf = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=random_state)
+        self.classes_ = np.array(sorted(set(classes)))
+        self.updates = 0
+
+    def partial_fit(self, texts: Sequence[str], intents: Sequence[str], sample_weight: Optional[Sequence[float]] = None) -> None:
+        X = self.features.transform(texts)
+        self.clf.partial_fit(X, intents, classes=self.classes_, sample_weight=sample_weight)
+        self.updates += 1
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self.clf.predict_proba(self.features.transform(texts))
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.clf.predict(self.features.transform(texts))
+
+
+class OnlineLearner:
+    """Owns an :class:`OnlineIntentModel`, feeds it from the collector and checkpoints it."""
+
+    def __init__(
+        self,
+        checkpoint_path: Path = ONLINE_MODEL,
+        data_path: Path = DATA_PATH,
+        auto_data_path: Path = AUTO_DATA_PATH,
+    ) -> None:
+        self.checkpoint_path = checkpoint_path
+        self.data_path = data_path
+        self.auto_data_path = auto_data_path
+        self.model: Optional[OnlineIntentModel] = None
+        self._samples: "queue.Queue[tuple[str, str, float]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_checkpoint = time.monotonic()
+        self._worker_started = False
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self.model.classes_ if self.model is not None else np.array([])
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        with self._lock:
+            return self.model.predict_proba(texts)
+
+    def bootstrap(self) -> OnlineIntentModel:
+        """Load the last checkpoint, or fit a fresh model on the current dataset."""
+        if self.checkpoint_path.exists():
+            try:
+                self.model = joblib.load(self.checkpoint_path)
+                return self.model
+            except Exception as exc:  # noqa: BLE001
+                logger.error("online_checkpoint_load_failed error=%s", exc)
+
+        df, _report = load_training_data(self.data_path, self.auto_data_path)
+        model = OnlineIntentModel(df["intent"].unique(), random_state=SETTINGS.model_random_state)
+        rng = np.random.default_rng(SETTINGS.model_random_state)
+        texts = df["text"].to_numpy()
+        intents = df["intent"].to_numpy()
+        batch_size = max(1, SETTINGS.online_batch_size)
+        for _ in range(_BOOTSTRAP_EPOCHS):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                idx = order[start : start + batch_size]
+                model.partial_fit(texts[idx], intents[idx])
+        self.model = model
+        self.checkpoint()
+        return model
+
+    def submit(self, text: str, intent: str, confidence: float, source: str) -> None:
+        """Collector listener: queue a sample for the next mini-batch."""
+        self._samples.put((text, intent, _SOURCE_WEIGHTS.get(source, 1.0)))
+
+    def update(self, batch: List[tuple[str, str, float]]) -> int:
+        """Apply one mini-batch; samples with intents the model does not know are skipped."""
+        known = set(self.classes_)
+        usable = [item for item in batch if item[1] in known]
+        if not usable:
+            return 0
+        texts, intents, weights = zip(*usable)
+        with self._lock:
+            self.model.partial_fit(list(texts), list(intents), sample_weight=list(weights))
+            self._dirty = True
+        return len(usable)
+
+    def checkpoint(self) -> None:
+        with self._lock:
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.checkpoint_path.with_suffix(".tmp")
+            joblib.dump(self.model, tmp_path)
+            os.replace(tmp_path, self.checkpoint_path)
+            self._dirty = False
+            self._last_checkpoint = time.monotonic()
+
+    def close(self) -> None:
+        """Apply whatever is still queued and checkpoint unsaved updates."""
+        if self.model is None:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._samples.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.update(batch)
+        if self._dirty:
+            self.checkpoint()
+
+    def _checkpoint_wait(self) -> Optional[float]:
+        """Seconds until unsaved updates are due for a checkpoint; ``None`` when there are none."""
+        if not self._dirty:
+            return None
+        return max(0.0, self._last_checkpoint + SETTINGS.online_checkpoint_seconds - time.monotonic())
+
+    def _next_batch(self, timeout: Optional[float] = None) -> List[tuple[str, str, float]]:
+        try:
+            batch = [self._samples.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + _FLUSH_SECONDS
+        while len(batch) < SETTINGS.online_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._samples.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Wake up when a checkpoint falls due even if no sample arrives.
+            batch = self._next_batch(self._checkpoint_wait())
+            try:
+                if batch:
+                    applied = self.update(batch)
+                    logger.info("online_update samples=%d applied=%d", len(batch), applied)
+                if self._checkpoint_wait() == 0.0:
+                    self.checkpoint()
+            except Exception as exc:  # noqa: BLE001
+                logger.error("online_update_failed error=%s", exc)
+
+    def start(self) -> None:
+        """Bootstrap if needed, subscribe to the collector and start the update thread once."""
+        if self._worker_started:
+            return
+        if self.model is None:
+            self.bootstrap()
+        add_sample_listener(self.submit)
+        atexit.register(self.close)
+        thread = threading.Thread(target=self._run, name="online-learner", daemon=True)
+        thread.start()
+        self._worker_started = True
+
+
+ONLINE_LEARNER = OnlineLearner()
+
+
+def start_online_learning() -> OnlineLearner:
+    """Start the shared online learner and return it for use as the intent model."""
+    ONLINE_LEARNER.start()
+    return ONLINE_LEARNER
@@ -0,0 +1,274 @@
+"""Content-addressed model registry.
+
+Promoted models are stored once, as ``artifacts/<sha256>.pkl``, and never
+rewritten. ``manifest.json`` lists every kept version with its metrics and
+timestamps, plus the activation history. The ``CURRENT`` file holds the
+hash of the active model. It is replaced atomically, so promotion and
+rollback only swap this small pointer and never copy a model file.
+
+    python -m personal_ai.learning.registry list
+    python -m personal_ai.learning.registry activate 3
+    python -m personal_ai.learning.registry rollback
+    python -m personal_ai.learning.registry pin 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+REGISTRY_DIR = BASE_DIR / "models" / "registry"
+
+_HASH_CHUNK = 1 << 20
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class ModelRegistry:
+    """Versioned model artifacts with a ``CURRENT`` pointer."""
+
+    def __init__(self, root: Path = REGISTRY_DIR) -> None:
+        self.root = root
+        self.artifacts_dir = root / "artifacts"
+        self.manifest_path = root / "manifest.json"
+        self.pointer_path = root / "CURRENT"
+        self._lock = threading.RLock()
+
+    # -- reads ------------------------------------------------------------
+
+    def current_sha(self) -> Optional[str]:
+        try:
+            sha = self.pointer_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return sha or None
+
+    def current_path(self) -> Optional[Path]:
+        """Path of the active artifact, read from the pointer alone; ``None`` when unset."""
+        sha = self.current_sha()
+        if sha is None:
+            return None
+        path = self.artifacts_dir / f"{sha}.pkl"
+        return path if path.exists() else None
+
+    def versions(self) -> List[Dict[str, Any]]:
+        return self._load_manifest()["versions"]
+
+    def get(self, ref: str | int) -> Dict[str, Any]:
+        """Look up a version by number or by (a unique prefix of) its hash."""
+        versions = self.versions()
+        text = str(ref)
+        if text.isdigit():
+            matches = [entry for entry in versions if entry["version"] == int(text)]
+        else:
+            matches = [entry for entry in versions if entry["sha256"].startswith(text)]
+        if len(matches) != 1:
+            raise LookupError(f"No unique model version matches {ref!r}.")
+        return matches[0]
+
+    def artifact_path(self, entry: Dict[str, Any]) -> Path:
+        return self.root / entry["file"]
+
+    def previous_path(self) -> Optional[Path]:
+        """Artifact that :meth:`rollback` would activate."""
+        history = self._load_manifest()["history"]
+        if len(history) < 2:
+            return None
+        path = self.artifacts_dir / f"{history[-2]}.pkl"
+        return path if path.exists() else None
+
+    # -- writes -----------------------------------------------------------
+
+    def register(self, model: Any, metrics: Optional[dict] = None, source: str = "trainer") -> Dict[str, Any]:
+        """Serialize ``model`` into the registry; an identical artifact is stored only once."""
+        import joblib
+
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.artifacts_dir / f".incoming-{os.getpid()}-{threading.get_ident()}.tmp"
+        joblib.dump(model, tmp_path)
+        return self._add_artifact(tmp_path, metrics, source)
+
+    def register_file(self, path: Path, metrics: Optional[dict] = None, source: str = "import") -> Dict[str, Any]:
+        """Copy an existing model file into the registry."""
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.artifacts_dir / f".incoming-{os.getpid()}-{threading.get_ident()}.tmp"
+        shutil.copyfile(path, tmp_path)
+        return self._add_artifact(tmp_path, metrics, source)
+
+    def activate(self, ref: str | int) -> Dict[str, Any]:
+        """Point ``CURRENT`` at a registered version."""
+        with self._lock:
+            manifest = self._load_manifest()
+            entry = self.get(ref)
+            if not self.artifact_path(entry).exists():
+                raise LookupError(f"Artifact for version {entry['version']} is missing.")
+            _write_atomic(self.pointer_path, entry["sha256"] + "\n")
+            history = [sha for sha in manifest["history"] if sha != entry["sha256"]]
+            history.append(entry["sha256"])
+            manifest["history"] = history
+            entry = self._find(manifest, entry["sha256"])
+            entry["activated_at"] = datetime.now(timezone.utc).isoformat()
+            self._save_manifest(manifest)
+            return entry
+
+    def rollback(self) -> Dict[str, Any]:
+        """Re-activate the model that was active before the current one."""
+        with self._lock:
+            manifest = self._load_manifest()
+            history = [sha for sha in manifest["history"] if (self.artifacts_dir / f"{sha}.pkl").exists()]
+            if len(history) < 2:
+                raise LookupError("No earlier model version to roll back to.")
+            history.pop()
+            target = history[-1]
+            _write_atomic(self.pointer_path, target + "\n")
+            manifest["history"] = history
+            self._save_manifest(manifest)
+            return self._find(manifest, target)
+
+    def set_pinned(self, ref: str | int, pinned: bool) -> Dict[str, Any]:
+        with self._lock:
+            manifest = self._load_manifest()
+            entry = self._find(manifest, self.get(ref)["sha256"])
+            entry["pinned"] = pinned
+            self._save_manifest(manifest)
+            return entry
+
+    def prune(self, keep: int) -> List[Dict[str, Any]]:
+        """Delete all but the newest ``keep`` versions; pinned and active versions are always kept."""
+        with self._lock:
+            manifest = self._load_manifest()
+            current = self.current_sha()
+            newest = sorted(manifest["versions"], key=lambda entry: entry["version"], reverse=True)
+            removed = [
+                entry
+                for index, entry in enumerate(newest)
+                if index >= max(keep, 1) and not entry.get("pinned") and entry["sha256"] != current
+            ]
+            if not removed:
+                return []
+            gone = {entry["sha256"] for entry in removed}
+            for entry in removed:
+                self.artifact_path(entry).unlink(missing_ok=True)
+            manifest["versions"] = [entry for entry in manifest["versions"] if entry["sha256"] not in gone]
+            manifest["history"] = [sha for sha in manifest["history"] if sha not in gone]
+            self._save_manifest(manifest)
+            return removed
+
+    # -- internals --------------------------------------------------------
+
+    def _add_artifact(self, tmp_path: Path, metrics: Optional[dict], source: str) -> Dict[str, Any]:
+        sha = _sha256(tmp_path)
+        target = self.artifacts_dir / f"{sha}.pkl"
+        with self._lock:
+            if target.exists():
+                tmp_path.unlink()
+            else:
+                os.replace(tmp_path, target)
+
+            manifest = self._load_manifest()
+            for entry in manifest["versions"]:
+                if entry["sha256"] == sha:
+                    return entry
+            entry = {
+                "version": max((item["version"] for item in manifest["versions"]), default=0) + 1,
+                "sha256": sha,
+                "file": target.relative_to(self.root).as_posix(),
+                "size_bytes": target.stat().st_size,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "source": source,
+                "pinned": False,
+                "metrics": metrics or {},
+            }
+            manifest["versions"].append(entry)
+            self._save_manifest(manifest)
+            return entry
+
+    @staticmethod
+    def _find(manifest: dict, sha: str) -> Dict[str, Any]:
+        return next(entry for entry in manifest["versions"] if entry["sha256"] == sha)
+
+    def _load_manifest(self) -> dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("versions", [])
+        manifest.setdefault("history", [])
+        return manifest
+
+    def _save_manifest(self, manifest: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def current_model_path(legacy_path: Optional[Path] = None) -> Optional[Path]:
+    """Active registry artifact, else ``legacy_path`` if it exists."""
+    path = ModelRegistry().current_path()
+    if path is not None:
+        return path
+    if legacy_path is not None and legacy_path.exists():
+        return legacy_path
+    return None
+
+
+def _describe(entry: Dict[str, Any], current: Optional[str]) -> str:
+    metrics = entry.get("metrics", {})
+    flags = ("*" if entry["sha256"] == current else " ") + ("P" if entry.get("pinned") else " ")
+    accuracy = metrics.get("accuracy")
+    score = f"acc={accuracy:.4f}" if isinstance(accuracy, (int, float)) else "acc=n/a"
+    return f"{flags} v{entry['version']:<4} {entry['sha256'][:12]}  {entry['created_at'][:19]}  {score}  {entry['source']}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage the intent model registry.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List versions (* active, P pinned).")
+    for name in ("activate", "pin", "unpin"):
+        sub.add_parser(name).add_argument("version", help="Version number or hash prefix.")
+    sub.add_parser("rollback", help="Re-activate the previously active version.")
+    prune = sub.add_parser("prune", help="Delete old unpinned versions.")
+    prune.add_argument("--keep", type=int, required=True)
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry()
+    try:
+        if args.command == "list":
+            current = registry.current_sha()
+            for entry in sorted(registry.versions(), key=lambda item: item["version"]):
+                print(_describe(entry, current))
+        elif args.command == "activate":
+            print(f"Activated v{registry.activate(args.version)['version']}")
+        elif args.command == "rollback":
+            print(f"Rolled back to v{registry.rollback()['version']}")
+        elif args.command in {"pin", "unpin"}:
+            entry = registry.set_pinned(args.version, args.command == "pin")
+            print(f"{'Pinned' if entry['pinned'] else 'Unpinned'} v{entry['version']}")
+        elif args.command == "prune":
+            removed = registry.prune(args.keep)
+            print(f"Removed {len(removed)} version(s)")
+    except LookupError as exc:
+        raise SystemExit(str(exc)) from None
+
+
+if __name__ == "__main__":
+    main()
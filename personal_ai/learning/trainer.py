@@ -2,6 +2,7 @@ import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import joblib
 import numpy as np
@@ -15,24 +16,53 @@ from sklearn.utils.class_weight import compute_class_weight
 
 from personal_ai.core.config import SETTINGS
 
+if TYPE_CHECKING:
+    from .compression import CompressedIntentModel
+    from .feature_cache import FeatureCache
+    from .registry import ModelRegistry
+    from .tuning import SearchSpace
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_PATH = BASE_DIR / "data" / "intents.csv"
 AUTO_DATA_PATH = BASE_DIR / "data" / "auto_intents.csv"
 MODEL_DIR = BASE_DIR / "models"
-CURRENT_MODEL = MODEL_DIR / "intent_model.pkl"
-BACKUP_MODEL = MODEL_DIR / "intent_model.backup.pkl"
-CANDIDATE_MODEL = MODEL_DIR / "intent_model.candidate.pkl"
+# Written by older releases and ``ml/train.py``; adopted into the registry on first promotion.
+LEGACY_MODEL = MODEL_DIR / "intent_model.pkl"
 METRICS_PATH = MODEL_DIR / "model_metrics.json"
 VERSION_PATH = MODEL_DIR / "model_version.json"
 
 
+@dataclass(frozen=True)
+class FeatureConfig:
+    word_ngram_range: tuple[int, int] = (1, 3)
+    char_ngram_range: tuple[int, int] = (3, 6)
+    sublinear_tf: bool = True
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    features: FeatureConfig = FeatureConfig()
+    C: float = 2.0
+
+    def as_dict(self) -> dict:
+        return {
+            "word_ngram_range": list(self.features.word_ngram_range),
+            "char_ngram_range": list(self.features.char_ngram_range),
+            "sublinear_tf": self.features.sublinear_tf,
+            "C": self.C,
+        }
+
+
+DEFAULT_MODEL_CONFIG = ModelConfig()
+
+
 @dataclass
 class TrainingResult:
     accuracy: float
     f1_macro: float
     confusion_matrix: list
     labels: list[str]
-    model_path: Path
+    model_path: Path | None
 
 
 def _normalize(text: str) -> str:
@@ -42,65 +72,92 @@ def _normalize(text: str) -> str:
 
 
 def _load_dataset() -> pd.DataFrame:
-    df = pd.read_csv(DATA_PATH)
-    df["text"] = df["text"].astype(str).apply(_normalize)
-    df["intent"] = df["intent"].astype(str).str.strip()
-
-    if AUTO_DATA_PATH.exists():
-        auto_df = pd.read_csv(AUTO_DATA_PATH)
-        if {"text", "intent"}.issubset(auto_df.columns):
-            auto_df = auto_df.copy()
-            if "confidence" in auto_df.columns:
-                auto_df = auto_df[auto_df["confidence"].astype(float) >= SETTINGS.auto_learn_min_conf]
-            auto_df["text"] = auto_df["text"].astype(str).apply(_normalize)
-            auto_df["intent"] = auto_df["intent"].astype(str).str.strip()
-            auto_df = auto_df[["text", "intent"]]
-            df = pd.concat([df, auto_df], ignore_index=True)
-
-    return df.dropna(subset=["text", "intent"]).drop_duplicates()
-
-
-def _build_model(class_weight: dict) -> Pipeline:
-    features = FeatureUnion(
+    """Normalized, deduplicated training rows, streamed within ``TRAIN_MEMORY_LIMIT_MB``."""
+    from .data_loader import load_training_data
+
+    df, _report = load_training_data(DATA_PATH, AUTO_DATA_PATH)
+    return df
+
+
+def _build_features(config: FeatureConfig) -> FeatureUnion:
+    return FeatureUnion(
         [
-            ("word", TfidfVectorizer(ngram_range=(1, 3), min_df=1, sublinear_tf=True, strip_accents="unicode")),
-            ("char", TfidfVectorizer(analyzer="char", ngram_range=(3, 6), sublinear_tf=True)),
+            (
+                "word",
+                TfidfVectorizer(
+                    ngram_range=config.word_ngram_range,
+                    min_df=1,
+                    sublinear_tf=config.sublinear_tf,
+                    strip_accents="unicode",
+                ),
+            ),
+            ("char", TfidfVectorizer(analyzer="char", ngram_range=config.char_ngram_range, sublinear_tf=config.sublinear_tf)),
         ]
     )
-    clf = LogisticRegression(max_iter=4000, C=2.0, n_jobs=None, class_weight=class_weight)
-    return Pipeline([("features", features), ("clf", clf)])
 
 
-def _train_candidate() -> TrainingResult:
-    df = _load_dataset()
+def _build_classifier(class_weight: dict, C: float) -> LogisticRegression:
+    return LogisticRegression(max_iter=4000, C=C, n_jobs=None, class_weight=class_weight)
+
+
+def _build_model(class_weight: dict, config: ModelConfig = DEFAULT_MODEL_CONFIG) -> Pipeline:
+    return Pipeline(
+        [("features", _build_features(config.features)), ("clf", _build_classifier(class_weight, config.C))]
+    )
+
+
+def _balanced_class_weight(y: pd.Series) -> dict:
+    classes = np.unique(y)
+    weights = compute_class_weight(class_weight="balanced", classes=classes, y=y)
+    return dict(zip(classes, weights))
+
+
+@dataclass
+class DatasetSplit:
+    X_train: pd.Series
+    X_test: pd.Series
+    y_train: pd.Series
+    y_test: pd.Series
+
+
+def _split_dataset(df: pd.DataFrame) -> DatasetSplit:
     if df.empty:
         raise ValueError("Training data is empty.")
 
-    X = df["text"]
-    y = df["intent"]
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=SETTINGS.model_random_state, stratify=y
+        df["text"], df["intent"], test_size=0.2, random_state=SETTINGS.model_random_state, stratify=df["intent"]
     )
-    classes = np.unique(y_train)
-    weights = compute_class_weight(class_weight="balanced", classes=classes, y=y_train)
-    class_weight = dict(zip(classes, weights))
-    model = _build_model(class_weight)
-    model.fit(X_train, y_train)
-
-    predictions = model.predict(X_test)
-    accuracy = float(accuracy_score(y_test, predictions))
-    f1_macro = float(f1_score(y_test, predictions, average="macro"))
-    labels = sorted(set(y_test) | set(predictions))
-    matrix = confusion_matrix(y_test, predictions, labels=labels).tolist()
+    return DatasetSplit(X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test)
 
-    MODEL_DIR.mkdir(parents=True, exist_ok=True)
-    joblib.dump(model, CANDIDATE_MODEL)
+
+def _fit_candidate(split: DatasetSplit, config: ModelConfig = DEFAULT_MODEL_CONFIG) -> Pipeline:
+    model = _build_model(_balanced_class_weight(split.y_train), config)
+    model.fit(split.X_train, split.y_train)
+    return model
+
+
+def _fit_candidate_cached(df: pd.DataFrame, split: DatasetSplit, cache: "FeatureCache", config: ModelConfig):
+    """Fit from cached n-gram counts; returns the pipeline and its test-split feature matrix."""
+    features, X_train = cache.fit_features(df.loc[split.X_train.index, "key"].tolist())
+    clf = _build_classifier(_balanced_class_weight(split.y_train), config.C)
+    clf.fit(X_train, split.y_train)
+    X_test = cache.transform(df.loc[split.X_test.index, "key"].tolist())
+    return Pipeline([("features", features), ("clf", clf)]), X_test
+
+
+def _evaluate_model(model: Pipeline, X_test: pd.Series, y_test: pd.Series) -> TrainingResult:
+    """Score a model with a single predict over the shared test split."""
+    return _evaluate_predictions(model.predict(X_test), y_test)
+
+
+def _evaluate_predictions(predictions, y_test: pd.Series) -> TrainingResult:
+    labels = sorted(set(y_test) | set(predictions))
     return TrainingResult(
-        accuracy=accuracy,
-        f1_macro=f1_macro,
-        confusion_matrix=matrix,
+        accuracy=float(accuracy_score(y_test, predictions)),
+        f1_macro=float(f1_score(y_test, predictions, average="macro")),
+        confusion_matrix=confusion_matrix(y_test, predictions, labels=labels).tolist(),
         labels=labels,
-        model_path=CANDIDATE_MODEL,
+        model_path=None,
     )
 
 
@@ -110,12 +167,33 @@ def _load_model(path: Path) -> Pipeline | None:
     return joblib.load(path)
 
 
-def _evaluate_model(model: Pipeline, X_test: pd.Series, y_test: pd.Series) -> tuple[float, float]:
-    pred = model.predict(X_test)
-    return float(accuracy_score(y_test, pred)), float(f1_score(y_test, pred, average="macro"))
+def _registry() -> "ModelRegistry":
+    from .registry import ModelRegistry
+
+    return ModelRegistry(MODEL_DIR / "registry")
 
 
-def _write_metrics(best_accuracy: float, best_f1: float, candidate: TrainingResult) -> None:
+def _current_model_path() -> Path | None:
+    path = _registry().current_path()
+    if path is None and LEGACY_MODEL.exists():
+        return LEGACY_MODEL
+    return path
+
+
+def _promote(model: Pipeline, metrics: dict) -> Path:
+    """Register ``model`` and point the registry at it; older versions stay available for rollback."""
+    registry = _registry()
+    if registry.current_sha() is None and LEGACY_MODEL.exists():
+        registry.activate(registry.register_file(LEGACY_MODEL, source="legacy")["version"])
+    entry = registry.register(model, metrics=metrics)
+    registry.activate(entry["version"])
+    registry.prune(SETTINGS.model_registry_keep)
+    return registry.artifact_path(entry)
+
+
+def _write_metrics(
+    best_accuracy: float | None, best_f1: float | None, candidate: TrainingResult, extra: dict | None = None
+) -> None:
     payload = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "best_accuracy": best_accuracy,
@@ -124,85 +202,179 @@ def _write_metrics(best_accuracy: float, best_f1: float, candidate: TrainingResu
         "candidate_f1_macro": candidate.f1_macro,
         "labels": candidate.labels,
         "confusion_matrix": candidate.confusion_matrix,
+        **(extra or {}),
     }
     MODEL_DIR.mkdir(parents=True, exist_ok=True)
     METRICS_PATH.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
 
 
-def _write_version(promoted: bool) -> dict:
-    prior = {"version": 0}
-    if VERSION_PATH.exists():
-        try:
-            prior = json.loads(VERSION_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            prior = {"version": 0}
-
-    version = int(prior.get("version", 0)) + (1 if promoted else 0)
+def _write_version() -> dict:
+    registry = _registry()
+    sha = registry.current_sha()
+    entry = registry.get(sha) if sha else None
     payload = {
-        "version": version,
+        "version": entry["version"] if entry else 0,
+        "sha256": sha,
         "updated_at": datetime.now(timezone.utc).isoformat(),
-        "model_file": CURRENT_MODEL.name,
+        "model_file": entry["file"] if entry else None,
     }
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
     VERSION_PATH.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
     return payload
 
 
-def train_and_compare() -> dict:
-    df = _load_dataset()
-    if df.empty:
-        raise ValueError("Training data is empty.")
-
-    X = df["text"]
-    y = df["intent"]
-    _, X_test, _, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=SETTINGS.model_random_state, stratify=y
+def _should_promote(candidate: TrainingResult, existing: TrainingResult | None) -> bool:
+    if existing is None:
+        return True
+    return (
+        candidate.accuracy >= existing.accuracy + SETTINGS.model_improvement_threshold
+        or candidate.f1_macro >= existing.f1_macro + SETTINGS.model_improvement_threshold
     )
 
-    candidate_result = _train_candidate()
-    candidate_model = joblib.load(candidate_result.model_path)
-    candidate_accuracy, candidate_f1 = _evaluate_model(candidate_model, X_test, y_test)
 
-    existing_model = _load_model(CURRENT_MODEL)
-    if existing_model is None:
-        CURRENT_MODEL.write_bytes(candidate_result.model_path.read_bytes())
-        _write_metrics(best_accuracy=candidate_accuracy, best_f1=candidate_f1, candidate=candidate_result)
-        version = _write_version(promoted=True)
-        return {
-            "action": "promoted",
-            "candidate_accuracy": candidate_accuracy,
-            "candidate_f1_macro": candidate_f1,
-            "best_accuracy": candidate_accuracy,
-            "best_f1_macro": candidate_f1,
-            "version": version["version"],
-        }
-
-    existing_accuracy, existing_f1 = _evaluate_model(existing_model, X_test, y_test)
-    if (
-        candidate_accuracy >= existing_accuracy + SETTINGS.model_improvement_threshold
-        or candidate_f1 >= existing_f1 + SETTINGS.model_improvement_threshold
-    ):
-        BACKUP_MODEL.write_bytes(CURRENT_MODEL.read_bytes())
-        CURRENT_MODEL.write_bytes(candidate_result.model_path.read_bytes())
-        _write_metrics(best_accuracy=candidate_accuracy, best_f1=candidate_f1, candidate=candidate_result)
-        version = _write_version(promoted=True)
-        return {
-            "action": "promoted",
-            "candidate_accuracy": candidate_accuracy,
-            "candidate_f1_macro": candidate_f1,
-            "best_accuracy": candidate_accuracy,
-            "best_f1_macro": candidate_f1,
-            "version": version["version"],
-        }
-
-    _write_metrics(best_accuracy=existing_accuracy, best_f1=existing_f1, candidate=candidate_result)
-    version = _write_version(promoted=False)
+def _budget_violations(candidate: dict, incumbent: dict | None) -> list[str]:
+    """Describe each configured promotion budget the candidate exceeds; a budget of 0 is disabled."""
+    p99 = candidate["latency_ms"].get("single_p99", 0.0)
+    checks = [
+        ("single_p99_ms", p99, SETTINGS.promotion_max_p99_ms),
+        ("load_seconds", candidate["load_seconds"], SETTINGS.promotion_max_load_seconds),
+        ("size_mb", candidate["size_mb"], SETTINGS.promotion_max_size_mb),
+        ("memory_mb", candidate["memory_mb"], SETTINGS.promotion_max_memory_mb),
+    ]
+    if incumbent is not None and SETTINGS.promotion_max_slowdown > 0:
+        baseline = incumbent["latency_ms"].get("single_p99", 0.0)
+        if baseline > 0:
+            checks.append(("p99_slowdown", round(p99 / baseline, 3), SETTINGS.promotion_max_slowdown))
+
+    return [
+        f"{name}={value} exceeds {budget}"
+        for name, value, budget in checks
+        if budget > 0 and value is not None and value > budget
+    ]
+
+
+def _check_compression_settings() -> None:
+    """Reject a bad ``MODEL_COMPRESSION`` before training rather than after it."""
+    if not SETTINGS.model_compression:
+        return
+    from .compression import QUANTIZATION_DTYPES
+
+    if SETTINGS.model_compression not in QUANTIZATION_DTYPES:
+        raise ValueError(
+            f"MODEL_COMPRESSION={SETTINGS.model_compression!r} is not supported; "
+            f"use one of {', '.join(QUANTIZATION_DTYPES)} or leave it empty."
+        )
+    if SETTINGS.model_max_features <= 0:
+        raise ValueError(f"MODEL_MAX_FEATURES must be positive, got {SETTINGS.model_max_features}.")
+
+
+def _maybe_compress(
+    model: Pipeline, result: TrainingResult, split: DatasetSplit, extra: dict
+) -> tuple["Pipeline | CompressedIntentModel", TrainingResult]:
+    """Swap in the compressed model only if its accuracy is within the configured tolerance."""
+    from .compression import compress_model
+
+    compressed, report = compress_model(
+        model, split, max_features=SETTINGS.model_max_features, dtype=SETTINGS.model_compression
+    )
+    compressed_result = _evaluate_model(compressed, split.X_test, split.y_test)
+    accepted = compressed_result.accuracy >= result.accuracy - SETTINGS.compression_accuracy_tolerance
+    extra["compression"] = {**report.as_dict(), "accepted": accepted}
+    return (compressed, compressed_result) if accepted else (model, result)
+
+
+def train_and_compare(search: "SearchSpace | None" = None, previous_fingerprint: str | None = None) -> dict:
+    """Load and split once, fit the candidate in memory and persist it only on promotion.
+
+    With ``search``, the candidate's settings come from a parallel
+    hyperparameter search over the same split instead of the defaults.
+    When the loaded rows match ``previous_fingerprint`` nothing is trained
+    and the action is ``skipped``.
+    """
+    from .data_loader import DEFAULT_FEATURE_COPIES, data_fingerprint, load_training_data
+
+    _check_compression_settings()
+    # Feature matrices alive at once: the training pair, the cached counts and a pair per search worker.
+    feature_copies = DEFAULT_FEATURE_COPIES + int(SETTINGS.feature_cache)
+    if search is not None:
+        feature_copies += DEFAULT_FEATURE_COPIES * search.workers()
+    df, load_report = load_training_data(DATA_PATH, AUTO_DATA_PATH, feature_copies=feature_copies)
+    fingerprint = data_fingerprint(df)
+    if fingerprint == previous_fingerprint:
+        return {"action": "skipped", "data_fingerprint": fingerprint, "data": load_report.as_dict()}
+
+    cache = None
+    if SETTINGS.feature_cache:
+        from .feature_cache import FeatureCache
+
+        cache = FeatureCache(DEFAULT_MODEL_CONFIG.features, MODEL_DIR / "feature_cache").load()
+    if cache is not None:
+        df["key"] = cache.index(df["text"].tolist())
+    split = _split_dataset(df)
+
+    config = DEFAULT_MODEL_CONFIG
+    extra: dict = {"data": load_report.as_dict()}
+    if search is not None:
+        from .tuning import run_search
+
+        search_results = run_search(split, search)
+        config = search_results[0].config
+        extra["search"] = [item.as_dict() for item in search_results]
+
+    if cache is not None and config.features == cache.config:
+        candidate_model, X_test_features = _fit_candidate_cached(df, split, cache, config)
+        candidate = _evaluate_predictions(candidate_model.named_steps["clf"].predict(X_test_features), split.y_test)
+    else:
+        candidate_model = _fit_candidate(split, config)
+        candidate = _evaluate_model(candidate_model, split.X_test, split.y_test)
+    extra["candidate_config"] = config.as_dict()
+    if SETTINGS.model_compression:
+        candidate_model, candidate = _maybe_compress(candidate_model, candidate, split, extra)
+    if cache is not None:
+        extra["feature_cache"] = cache.stats()
+        if cache.misses or cache.pruned():
+            cache.save()
+
+    from .evaluator import benchmark_corpus, profile_model
+
+    corpus = benchmark_corpus()
+    benchmark = {"candidate": profile_model(candidate_model, corpus), "incumbent": None}
+
+    existing = None
+    current_path = _current_model_path()
+    existing_model = _load_model(current_path) if current_path is not None else None
+    if existing_model is not None:
+        existing = _evaluate_model(existing_model, split.X_test, split.y_test)
+        benchmark["incumbent"] = profile_model(existing_model, corpus)
+        del existing_model
+
+    violations = _budget_violations(benchmark["candidate"], benchmark["incumbent"])
+    benchmark["violations"] = violations
+    extra["benchmark"] = benchmark
+
+    improved = _should_promote(candidate, existing)
+    promoted = improved and not violations
+    if promoted:
+        candidate.model_path = _promote(
+            candidate_model,
+            metrics={"accuracy": candidate.accuracy, "f1_macro": candidate.f1_macro, "config": config.as_dict()},
+        )
+    # With no incumbent and a rejected candidate there is no deployed model to report.
+    best = candidate if promoted else existing
+    best_accuracy = best.accuracy if best is not None else None
+    best_f1 = best.f1_macro if best is not None else None
+
+    _write_metrics(best_accuracy=best_accuracy, best_f1=best_f1, candidate=candidate, extra=extra)
+    version = _write_version()
     return {
-        "action": "kept",
-        "candidate_accuracy": candidate_accuracy,
-        "candidate_f1_macro": candidate_f1,
-        "best_accuracy": existing_accuracy,
-        "best_f1_macro": existing_f1,
+        "action": "promoted" if promoted else ("rejected" if improved else "kept"),
+        "candidate_accuracy": candidate.accuracy,
+        "candidate_f1_macro": candidate.f1_macro,
+        "best_accuracy": best_accuracy,
+        "best_f1_macro": best_f1,
         "version": version["version"],
+        "data_fingerprint": fingerprint,
+        **extra,
     }
 
 
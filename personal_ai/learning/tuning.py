@@ -0,0 +1,137 @@
+"""Parallel hyperparameter search for the intent classifier.
+
+Configurations that share feature settings form one group. Each group runs
+in a worker process: the TF-IDF features are fitted once, and every
+classifier setting in the group is trained on the same matrices.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.pipeline import Pipeline
+
+from personal_ai.core.config import SETTINGS
+
+from .evaluator import measure_latency
+from .trainer import (
+    DatasetSplit,
+    FeatureConfig,
+    ModelConfig,
+    _balanced_class_weight,
+    _build_classifier,
+    _build_features,
+)
+
+
+@dataclass(frozen=True)
+class SearchSpace:
+    """Grid of candidate settings; ``samples`` picks a random subset instead of the full grid."""
+
+    word_ngram_ranges: Sequence[tuple[int, int]] = ((1, 2), (1, 3))
+    char_ngram_ranges: Sequence[tuple[int, int]] = ((2, 5), (3, 5), (3, 6))
+    sublinear_tf: Sequence[bool] = (True,)
+    C: Sequence[float] = (0.5, 1.0, 2.0, 4.0, 8.0)
+    samples: Optional[int] = None
+    max_workers: Optional[int] = None
+
+    def configs(self) -> List[ModelConfig]:
+        grid = [
+            ModelConfig(features=FeatureConfig(word, char, sublinear), C=c)
+            for word, char, sublinear, c in itertools.product(
+                self.word_ngram_ranges, self.char_ngram_ranges, self.sublinear_tf, self.C
+            )
+        ]
+        if self.samples is not None and self.samples < len(grid):
+            grid = random.Random(SETTINGS.model_random_state).sample(grid, self.samples)
+        return grid
+
+    def workers(self) -> int:
+        """Processes :func:`run_search` uses: one per feature configuration, at most ``max_workers``."""
+        groups = len({config.features for config in self.configs()})
+        return max(1, min(groups, self.max_workers or os.cpu_count() or 1))
+
+
+@dataclass
+class SearchResult:
+    config: ModelConfig
+    accuracy: float
+    f1_macro: float
+    vectorizer_fit_seconds: float
+    fit_seconds: float
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            **self.config.as_dict(),
+            "accuracy": self.accuracy,
+            "f1_macro": self.f1_macro,
+            "vectorizer_fit_seconds": round(self.vectorizer_fit_seconds, 4),
+            "fit_seconds": round(self.fit_seconds, 4),
+            "latency_ms": self.latency_ms,
+        }
+
+
+def _evaluate_feature_group(
+    features_config: FeatureConfig, c_values: Sequence[float], split: DatasetSplit
+) -> List[SearchResult]:
+    features = _build_features(features_config)
+    start = time.perf_counter()
+    X_train = features.fit_transform(split.X_train)
+    vectorizer_seconds = time.perf_counter() - start
+    X_test = features.transform(split.X_test)
+    class_weight = _balanced_class_weight(split.y_train)
+
+    results: List[SearchResult] = []
+    for c in c_values:
+        clf = _build_classifier(class_weight, c)
+        start = time.perf_counter()
+        clf.fit(X_train, split.y_train)
+        fit_seconds = time.perf_counter() - start
+
+        predictions = clf.predict(X_test)
+        model = Pipeline([("features", features), ("clf", clf)])
+        results.append(
+            SearchResult(
+                config=ModelConfig(features=features_config, C=c),
+                accuracy=float(accuracy_score(split.y_test, predictions)),
+                f1_macro=float(f1_score(split.y_test, predictions, average="macro")),
+                vectorizer_fit_seconds=vectorizer_seconds,
+                fit_seconds=vectorizer_seconds + fit_seconds,
+                latency_ms=measure_latency(model, split.X_test),
+            )
+        )
+    return results
+
+
+def run_search(split: DatasetSplit, space: SearchSpace) -> List[SearchResult]:
+    """Evaluate every configuration in ``space``; best (macro-F1, accuracy, latency) first."""
+    groups: Dict[FeatureConfig, List[float]] = {}
+    for config in space.configs():
+        groups.setdefault(config.features, []).append(config.C)
+    if not groups:
+        raise ValueError("Search space is empty.")
+
+    max_workers = space.workers()
+    results: List[SearchResult] = []
+    if max_workers <= 1:
+        for features_config, c_values in groups.items():
+            results.extend(_evaluate_feature_group(features_config, c_values, split))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_evaluate_feature_group, features_config, c_values, split)
+                for features_config, c_values in groups.items()
+            ]
+            for future in futures:
+                results.extend(future.result())
+
+    results.sort(key=lambda item: (-item.f1_macro, -item.accuracy, item.latency_ms.get("single_p50", 0.0)))
+    return results
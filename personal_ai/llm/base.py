@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Protocol
+from typing import Optional, Protocol
+
+from ..core.cancellation import CancelToken
 
 
 class LLMProvider(Protocol):
     """Provider contract for chat-completion style text generation."""
 
-    def generate(self, messages: list[dict[str, str]]) -> str:
-        """Generate an assistant reply from role-based messages."""
+    def generate(self, messages: list[dict[str, str]], cancel: Optional[CancelToken] = None) -> str:
+        """Generate an assistant reply from role-based messages.
+
+        Providers should stop early and raise ``RequestCancelled`` once ``cancel`` is cancelled.
+        """
 
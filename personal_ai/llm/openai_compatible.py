@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import http.client
 import json
 import os
+import socket
+from typing import Any, Callable, List, Optional
 from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from urllib.request import HTTPHandler, HTTPSHandler, OpenerDirector, Request, build_opener
+
+from ..core.cancellation import CancelToken, RequestCancelled
 
 
 class OpenAICompatibleProvider:
@@ -28,8 +33,12 @@ class OpenAICompatibleProvider:
                 "OPENAI_API_KEY is not set. Chat mode will use fallback assistant behavior."
             )
 
-    def generate(self, messages: list[dict[str, str]]) -> str:
-        """Call the OpenAI-compatible chat completions endpoint."""
+    def generate(self, messages: list[dict[str, str]], cancel: Optional[CancelToken] = None) -> str:
+        """Call the OpenAI-compatible chat completions endpoint.
+
+        Cancelling ``cancel`` closes the connection, and the call raises
+        ``RequestCancelled``; its deadline shortens the socket timeout.
+        """
         payload = {
             "model": self.model,
             "messages": messages,
@@ -43,14 +52,32 @@ class OpenAICompatibleProvider:
             },
             method="POST",
         )
+        timeout = cancel.remaining(self.timeout_seconds) if cancel is not None else self.timeout_seconds
+        if timeout <= 0:
+            raise RuntimeError("LLM request failed: timed out")
+        connections: List[http.client.HTTPConnection] = []
+        unregister = None
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+            unregister = cancel.on_cancel(lambda: [_abort(connection) for connection in list(connections)])
+        # urllib still applies HTTP(S)_PROXY / NO_PROXY; the handlers only record each connection.
+        opener = _tracking_opener(connections.append)
         try:
-            with urlopen(request, timeout=self.timeout_seconds) as response:
+            with opener.open(request, timeout=timeout) as response:
                 body = json.loads(response.read().decode("utf-8"))
-        except HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise RuntimeError(f"LLM request failed ({exc.code}): {detail}") from exc
-        except URLError as exc:
-            raise RuntimeError(f"LLM request failed: {exc.reason}") from exc
+        except (OSError, http.client.HTTPException) as exc:
+            if cancel is not None and cancel.cancelled:
+                raise RequestCancelled("LLM request was cancelled.") from exc
+            if isinstance(exc, HTTPError):
+                detail = exc.read().decode("utf-8", errors="replace")
+                raise RuntimeError(f"LLM request failed ({exc.code}): {detail}") from exc
+            reason = exc.reason if isinstance(exc, URLError) else exc
+            raise RuntimeError(f"LLM request failed: {reason}") from exc
+        finally:
+            if unregister is not None:
+                unregister()
+        if cancel is not None:
+            cancel.raise_if_cancelled()
 
         choices = body.get("choices") or []
         if not choices:
@@ -62,3 +89,40 @@ class OpenAICompatibleProvider:
             raise RuntimeError("LLM response content was empty.")
         return text
 
+
+class _TrackConnections:
+    """Mixin for urllib's HTTP handlers that hands each new connection to ``track``."""
+
+    def __init__(self, track: Callable[[http.client.HTTPConnection], None], *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._track = track
+
+    def do_open(self, http_class: Any, req: Request, **http_conn_args: Any) -> Any:
+        def connect(host: str, **kwargs: Any) -> http.client.HTTPConnection:
+            connection = http_class(host, **kwargs)
+            self._track(connection)
+            return connection
+
+        return super().do_open(connect, req, **http_conn_args)
+
+
+class _TrackingHTTPHandler(_TrackConnections, HTTPHandler):
+    pass
+
+
+class _TrackingHTTPSHandler(_TrackConnections, HTTPSHandler):
+    pass
+
+
+def _tracking_opener(track: Callable[[http.client.HTTPConnection], None]) -> OpenerDirector:
+    return build_opener(_TrackingHTTPHandler(track), _TrackingHTTPSHandler(track))
+
+
+def _abort(connection: http.client.HTTPConnection) -> None:
+    """Unblock a request in progress on another thread by shutting its socket down."""
+    sock = connection.sock
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
@@ -1,41 +1,26 @@
-import os
-import re
 from pathlib import Path
 
-import pandas as pd
 from sklearn.pipeline import Pipeline, FeatureUnion
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.utils.class_weight import compute_class_weight
 from sklearn.model_selection import cross_val_score
 import numpy as np
-import joblib
+
+from personal_ai.learning.data_loader import load_training_data
+from personal_ai.learning.registry import ModelRegistry
 
 # --------- Load & clean data ----------
 BASE_DIR = Path(__file__).resolve().parents[1]
 data_path = BASE_DIR / "data" / "intents.csv"
 auto_data_path = BASE_DIR / "data" / "auto_intents.csv"
-AUTO_MIN_CONF = float(os.getenv("AUTO_LEARN_MIN_CONF", "0.75"))
-
-df = pd.read_csv(data_path)
-
-if auto_data_path.exists():
-    auto_df = pd.read_csv(auto_data_path)
-    if {"text", "intent"}.issubset(auto_df.columns):
-        if "confidence" in auto_df.columns:
-            auto_df = auto_df[auto_df["confidence"].astype(float) >= AUTO_MIN_CONF]
-        auto_df = auto_df[["text", "intent"]]
-        df = pd.concat([df, auto_df], ignore_index=True)
 
-df = df.dropna(subset=["text", "intent"]).drop_duplicates()
-
-def normalize(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)  # remove symbols
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-df["text"] = df["text"].astype(str).apply(normalize)
+# Streams both files in chunks; TRAIN_MEMORY_LIMIT_MB bounds the rows (and their features) kept per intent.
+df, report = load_training_data(data_path, auto_data_path)
+print(
+    f"📥 Loaded {report.rows_kept}/{report.rows_read} rows "
+    f"(~{report.estimated_mb:.1f} MB, limit {report.memory_limit_mb or 'none'}, sampled={report.sampled})"
+)
 
 X = df["text"]
 y = df["intent"].astype(str)
@@ -81,7 +66,7 @@ print(f"📊 CV Accuracy: {scores.mean():.3f} ± {scores.std():.3f}")
 model.fit(X, y)
 
 # --------- Save ----------
-model_dir = BASE_DIR / "models"
-model_dir.mkdir(parents=True, exist_ok=True)
-joblib.dump(model, model_dir / "intent_model.pkl")
-print("✅ Trained with improved normalization + n-grams + class weights")
+registry = ModelRegistry(BASE_DIR / "models" / "registry")
+entry = registry.register(model, metrics={"cv_accuracy": float(scores.mean())}, source="ml.train")
+registry.activate(entry["version"])
+print(f"✅ Trained with improved normalization + n-grams + class weights (registry v{entry['version']})")
@@ -0,0 +1,6 @@
+"""Indexed notes storage."""
+
+from .ranking import NoteHit
+from .store import NotesStore, get_notes_store
+
+__all__ = ["NoteHit", "NotesStore", "get_notes_store"]
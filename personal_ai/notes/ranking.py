@@ -0,0 +1,61 @@
+"""BM25 scoring and snippet helpers for note search."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 80
+
+
+@dataclass(frozen=True)
+class NoteHit:
+    """One ranked note search result."""
+
+    note_id: int
+    score: float
+    snippet: str
+
+
+def bm25_top_k(
+    term_postings: Iterable[Tuple[Sequence[int], Sequence[int]]],
+    doc_lengths: Sequence[int],
+    total_length: int,
+    k: int,
+) -> List[Tuple[int, float]]:
+    """Score documents from ``(doc ids, term frequencies)`` postings, one pair per query term."""
+    doc_count = len(doc_lengths)
+    if not doc_count or k <= 0:
+        return []
+
+    avg_length = total_length / doc_count or 1.0
+    scores: Dict[int, float] = {}
+    for doc_ids, freqs in term_postings:
+        df = len(doc_ids)
+        if not df:
+            continue
+        idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+        for doc_id, tf in zip(doc_ids, freqs):
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_lengths[doc_id] / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+
+    # Ties go to the newer note.
+    return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def make_snippet(line: str, terms: Sequence[str], width: int = SNIPPET_CHARS) -> str:
+    """Return a window of ``line`` around the first matched term."""
+    if len(line) <= width:
+        return line
+
+    lowered = line.lower()
+    matches = (re.search(rf"\b{re.escape(term)}", lowered) for term in terms)
+    first = min((m.start() for m in matches if m), default=0)
+    start = max(0, min(first - width // 4, len(line) - width))
+    end = start + width
+    return f"{'…' if start else ''}{line[start:end].strip()}{'…' if end < len(line) else ''}"
@@ -0,0 +1,400 @@
+"""Append-only notes log with an offset index and an inverted keyword index.
+
+``notes.txt`` stays a plain one-note-per-line text file. Two side files live
+next to it:
+
+- ``notes.idx``: uint64 start offsets, one per note, so the
+  last N notes are read with a single seek instead of loading the file.
+- ``notes.terms``: a pickled snapshot of the inverted index (per-token note
+  ids and term frequencies plus note lengths, for BM25). Pickling it costs
+  as much as the whole index, so it is never written while taking notes:
+  only on open, when notes had to be caught up, and on close. Notes past
+  the snapshot are in the log itself, so after a crash they are indexed
+  again from there on the next open.
+
+The snapshot also records a fingerprint of the log it indexed: size, mtime
+and hashes of the first and last indexed notes. A log that only grew since
+keeps its index and the new lines are indexed; any other change (a typo
+fixed mid-file, a rewrite) re-indexes it from scratch. The check runs on
+open and, with one ``stat``, before every read or append, so edits made
+while the assistant runs are picked up too.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import pickle
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .ranking import NoteHit, bm25_top_k, make_snippet
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SNAPSHOT_VERSION = 3
+_MAX_TF = 0xFFFF
+_READ_CHUNK = 1 << 20
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _line_digest(line: str) -> str:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class NotesStore:
+    """Indexed access to a notes log file."""
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self.offsets_path = log_path.with_suffix(".idx")
+        self.terms_path = log_path.with_suffix(".terms")
+        self._lock = threading.RLock()
+        self._offsets = array("Q")
+        self._postings: Dict[str, array] = {}
+        self._freqs: Dict[str, array] = {}
+        self._doc_lengths = array("I")
+        self._total_length = 0
+        self._indexed_docs = 0
+        self._unsaved = 0
+        self._vocab: Optional[List[str]] = None
+        # ``(size, mtime_ns)`` of the log as last written or indexed here.
+        self._synced: Optional[Tuple[int, int]] = None
+        self._first_line = ""
+        self._last_line = ""
+        self._open()
+        if self._unsaved:
+            self.flush()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    # -- writes -----------------------------------------------------------
+
+    def append(self, content: str) -> int:
+        """Append one note and index it; returns the new note id."""
+        line = " ".join(content.splitlines()).strip()
+        with self._lock:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._sync()
+            encoded = (line + "\n").encode("utf-8")
+            with self.log_path.open("ab") as handle:
+                offset = handle.tell()
+                handle.write(encoded)
+            doc_id = len(self._offsets)
+            self._offsets.append(offset)
+            with self.offsets_path.open("ab") as handle:
+                array("Q", [offset]).tofile(handle)
+            self._index_doc(doc_id, line)
+            self._synced = self._log_stat()
+            self._unsaved += 1
+            return doc_id
+
+    def replace(self, content: str) -> None:
+        """Overwrite all notes with a single note."""
+        with self._lock:
+            for path in (self.log_path, self.offsets_path, self.terms_path):
+                if path.exists():
+                    path.unlink()
+            self._reset()
+            self.append(content)
+            self.flush()
+
+    def flush(self) -> None:
+        """Persist the inverted index snapshot."""
+        with self._lock:
+            if not self._unsaved and self.terms_path.exists():
+                return
+            payload = {
+                "version": _SNAPSHOT_VERSION,
+                "fingerprint": (self._synced, _line_digest(self._first_line), _line_digest(self._last_line)),
+                "doc_count": self._indexed_docs,
+                "postings": self._postings,
+                "freqs": self._freqs,
+                "doc_lengths": self._doc_lengths,
+            }
+            self.terms_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.terms_path.with_name(self.terms_path.name + ".tmp")
+            with tmp_path.open("wb") as handle:
+                pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.terms_path)
+            self._unsaved = 0
+
+    # -- reads ------------------------------------------------------------
+
+    def tail(self, count: int) -> List[str]:
+        """Return the last ``count`` notes, oldest first, seeking from the end."""
+        with self._lock:
+            self._sync()
+            if count <= 0 or not self._offsets:
+                return []
+            start = self._offsets[max(0, len(self._offsets) - count)]
+            with self.log_path.open("rb") as handle:
+                handle.seek(start)
+                data = handle.read()
+        return data.decode("utf-8", errors="replace").splitlines()
+
+    def get(self, doc_id: int) -> str:
+        with self._lock:
+            self._sync()
+            return self._read_lines([doc_id])[0]
+
+    def search(self, keyword: str) -> List[str]:
+        """Return notes containing ``keyword``, in file order.
+
+        Every query token must prefix-match a note token, which narrows the
+        candidates through the inverted index. Candidates are then checked
+        with the original case-insensitive substring test.
+        """
+        needle = keyword.strip().lower()
+        tokens = tokenize(needle)
+        if not tokens:
+            return []
+
+        with self._lock:
+            self._sync()
+            candidates: Optional[set[int]] = None
+            for token in tokens:
+                matched: set[int] = set()
+                for term in self._terms_with_prefix(token):
+                    matched.update(self._postings[term])
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+
+            lines = self._read_lines(sorted(candidates or ()))
+        return [line for line in lines if needle in line.lower()]
+
+    def ranked_search(self, query: str, k: int = 10) -> List[NoteHit]:
+        """Return the ``k`` best notes for ``query`` by BM25, with snippets.
+
+        Query tokens without an exact term in the index fall back to all
+        terms they prefix, so partially spoken words still match.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        with self._lock:
+            self._sync()
+            terms: List[str] = []
+            for token in tokens:
+                if token in self._postings:
+                    terms.append(token)
+                else:
+                    terms.extend(self._terms_with_prefix(token))
+
+            ranked = bm25_top_k(
+                ((self._postings[term], self._freqs[term]) for term in terms),
+                self._doc_lengths,
+                self._total_length,
+                k,
+            )
+            lines = self._read_lines([doc_id for doc_id, _score in ranked])
+
+        return [
+            NoteHit(note_id=doc_id, score=round(score, 4), snippet=make_snippet(line, terms))
+            for (doc_id, score), line in zip(ranked, lines)
+        ]
+
+    def iter_text(self) -> Iterator[str]:
+        """Stream the whole log in chunks."""
+        if not self.log_path.exists():
+            return
+        with self.log_path.open("r", encoding="utf-8", errors="replace") as handle:
+            while True:
+                chunk = handle.read(_READ_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+
+    # -- internals --------------------------------------------------------
+
+    def _reset(self) -> None:
+        self._offsets = array("Q")
+        self._postings = {}
+        self._freqs = {}
+        self._doc_lengths = array("I")
+        self._total_length = 0
+        self._indexed_docs = 0
+        self._unsaved = 0
+        self._vocab = None
+        self._synced = None
+        self._first_line = self._last_line = ""
+
+    def _log_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.log_path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _sync(self) -> None:
+        """Re-open the log if something else changed it since this store last looked.
+
+        Notes indexed since the last snapshot are indexed again from the log
+        rather than snapshotted first, keeping this off the note-taking path.
+        """
+        if self._log_stat() != self._synced:
+            self._reset()
+            self._open()
+
+    def _open(self) -> None:
+        if not self.log_path.exists():
+            for path in (self.offsets_path, self.terms_path):
+                if path.exists():
+                    path.unlink()
+            return
+
+        self._offsets = self._load_offsets()
+        stored_offsets = len(self._offsets)
+        if not self._load_snapshot():
+            # Offsets can't be trusted without a fingerprint that matches the log.
+            self._offsets = array("Q")
+        # Offsets past the snapshot are re-read from the log, which is cheap.
+        del self._offsets[self._indexed_docs :]
+        self._catch_up(rewrite_offsets=len(self._offsets) != stored_offsets)
+
+    def _load_offsets(self) -> array:
+        offsets = array("Q")
+        if not self.offsets_path.exists():
+            return offsets
+        with self.offsets_path.open("rb") as handle:
+            raw = handle.read()
+        usable = len(raw) - len(raw) % offsets.itemsize
+        offsets.frombytes(raw[:usable])
+        return offsets
+
+    def _load_snapshot(self) -> bool:
+        if not self.terms_path.exists():
+            return False
+        try:
+            with self.terms_path.open("rb") as handle:
+                payload = pickle.load(handle)
+        except Exception:  # noqa: BLE001
+            return False
+        if not isinstance(payload, dict) or payload.get("version") != _SNAPSHOT_VERSION:
+            return False
+        doc_count = int(payload.get("doc_count", 0))
+        if doc_count > len(self._offsets):
+            return False
+        synced, first_digest, last_digest = payload.get("fingerprint", (None, "", ""))
+        lines = self._log_extends(synced, doc_count, first_digest, last_digest)
+        if lines is None:
+            return False
+        self._first_line, self._last_line = lines
+        self._postings = payload.get("postings", {})
+        self._freqs = payload.get("freqs", {})
+        self._doc_lengths = payload.get("doc_lengths", array("I"))
+        self._total_length = sum(self._doc_lengths)
+        self._indexed_docs = doc_count
+        return True
+
+    def _log_extends(
+        self, synced: Optional[Tuple[int, int]], doc_count: int, first_digest: str, last_digest: str
+    ) -> Optional[Tuple[str, str]]:
+        """The first and last indexed notes if the log is the one the snapshot indexed, possibly grown."""
+        current = self._log_stat()
+        if synced is None or current is None:
+            return None
+        if current != tuple(synced) and current[0] <= synced[0]:
+            # Same size but touched means edited in place; smaller means rewritten.
+            return None
+        if not doc_count:
+            return "", ""
+        with self.log_path.open("rb") as handle:
+            first_line = handle.readline().decode("utf-8", errors="replace").rstrip("\r\n")
+            handle.seek(self._offsets[doc_count - 1])
+            raw = handle.readline()
+        last_line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if (
+            self._offsets[doc_count - 1] + len(raw) != synced[0]
+            or _line_digest(first_line) != first_digest
+            or _line_digest(last_line) != last_digest
+        ):
+            return None
+        return first_line, last_line
+
+    def _catch_up(self, rewrite_offsets: bool) -> None:
+        """Index offsets and terms for notes not covered by the side files."""
+        rewrite_offsets = rewrite_offsets or not self._offsets
+        with self.log_path.open("rb") as handle:
+            if self._offsets:
+                handle.seek(self._offsets[-1])
+                handle.readline()
+            new_offsets = array("Q")
+            position = handle.tell()
+            for raw in iter(handle.readline, b""):
+                new_offsets.append(position)
+                position += len(raw)
+        self._synced = self._log_stat()
+
+        self._offsets.extend(new_offsets)
+        if rewrite_offsets or new_offsets:
+            mode = "wb" if rewrite_offsets else "ab"
+            with self.offsets_path.open(mode) as handle:
+                (self._offsets if rewrite_offsets else new_offsets).tofile(handle)
+
+        missing = range(self._indexed_docs, len(self._offsets))
+        if missing:
+            for doc_id, line in zip(missing, self._read_lines(list(missing))):
+                self._index_doc(doc_id, line)
+            self._unsaved += len(missing)
+
+    def _index_doc(self, doc_id: int, line: str) -> None:
+        tokens = tokenize(line)
+        for token, tf in Counter(tokens).items():
+            bucket = self._postings.get(token)
+            if bucket is None:
+                bucket = self._postings[token] = array("I")
+                self._freqs[token] = array("H")
+                self._vocab = None
+            bucket.append(doc_id)
+            self._freqs[token].append(min(tf, _MAX_TF))
+        self._doc_lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        self._indexed_docs = doc_id + 1
+        self._last_line = line
+        if doc_id == 0:
+            self._first_line = line
+
+    def _terms_with_prefix(self, prefix: str) -> List[str]:
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        vocab = self._vocab
+        start = bisect_left(vocab, prefix)
+        end = start
+        while end < len(vocab) and vocab[end].startswith(prefix):
+            end += 1
+        return vocab[start:end]
+
+    def _read_lines(self, doc_ids: List[int]) -> List[str]:
+        lines: List[str] = []
+        with self.log_path.open("rb") as handle:
+            for doc_id in doc_ids:
+                handle.seek(self._offsets[doc_id])
+                lines.append(handle.readline().decode("utf-8", errors="replace").rstrip("\r\n"))
+        return lines
+
+
+_STORES: Dict[Path, NotesStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_notes_store(log_path: Path) -> NotesStore:
+    """Return the shared store for ``log_path``, opening it on first use."""
+    with _STORES_LOCK:
+        store = _STORES.get(log_path)
+        if store is None:
+            store = NotesStore(log_path)
+            _STORES[log_path] = store
+            atexit.register(store.flush)
+        return store
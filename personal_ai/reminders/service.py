@@ -7,6 +7,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ..voice.tts import PRIORITY_REMINDER, speak
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 REMINDERS_FILE = BASE_DIR / "data" / "reminders.json"
 
@@ -98,7 +100,10 @@ def _run_checker_loop() -> None:
                     continue
 
                 if due <= now:
-                    print(f"⏰ Reminder: {reminder.get('message', 'No message')}")
+                    message = reminder.get("message", "No message")
+                    print(f"⏰ Reminder: {message}")
+                    # Interrupts whatever the assistant is saying; already printed, so no fallback.
+                    speak(f"Reminder: {message}", priority=PRIORITY_REMINDER, fallback=None)
                     reminder["status"] = "done"
                     reminder["triggered_at"] = now.isoformat()
                     changed = True
@@ -1,5 +1,11 @@
 import json
+import os
+import threading
+import time
+from bisect import bisect_right
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 PERM_FILE = BASE_DIR / "app_permissions.json"
@@ -12,17 +18,20 @@ BLOCKED_EXES = {
     "wmic.exe",
 }
 
+# Within this window repeated checks reuse the cache without even a stat() call.
+_STAT_INTERVAL_SECONDS = 1.0
+
 
 def _default_permissions() -> dict:
     return {"allowed_apps": {}, "allowed_folders": []}
 
 
-def load_permissions():
-    if not PERM_FILE.exists():
+def _parse_permissions(path: Path) -> dict:
+    if not path.exists():
         return _default_permissions()
 
     try:
-        with PERM_FILE.open("r", encoding="utf-8") as f:
+        with path.open("r", encoding="utf-8") as f:
             data = json.load(f)
     except (OSError, json.JSONDecodeError, ValueError):
         return _default_permissions()
@@ -41,9 +50,119 @@ def load_permissions():
     return {"allowed_apps": allowed_apps, "allowed_folders": allowed_folders}
 
 
+def _root_key(path: str) -> str:
+    key = os.path.normcase(path)
+    return key if key.endswith(os.sep) else key + os.sep
+
+
+def _precompute_roots(folders: list) -> Tuple[str, ...]:
+    """Resolve, normalize and sort roots, dropping any nested inside another root.
+
+    With nested roots removed, the only root that can prefix a path is the
+    greatest root that sorts at or before it, so a single bisect suffices.
+    """
+    keys = set()
+    for folder in folders:
+        try:
+            keys.add(_root_key(str(Path(str(folder)).resolve())))
+        except (OSError, RuntimeError, ValueError):
+            continue
+
+    roots: list[str] = []
+    for key in sorted(keys):
+        if roots and key.startswith(roots[-1]):
+            continue
+        roots.append(key)
+    return tuple(roots)
+
+
+class PermissionsStore:
+    """Parsed permissions cached in memory and revalidated only when the file changes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._path: Optional[Path] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._data = _default_permissions()
+        self._roots: Tuple[str, ...] = ()
+
+    def snapshot(self) -> dict:
+        """Return the current permissions, re-reading the file only if it changed."""
+        path = PERM_FILE
+        now = time.monotonic()
+        if path == self._path and now - self._checked_at < _STAT_INTERVAL_SECONDS:
+            return self._data
+
+        with self._lock:
+            signature = self._stat(path)
+            if path != self._path or signature != self._signature:
+                data = _parse_permissions(path)
+                self._data = data
+                self._roots = _precompute_roots(data["allowed_folders"])
+                self._path = path
+                self._signature = signature
+            self._checked_at = now
+            return self._data
+
+    def allowed_roots(self) -> Tuple[str, ...]:
+        self.snapshot()
+        return self._roots
+
+    def save(self, perms: dict) -> None:
+        """Atomically replace the permissions file and refresh the cache."""
+        path = PERM_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with self._lock:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(perms, f, indent=2)
+            os.replace(tmp_path, path)
+            self._path = None
+        self.snapshot()
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+_STORE = PermissionsStore()
+
+
+def load_permissions():
+    """Return a mutable copy of the cached permissions."""
+    data = _STORE.snapshot()
+    return {
+        "allowed_apps": dict(data["allowed_apps"]),
+        "allowed_folders": list(data["allowed_folders"]),
+    }
+
+
 def save_permissions(perms):
-    with PERM_FILE.open("w", encoding="utf-8") as f:
-        json.dump(perms, f, indent=2)
+    _STORE.save(perms)
+
+
+def allowed_apps() -> Mapping[str, str]:
+    """Read-only view of approved apps for hot-path checks."""
+    return MappingProxyType(_STORE.snapshot()["allowed_apps"])
+
+
+def is_path_allowed(target_path: Path) -> bool:
+    """Return True when an already-resolved path lies inside an allowed folder.
+
+    Roots are resolved once per permissions-file change, so this check does
+    no filesystem access of its own.
+    """
+    roots = _STORE.allowed_roots()
+    if not roots:
+        return False
+    key = _root_key(os.path.abspath(target_path))
+    idx = bisect_right(roots, key) - 1
+    return idx >= 0 and key.startswith(roots[idx])
 
 
 def is_blocked_exe(exe_name: str) -> bool:
@@ -0,0 +1,5 @@
+"""Speech output."""
+
+from .tts import PRIORITY_NORMAL, PRIORITY_PROMPT, PRIORITY_REMINDER, SpeechWorker, get_speech_worker, speak
+
+__all__ = ["PRIORITY_NORMAL", "PRIORITY_PROMPT", "PRIORITY_REMINDER", "SpeechWorker", "get_speech_worker", "speak"]
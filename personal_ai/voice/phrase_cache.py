@@ -0,0 +1,189 @@
+"""On-disk cache of synthesized audio for phrases the assistant repeats.
+
+Each entry is one audio file named by a hash of the text, the engine voice
+and the speaking rate, so changing the voice or rate never plays stale
+audio. The file's mtime records its last use. Once the files exceed
+``max_bytes`` the least recently used ones are deleted.
+
+Fixed phrases are rendered up front. Other short phrases are rendered once
+they have been spoken ``min_uses`` times.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import wave
+from pathlib import Path
+from typing import Dict, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PHRASE_CACHE_DIR = BASE_DIR / "data" / "phrase_cache"
+AUDIO_SUFFIX = ".wav"
+
+# Longer, free-form replies are unlikely to repeat word for word.
+_MAX_LEARNED_CHARS = 120
+
+
+class PhraseCache:
+    def __init__(self, directory: Path = PHRASE_CACHE_DIR, max_bytes: int = 20 * 1024 * 1024, min_uses: int = 2) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_uses = min_uses
+        self._uses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def key(text: str, voice: str, rate: int) -> str:
+        return hashlib.sha1(f"{voice}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+
+    def path_for(self, text: str, voice: str, rate: int) -> Path:
+        return self.directory / f"{self.key(text, voice, rate)}{AUDIO_SUFFIX}"
+
+    def lookup(self, text: str, voice: str, rate: int) -> Optional[Path]:
+        """Cached audio for ``text``, marked as just used; ``None`` on a miss."""
+        path = self.path_for(text, voice, rate)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def should_render(self, text: str) -> bool:
+        """Count a synthesized use of ``text``; ``True`` once it has repeated often enough to cache."""
+        if len(text) > _MAX_LEARNED_CHARS:
+            return False
+        with self._lock:
+            uses = self._uses[text] = self._uses.get(text, 0) + 1
+        return uses == self.min_uses
+
+    def incoming_path(self, text: str, voice: str, rate: int) -> Path:
+        """Temporary file to render into before :meth:`store`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f"{self.key(text, voice, rate)}.{os.getpid()}.tmp{AUDIO_SUFFIX}"
+
+    def store(self, rendered: Path, text: str, voice: str, rate: int) -> Optional[Path]:
+        """Move a rendered file into the cache and evict down to ``max_bytes``."""
+        try:
+            size = rendered.stat().st_size
+        except OSError:
+            return None
+        if not size or size > self.max_bytes:
+            rendered.unlink(missing_ok=True)
+            return None
+        path = self.path_for(text, voice, rate)
+        with self._lock:
+            existed = path.exists()
+            os.replace(rendered, path)
+            if self._total_bytes is not None and not existed:
+                self._total_bytes += size
+            self._evict()
+        return path
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._current_total()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob(f"*{AUDIO_SUFFIX}"):
+            if ".tmp" in path.name:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _current_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _mtime, size, _path in self._entries())
+        return self._total_bytes
+
+    def _evict(self) -> None:
+        if self._current_total() <= self.max_bytes:
+            return
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+
+def _wav_seconds(path: Path) -> Optional[float]:
+    try:
+        with wave.open(str(path), "rb") as handle:
+            return handle.getnframes() / float(handle.getframerate())
+    except (OSError, EOFError, wave.Error, ZeroDivisionError):
+        return None
+
+
+class AudioPlayer:
+    """Plays an audio file to completion; :meth:`stop` may be called from another thread."""
+
+    def __init__(self) -> None:
+        self._process: Optional[subprocess.Popen] = None
+        self._stopped = threading.Event()
+        self._command = None
+        if sys.platform != "win32":
+            for name in ("aplay", "paplay", "afplay"):
+                path = shutil.which(name)
+                if path:
+                    self._command = [path, "-q"] if name == "aplay" else [path]
+                    break
+
+    @property
+    def available(self) -> bool:
+        return sys.platform == "win32" or self._command is not None
+
+    def play(self, path: Path) -> bool:
+        """Returns ``False`` when the file could not be played, so the caller can synthesize instead."""
+        self._stopped.clear()
+        if sys.platform == "win32":
+            return self._play_winsound(path)
+        if self._command is None:
+            return False
+        try:
+            self._process = subprocess.Popen(
+                [*self._command, str(path)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            return False
+        try:
+            return self._process.wait() == 0 or self._stopped.is_set()
+        finally:
+            self._process = None
+
+    def _play_winsound(self, path: Path) -> bool:
+        import winsound
+
+        duration = _wav_seconds(path)
+        if duration is None:
+            return False
+        try:
+            winsound.PlaySound(str(path), winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        except RuntimeError:
+            return False
+        # SND_ASYNC returns at once; wait out the clip unless stop() cuts it short.
+        self._stopped.wait(duration)
+        return True
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if sys.platform == "win32":
+            import winsound
+
+            winsound.PlaySound(None, 0)
+            return
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
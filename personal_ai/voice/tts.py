@@ -0,0 +1,275 @@
+"""Background text-to-speech with one long-lived engine.
+
+``pyttsx3.init()`` is slow, and ``runAndWait()`` blocks until the phrase has
+been spoken. :class:`SpeechWorker` creates the engine once, on its own
+thread, and speaks queued utterances in priority order. ``say()`` returns
+immediately. A more urgent utterance, such as a reminder, interrupts the
+one being spoken. The interrupted utterance is dropped, not repeated.
+
+With a :class:`~personal_ai.voice.phrase_cache.PhraseCache`, phrases that
+were rendered to audio files are played back instead of synthesized.
+Rendering happens on the same thread, only when nothing is waiting to be
+spoken.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import queue
+import threading
+from importlib.util import find_spec
+from typing import Any, Callable, Iterable, Optional
+
+from ..core.config import MODE, SETTINGS
+from .phrase_cache import AudioPlayer, PhraseCache
+
+PRIORITY_REMINDER = 0
+PRIORITY_PROMPT = 10
+PRIORITY_NORMAL = 20
+# Cache rendering; anything spoken pre-empts it.
+PRIORITY_BACKGROUND = 100
+
+# Seconds to keep speaking queued phrases at interpreter exit.
+_EXIT_DRAIN_SECONDS = 5.0
+
+_PYTTSX3_AVAILABLE = find_spec("pyttsx3") is not None
+
+EngineFactory = Callable[[], Any]
+
+
+def _pyttsx3_engine() -> Any:
+    import pyttsx3
+
+    return pyttsx3.init()
+
+
+class SpeechWorker:
+    """Owns a TTS engine on a daemon thread and speaks queued text.
+
+    ``engine_factory`` must return an object with pyttsx3's ``say``,
+    ``runAndWait``, ``stop`` and ``connect`` methods (plus ``save_to_file``
+    and ``getProperty`` when a phrase cache is used). It is called on the
+    worker thread, because pyttsx3 drivers must stay on the thread that
+    created them.
+    """
+
+    def __init__(
+        self,
+        engine_factory: EngineFactory = _pyttsx3_engine,
+        fallback: Callable[[str], None] = print,
+        phrase_cache: Optional[PhraseCache] = None,
+        player: Optional[AudioPlayer] = None,
+    ) -> None:
+        self._engine_factory = engine_factory
+        self._fallback = fallback
+        self._cache = phrase_cache if player is not None else None
+        self._player = player
+        # (priority, order, text, render); a ``None`` text stops the thread.
+        self._queue: "queue.PriorityQueue[tuple[int, int, Optional[str], bool]]" = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._speaking: Optional[int] = None
+        self._interrupt = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._engine: Any = None
+        self._voice: tuple[str, int] = ("default", 0)
+
+    def say(self, text: str, priority: int = PRIORITY_NORMAL) -> None:
+        """Queue ``text``; pre-empts the current utterance if ``priority`` is more urgent."""
+        with self._lock:
+            self._pending += 1
+            if self._speaking is not None and priority < self._speaking:
+                self._stop_current()
+            self._start()
+        self._queue.put((priority, next(self._order), text, False))
+
+    def prerender(self, phrases: Iterable[str]) -> None:
+        """Render ``phrases`` into the phrase cache while the worker is otherwise idle."""
+        if self._cache is None:
+            return
+        with self._lock:
+            self._start()
+        for text in phrases:
+            self._queue.put((PRIORITY_BACKGROUND, next(self._order), text, True))
+
+    def interrupt(self) -> None:
+        """Stop the current utterance and drop queued speech, except reminders.
+
+        A reminder is due now whatever the user is doing, so one being
+        spoken finishes and queued ones stay queued.
+        """
+        with self._lock:
+            drained = []
+            while True:
+                try:
+                    drained.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in drained:
+                priority, _order, text, render = item
+                if text is None or render or priority <= PRIORITY_REMINDER:
+                    self._queue.put(item)
+                else:
+                    self._pending -= 1
+            if self._speaking is not None and self._speaking > PRIORITY_REMINDER:
+                self._stop_current()
+            self._idle.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or being spoken; ``False`` on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish queued speech (up to ``timeout``) and stop the worker thread."""
+        self.wait_idle(timeout)
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            self._queue.put((PRIORITY_REMINDER - 1, next(self._order), None, False))
+            thread.join(timeout)
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="speech-worker", daemon=True)
+            self._thread.start()
+
+    def _stop_current(self) -> None:
+        self._interrupt.set()
+        if self._player is not None:
+            self._player.stop()
+
+    def _on_word(self, *_args: Any) -> None:
+        if self._interrupt.is_set():
+            self._engine.stop()
+
+    def _ensure_engine(self) -> Any:
+        if self._engine is None:
+            try:
+                engine = self._engine_factory()
+                engine.connect("started-word", self._on_word)
+            except Exception:
+                return None
+            self._engine = engine
+            try:
+                self._voice = (str(engine.getProperty("voice")), int(engine.getProperty("rate")))
+            except Exception:
+                self._voice = ("default", 0)
+        return self._engine
+
+    def _speak(self, text: str) -> None:
+        engine = self._ensure_engine()
+        if engine is None:
+            self._fallback(text)
+            return
+        if self._cache is not None:
+            path = self._cache.lookup(text, *self._voice)
+            if path is not None and self._player.play(path):
+                return
+        try:
+            engine.say(text)
+            engine.runAndWait()
+        except Exception:
+            # A broken driver is rebuilt for the next utterance.
+            self._engine = None
+            self._fallback(text)
+            return
+        if self._cache is not None and not self._interrupt.is_set() and self._cache.should_render(text):
+            self._queue.put((PRIORITY_BACKGROUND, next(self._order), text, True))
+
+    def _render(self, text: str) -> None:
+        engine = self._ensure_engine()
+        if engine is None or self._cache.lookup(text, *self._voice) is not None:
+            return
+        incoming = self._cache.incoming_path(text, *self._voice)
+        try:
+            engine.save_to_file(text, str(incoming))
+            engine.runAndWait()
+        except Exception:
+            self._engine = None
+            incoming.unlink(missing_ok=True)
+            return
+        if self._interrupt.is_set():
+            # Cut short by speech; a partial file must not be cached.
+            incoming.unlink(missing_ok=True)
+            return
+        self._cache.store(incoming, text, *self._voice)
+
+    def _run(self) -> None:
+        while True:
+            priority, _order, text, render = self._queue.get()
+            if text is None:
+                return
+            with self._lock:
+                self._speaking = priority
+                self._interrupt.clear()
+            try:
+                if render:
+                    self._render(text)
+                else:
+                    self._speak(text)
+            finally:
+                with self._lock:
+                    self._speaking = None
+                    if not render:
+                        self._pending -= 1
+                    self._idle.notify_all()
+
+
+_worker: Optional[SpeechWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_speech_worker() -> SpeechWorker:
+    """Process-wide worker, created on first use and drained at exit."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            cache = player = None
+            if SETTINGS.phrase_cache_max_mb > 0:
+                player = AudioPlayer()
+                if player.available:
+                    cache = PhraseCache(
+                        max_bytes=int(SETTINGS.phrase_cache_max_mb * 1024 * 1024),
+                        min_uses=SETTINGS.phrase_cache_min_uses,
+                    )
+            _worker = SpeechWorker(phrase_cache=cache, player=player if cache is not None else None)
+            atexit.register(_worker.close, _EXIT_DRAIN_SECONDS)
+        return _worker
+
+
+def speech_enabled() -> bool:
+    return MODE == "local" and _PYTTSX3_AVAILABLE
+
+
+def speak(text: str, priority: int = PRIORITY_NORMAL, fallback: Optional[Callable[[str], None]] = print) -> None:
+    """Speak ``text`` in the background in local mode; otherwise pass it to ``fallback``."""
+    if speech_enabled():
+        get_speech_worker().say(text, priority)
+    elif fallback is not None:
+        fallback(text)
+
+
+def prerender(phrases: Iterable[str]) -> None:
+    """Render fixed phrases to the audio cache in the background, in local mode."""
+    if speech_enabled():
+        get_speech_worker().prerender(phrases)
+
+
+def interrupt() -> None:
+    """Stop what is being said and drop queued speech, e.g. once a new request makes it stale.
+
+    Reminders are kept: they are spoken however busy the user is.
+    """
+    if _worker is not None:
+        _worker.interrupt()
+
+
+def wait_until_idle(timeout: Optional[float] = None) -> bool:
+    """Wait for queued speech to finish, e.g. before listening on the microphone."""
+    if _worker is None:
+        return True
+    return _worker.wait_idle(timeout)
@@ -0,0 +1,72 @@
+"""Time feature building with and without the retraining feature cache."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from personal_ai.learning.feature_cache import FeatureCache
+from personal_ai.learning.trainer import DEFAULT_MODEL_CONFIG, _build_features
+
+
+def synthetic_texts(rows: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(5000)]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(3, 12))) for _ in range(rows)]
+
+
+def best_of(run: Callable[[], object], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare plain TF-IDF fitting with cold and warm feature-cache runs.")
+    parser.add_argument("--rows", type=int, default=40_000, help="Synthetic training rows.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement; the best is reported.")
+    args = parser.parse_args()
+
+    config = DEFAULT_MODEL_CONFIG.features
+    texts = synthetic_texts(args.rows)
+    plain = best_of(lambda: _build_features(config).fit_transform(texts), args.repeats)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = Path(directory)
+
+        def cold_run() -> None:
+            cache = FeatureCache(config, cache_dir)
+            cache.fit_features(cache.index(texts))
+            cache.save()
+
+        def warm_run() -> None:
+            cache = FeatureCache(config, cache_dir).load()
+            cache.fit_features(cache.index(texts))
+
+        start = time.perf_counter()
+        cold_run()
+        cold = time.perf_counter() - start
+        warm = best_of(warm_run, args.repeats)
+        size_mb = sum(path.stat().st_size for path in cache_dir.rglob("*") if path.is_file()) / (1024 * 1024)
+
+    print(f"- rows: {args.rows}")
+    print(f"- plain fit: {plain:.2f}s")
+    print(f"- cold cache (fit + save): {cold:.2f}s")
+    print(f"- warm cache: {warm:.2f}s ({plain / warm:.1f}x faster than plain)")
+    print(f"- cache size: {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
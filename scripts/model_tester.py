@@ -1,86 +1,67 @@
 """Manual hard-case evaluator for the trained intent model."""
 
+from __future__ import annotations
+
+import argparse
+import sys
 from importlib.util import find_spec
 from pathlib import Path
 
-joblib = None
-np = None
-if find_spec("joblib") is not None:
-    import joblib  # type: ignore[assignment]
-if find_spec("numpy") is not None:
-    import numpy as np  # type: ignore[assignment]
-
-BASE_DIR = Path(__file__).resolve().parents[1]
-MODEL_PATH = BASE_DIR / "src" / "personal_ai" / "models" / "intent_model.pkl"
-if joblib is None or np is None:
-    raise SystemExit("Dependencies missing. Install requirements to run tests.")
-if not MODEL_PATH.exists():
-    raise SystemExit("Model not found. Train it with: python -m personal_ai.ml.train")
-model = joblib.load(MODEL_PATH)
-
-
-def predict_intent_with_confidence(text: str):
-    probs = model.predict_proba([text.lower()])[0]
-    labels = model.classes_
-    best_idx = int(np.argmax(probs))
-    return labels[best_idx], float(probs[best_idx])
-
-
-HARD_TEST_CASES = [
-    ("yo", "reply"),
-    ("sup", "reply"),
-    ("hello bhai", "reply"),
-    ("hey yaar", "reply"),
-    ("could you please open my browser for me", "open_app"),
-    ("can you start vs code right now", "open_app"),
-    ("i want you to open chrome asap", "open_app"),
-    ("pls launch youtube app", "open_app"),
-    ("i am done with chrome, close it", "close_app"),
-    ("this browser is annoying, quit it", "close_app"),
-    ("can you stop youtube now", "close_app"),
-    ("umm can you maybe search best python scraping libs", "search"),
-    ("bro find me dotnet fresher jobs near rajkot", "search"),
-    ("hey google sql joins example", "search"),
-    ("look something up about entity framework", "search"),
-    ("bro what's the time right now", "time"),
-    ("tell me today's date please yaar", "time"),
-    ("what day is it today actually", "time"),
-    ("opn chorme", "open_app"),
-    ("cls crome", "close_app"),
-    ("serch pythn", "search"),
-    ("wat tym", "time"),
-    ("jok", "joke"),
-    ("make a note of this please", "write_file"),
-    ("can you save this message for me", "write_file"),
-    ("show me whatever i wrote earlier", "read_file"),
-    ("read out my notes", "read_file"),
-    ("open chrome and search python tutorials", "open_app"),
-    ("close youtube and tell me a joke", "close_app"),
-    ("search sql joins then open vs code", "search"),
-    ("i think i'm done here", "exit"),
-    ("you can stop now", "exit"),
-    ("let's end this", "exit"),
-    ("open", "open_app"),
-    ("close", "close_app"),
-    ("search something", "search"),
-    ("do something", "reply"),
-]
-
-
-def run_hard_tests() -> None:
-    """Run hard-coded intent checks against the model."""
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+LEGACY_MODEL_PATH = PROJECT_ROOT / "personal_ai" / "models" / "intent_model.pkl"
+
+
+def run_hard_tests(model_path: Path) -> None:
+    """Run hard-coded intent checks against the model in one batch."""
+    import joblib
+
+    from personal_ai.learning.evaluator import HARD_TEST_CASES, hard_case_results
+
+    model = joblib.load(model_path)
+    results = hard_case_results(model)
     passed = 0
-    for text, expected in HARD_TEST_CASES:
-        pred, conf = predict_intent_with_confidence(text)
-        ok = "✅ PASS" if pred == expected else "❌ FAIL"
-        print(f"{ok} | '{text}' → {pred} (conf={conf:.2f}), expected={expected}")
-        if pred == expected:
-            passed += 1
+    for row in results:
+        ok = row["predicted"] == row["expected"]
+        passed += ok
+        print(
+            f"{'✅ PASS' if ok else '❌ FAIL'} | '{row['text']}' → {row['predicted']} "
+            f"(conf={row['confidence']:.2f}), expected={row['expected']}"
+        )
 
     total = len(HARD_TEST_CASES)
     acc = passed / total * 100
     print(f"\n🔥 Boss-level Accuracy: {passed}/{total} = {acc:.1f}%")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run hard-case checks, or compare several models.")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        type=Path,
+        help="Benchmark these model files side by side instead of checking the current model.",
+    )
+    args = parser.parse_args()
+
+    if find_spec("joblib") is None or find_spec("sklearn") is None:
+        raise SystemExit("Dependencies missing. Install requirements to run tests.")
+
+    if args.models:
+        from personal_ai.learning.evaluator import benchmark_models, format_report
+
+        print(format_report(benchmark_models(args.models)))
+        return
+
+    from personal_ai.learning.registry import current_model_path
+
+    model_path = current_model_path(LEGACY_MODEL_PATH)
+    if model_path is None:
+        raise SystemExit("Model not found. Train it with: python -m personal_ai.ml.train")
+    run_hard_tests(model_path)
+
+
 if __name__ == "__main__":
-    run_hard_tests()
+    main()
@@ -12,6 +12,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from personal_ai.learning.trainer import train_and_compare
+from personal_ai.learning.tuning import SearchSpace
 
 
 def main() -> None:
@@ -21,9 +22,32 @@ def main() -> None:
         type=Path,
         help="Optional path to write the full retraining result as JSON.",
     )
+    parser.add_argument(
+        "--search",
+        choices=["grid", "random"],
+        help="Tune vectorizer and classifier settings before training the candidate.",
+    )
+    parser.add_argument(
+        "--search-samples",
+        type=int,
+        default=10,
+        help="Number of configurations to sample with --search random.",
+    )
+    parser.add_argument(
+        "--search-workers",
+        type=int,
+        help="Worker processes for --search (default: one per CPU).",
+    )
     args = parser.parse_args()
 
-    result = train_and_compare()
+    search = None
+    if args.search:
+        search = SearchSpace(
+            samples=args.search_samples if args.search == "random" else None,
+            max_workers=args.search_workers,
+        )
+
+    result = train_and_compare(search=search)
 
     if args.json_output:
         args.json_output.parent.mkdir(parents=True, exist_ok=True)
@@ -31,8 +55,16 @@ def main() -> None:
 
     print("Retraining result:")
     for key, value in result.items():
+        if key == "search":
+            continue
         print(f"- {key}: {value}")
 
+    for row in result.get("search", []):
+        print(
+            "  word={word_ngram_range} char={char_ngram_range} C={C}: acc={accuracy:.3f} "
+            "f1={f1_macro:.3f} fit={fit_seconds:.2f}s p50={latency_ms[single_p50]:.2f}ms".format(**row)
+        )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,40 @@
+"""Unit tests for typo-tolerant app name resolution."""
+
+from personal_ai.actions.app_actions import resolve_app, resolve_app_with_score
+from personal_ai.actions.app_resolver import AppResolver, edit_distance
+
+
+def test_exact_aliases_score_one():
+    assert resolve_app_with_score("open google chrome") == ("chrome", 1.0)
+    assert resolve_app("close notepad") == "notepad"
+    assert resolve_app("open vs-code") == "vscode"
+
+
+def test_misspellings_resolve_with_lower_confidence():
+    app, score = resolve_app_with_score("open crome")
+    assert app == "chrome" and 0.7 < score < 1.0
+    assert resolve_app("open vs cod") == "vscode"
+    assert resolve_app("launch youtub") == "youtube"
+
+
+def test_short_words_and_unrelated_text_do_not_match():
+    assert resolve_app_with_score("search python tutorials") == (None, 0.0)
+    assert resolve_app("open mode") is None
+    assert resolve_app("i do not want that") is None
+
+
+def test_edit_distance_counts_transposition_once():
+    assert edit_distance("chrmoe", "chrome", 2) == 1
+    assert edit_distance("abcdef", "uvwxyz", 2) == 3
+
+
+def test_large_alias_table():
+    aliases = {f"app{index}": [f"application number {index}", f"tool{index:05d}x"] for index in range(3000)}
+    aliases["spotify"] = ["spotify", "music player"]
+    resolver = AppResolver(aliases)
+
+    assert len(resolver) > 6000
+    assert resolver.match("play something on spotfy").app == "spotify"
+    assert resolver.match("open tool01234x").app == "app1234"
+    assert resolver.match("open tool01234y").app == "app1234"
+    assert resolver.match("open the music playr").app == "spotify"
@@ -1,11 +1,15 @@
 """Unit tests for assistant intent handling."""
 
+import pytest
+
 from personal_ai.core import assistant
+from personal_ai.core.cancellation import CancelToken, RequestCancelled
+from personal_ai.core.sessions import SessionStore
 
 
 def test_handle_input_search_intent(monkeypatch):
     monkeypatch.setattr(assistant, "predict_intent_with_confidence", lambda _text: ("search", 0.95))
-    monkeypatch.setattr(assistant, "search_action", lambda _text: None)
+    monkeypatch.setattr(assistant, "search_flow", lambda _text: iter(()))
     monkeypatch.setattr(assistant, "load_profile", lambda: {"user_name": "", "preferred_mode": "", "last_intent": ""})
     monkeypatch.setattr(assistant, "save_profile", lambda _profile: None)
 
@@ -66,7 +70,7 @@ def test_chat_reply_without_openai_api_key_uses_local_fallback(monkeypatch):
     monkeypatch.setattr(assistant, "predict_intent_with_confidence", lambda _text: ("reply", 0.95))
     monkeypatch.setattr(assistant, "load_profile", lambda: {"user_name": "", "preferred_mode": "", "last_intent": ""})
     monkeypatch.setattr(assistant, "save_profile", lambda _profile: None)
-    monkeypatch.setattr(assistant, "speak", lambda _text: None)
+    monkeypatch.setattr(assistant, "speak", lambda _text, *_priority: None)
 
     result = assistant.handle_input("hello")
 
@@ -99,3 +103,130 @@ def test_get_chat_provider_prefers_groq(monkeypatch):
     assert provider is not None
     assert provider.api_key == "groq-test"
     assert provider.base_url == "https://api.groq.com/openai/v1"
+
+
+def test_handle_chat_input_uses_session_history(monkeypatch):
+    captured = []
+
+    class FakeProvider:
+        def generate(self, messages):
+            captured.append(messages)
+            return f"reply {len(captured)}"
+
+    monkeypatch.setattr(assistant, "get_chat_provider", lambda: FakeProvider())
+    monkeypatch.setattr(assistant, "SESSIONS", SessionStore(max_turns=6))
+
+    first = assistant.handle_chat_input("Hi there", session_id="session-abc")
+    assistant.handle_chat_input("And again?", session_id="session-abc")
+
+    assert first["session_id"] == "session-abc"
+    assert captured[1][1:] == [
+        {"role": "user", "content": "Hi there"},
+        {"role": "assistant", "content": "reply 1"},
+        {"role": "user", "content": "And again?"},
+    ]
+
+
+def test_cancelled_chat_turn_is_not_recorded(monkeypatch):
+    token = CancelToken()
+
+    class CancellingProvider:
+        def generate(self, messages, cancel=None):
+            cancel.cancel()
+            raise RequestCancelled("superseded")
+
+    monkeypatch.setattr(assistant, "get_chat_provider", lambda: CancellingProvider())
+    monkeypatch.setattr(assistant, "SESSIONS", SessionStore())
+
+    with pytest.raises(RequestCancelled):
+        assistant.handle_chat_input("hello", session_id="session-abc", cancel=token)
+    assert assistant.SESSIONS.history("session-abc") == []
+
+
+def test_superseded_llm_call_never_falls_back_to_commands(monkeypatch):
+    token = CancelToken()
+
+    class FailingProvider:
+        def generate(self, messages, cancel=None):
+            # A newer message arrives, then the aborted connection fails.
+            assert cancel.cancel_if_interruptible()
+            raise RuntimeError("LLM request failed: connection reset")
+
+    monkeypatch.setattr(assistant, "get_chat_provider", lambda: FailingProvider())
+    monkeypatch.setattr(assistant, "handle_input", lambda *_args, **_kwargs: pytest.fail("commands must not run"))
+
+    with pytest.raises(RequestCancelled):
+        assistant.handle_chat_input("open chrome", cancel=token)
+
+
+def test_earlier_messages_are_sent_and_recorded_as_separate_turns(monkeypatch):
+    captured = []
+
+    class FakeProvider:
+        def generate(self, messages, cancel=None):
+            captured.append(messages)
+            return "both answered"
+
+    monkeypatch.setattr(assistant, "get_chat_provider", lambda: FakeProvider())
+    monkeypatch.setattr(assistant, "SESSIONS", SessionStore())
+
+    assistant.handle_chat_input("and in Paris?", session_id="session-abc", cancel=CancelToken(), earlier=["weather in London"])
+
+    turns = [
+        {"role": "user", "content": "weather in London"},
+        {"role": "user", "content": "and in Paris?"},
+    ]
+    assert captured[0][1:] == turns
+    assert assistant.SESSIONS.history("session-abc") == turns + [{"role": "assistant", "content": "both answered"}]
+
+
+def test_chained_commands_run_together_and_keep_order(monkeypatch):
+    intents = {"search python": "search", "tell me the time": "time", "write a note": "write_file", "joke": "joke"}
+    monkeypatch.setattr(assistant, "predict_intent_with_confidence", lambda text: (intents[text], 0.95))
+    monkeypatch.setattr(assistant, "search_flow", lambda _text: iter(()))
+    monkeypatch.setattr(assistant, "time_action", lambda _text: None)
+    monkeypatch.setattr(assistant, "joke_action", lambda _text: None)
+    monkeypatch.setattr(assistant, "split_commands", lambda _text: ["search python", "tell me the time", "write a note", "joke"])
+    saved = []
+    monkeypatch.setattr(assistant, "load_profile", lambda: {"user_name": "", "preferred_mode": "", "last_intent": ""})
+    monkeypatch.setattr(assistant, "save_profile", saved.append)
+
+    result = assistant.handle_input("search python and tell me the time and write a note and joke")
+
+    # The note question waits for its answer; the joke after it has not run yet.
+    assert [command["intent"] for command in result["commands"]] == ["search", "time", "write_file"]
+    assert result["reply"] == "What should I write?"
+    assert [profile["last_intent"] for profile in saved] == ["write_file"]
+    assert all("learned" not in command for command in result["commands"])
+
+    assistant.DIALOGS.cancel(result["continuation"])
+
+
+def test_low_confidence_command_asks_and_logs_the_correction(tmp_path, monkeypatch):
+    from personal_ai.learning import collector
+
+    monkeypatch.setattr(assistant, "predict_intent_with_confidence", lambda _text: ("search", 0.2))
+    monkeypatch.setattr(assistant, "search_flow", lambda _text: pytest.fail("nothing runs on a guess"))
+    monkeypatch.setattr(assistant, "load_profile", lambda: {"last_intent": ""})
+    monkeypatch.setattr(assistant, "save_profile", lambda _profile: None)
+    monkeypatch.setattr(assistant, "speak", lambda _text, *_priority: None)
+    monkeypatch.setattr(assistant, "interrupt_speech", lambda: None)
+    monkeypatch.setattr(collector, "AUTO_DATA_PATH", tmp_path / "auto_intents.csv")
+    # The online learner subscribes to the collector the same way.
+    learned = []
+    monkeypatch.setattr(collector, "_listeners", [lambda *sample: learned.append(sample)])
+
+    first = assistant.handle_input("make me laugh please")
+    assert first["reply"] == "I'm not sure what you meant. Did you mean search? Say yes or no."
+    assert first["commands"][0]["actions"] == ["active_learning_feedback"]
+
+    second = assistant.handle_input("no", continuation=first["continuation"])
+    assert second["reply"].startswith("Okay, what did you mean?")
+
+    third = assistant.handle_input("joke", continuation=second["continuation"])
+    assert third["continuation"] is None
+    assert learned == [("make me laugh please", "joke", 1.0, "corrected")]
+
+    unsure = assistant.handle_input("make me laugh please")
+    assert assistant.handle_input("maybe", continuation=unsure["continuation"])["reply"] == "Okay."
+    assert len(learned) == 1
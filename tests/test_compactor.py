@@ -0,0 +1,143 @@
+"""Tests for auto-learn compaction."""
+
+import csv
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import collector
+from personal_ai.learning.compactor import compact_auto_samples, load_auto_samples, store_path_for
+
+
+def _write_rows(path: Path, rows) -> None:
+    with path.open("a", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=collector.FIELDNAMES)
+        if handle.tell() == 0:
+            writer.writeheader()
+        for index, (text, intent, confidence) in enumerate(rows):
+            writer.writerow(
+                {
+                    "text": text,
+                    "intent": intent,
+                    "confidence": confidence,
+                    "source": "auto",
+                    "timestamp": f"2026-01-01T00:00:{index:02d}+00:00",
+                }
+            )
+
+
+def test_compaction_dedupes_counts_and_trims_csv(tmp_path: Path) -> None:
+    csv_path = tmp_path / "auto_intents.csv"
+    _write_rows(
+        csv_path,
+        [("open chrome", "open_app", 0.9)] * 5 + [("Open  Chrome!", "open_app", 0.95), ("what time is it", "time", 0.8)],
+    )
+
+    report = compact_auto_samples(csv_path, max_per_intent=100)
+
+    assert report.csv_rows == 7
+    assert report.stored_rows == 2
+    assert csv_path.read_text(encoding="utf-8") == ""
+    samples = load_auto_samples(csv_path, min_conf=0.75)
+    assert sorted(samples["text"]) == ["open chrome", "what time is it"]
+
+    _write_rows(csv_path, [("open chrome", "open_app", 0.85), ("play music", "play_music", 0.9)])
+    assert len(load_auto_samples(csv_path, min_conf=0.75)) == 4
+
+    compact_auto_samples(csv_path, max_per_intent=100)
+
+    import numpy as np
+
+    with np.load(store_path_for(csv_path)) as data:
+        counts = dict(zip(data["text"], data["count"]))
+        confidence = dict(zip(data["text"], data["confidence"]))
+    assert counts == {"open chrome": 7, "what time is it": 1, "play music": 1}
+    assert confidence["open chrome"] == pytest.approx(0.95)
+
+
+def test_compaction_caps_each_intent_keeping_frequent_rows(tmp_path: Path) -> None:
+    csv_path = tmp_path / "auto_intents.csv"
+    _write_rows(
+        csv_path,
+        [("open chrome", "open_app", 0.9)] * 3
+        + [("open edge", "open_app", 0.9)] * 2
+        + [("open paint", "open_app", 0.9), ("what time is it", "time", 0.9)],
+    )
+
+    report = compact_auto_samples(csv_path, max_per_intent=2)
+
+    assert report.dropped_rows == 1
+    samples = load_auto_samples(csv_path, min_conf=0.0)
+    assert sorted(samples["text"]) == ["open chrome", "open edge", "what time is it"]
+
+
+def test_compaction_keeps_partial_trailing_row(tmp_path: Path) -> None:
+    csv_path = tmp_path / "auto_intents.csv"
+    _write_rows(csv_path, [("open chrome", "open_app", 0.9)])
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write("play mus")
+
+    compact_auto_samples(csv_path, max_per_intent=10)
+
+    assert csv_path.read_text(encoding="utf-8").splitlines() == [",".join(collector.FIELDNAMES), "play mus"]
+
+
+def test_compaction_waits_for_the_writer_lock_held_by_another_process(tmp_path: Path) -> None:
+    csv_path = tmp_path / "auto_intents.csv"
+    _write_rows(csv_path, [("open chrome", "open_app", 0.9)])
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from pathlib import Path; from personal_ai.learning import collector\n"
+            "with collector.write_lock(Path(sys.argv[1])):\n"
+            "    print('locked', flush=True)\n"
+            "    sys.stdin.readline()\n"
+            "    with open(sys.argv[1], 'a', encoding='utf-8') as handle:\n"
+            "        handle.write('play music,play_music,0.9,auto,2026-01-02T00:00:00+00:00\\r\\n')\n",
+            str(csv_path),
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        compaction = threading.Thread(target=compact_auto_samples, args=(csv_path, 100))
+        compaction.start()
+        compaction.join(0.5)
+        assert compaction.is_alive()
+
+        # The row written under the lock survives the truncation that follows it.
+        holder.stdin.write("go\n")
+        holder.stdin.flush()
+        compaction.join(30)
+        assert not compaction.is_alive()
+    finally:
+        holder.stdin.close()
+        holder.wait(30)
+
+    assert sorted(load_auto_samples(csv_path, min_conf=0.0)["text"]) == ["open chrome", "play music"]
+
+
+def test_compaction_streams_chunks_and_stops_at_the_last_whole_row(tmp_path: Path, monkeypatch) -> None:
+    from personal_ai.learning import compactor
+
+    monkeypatch.setattr(compactor, "_CHUNK_ROWS", 3)
+    monkeypatch.setattr(compactor, "_SCAN_BYTES", 8)
+    csv_path = tmp_path / "auto_intents.csv"
+    _write_rows(csv_path, [(f"note {index % 4}", "take_note", 0.9) for index in range(10)])
+    partial = "a partial row longer than one scan block"
+    with csv_path.open("a", encoding="utf-8") as handle:
+        handle.write(partial)
+
+    report = compact_auto_samples(csv_path, max_per_intent=100)
+
+    assert report.csv_rows == 10 and report.stored_rows == 4
+    assert csv_path.read_text(encoding="utf-8").splitlines()[1:] == [partial]
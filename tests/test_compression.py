@@ -0,0 +1,80 @@
+"""Tests for model pruning and quantization."""
+
+import dataclasses
+import io
+import shutil
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import trainer
+from personal_ai.learning.compression import CompressedIntentModel, QuantizedLinearClassifier, compress_model
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    split = trainer._split_dataset(trainer._load_dataset())
+    return split, trainer._fit_candidate(split)
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_quantized_classifier_tracks_float_model(fitted, dtype: str) -> None:
+    split, model = fitted
+    clf = model.named_steps["clf"]
+    X = model.named_steps["features"].transform(split.X_test)
+
+    quantized = QuantizedLinearClassifier.from_linear(clf, dtype=dtype)
+
+    np.testing.assert_allclose(quantized.predict_proba(X), clf.predict_proba(X), atol=0.02)
+    assert (quantized.predict(X) == clf.predict(X)).mean() >= 0.95
+
+
+def test_compress_model_prunes_vocabulary_and_shrinks_artifact(fitted) -> None:
+    split, model = fitted
+
+    compressed, report = compress_model(model, split, max_features=1500, dtype="int8")
+
+    features = compressed.named_steps["features"]
+    assert sum(len(vec.vocabulary_) for _name, vec in features.transformer_list) == 1500
+    assert report.compressed["n_features"] == 1500
+    assert report.compressed["size_bytes"] < report.original["size_bytes"] / 2
+
+    buffer = io.BytesIO()
+    joblib.dump(compressed, buffer)
+    buffer.seek(0)
+    reloaded = joblib.load(buffer)
+    np.testing.assert_allclose(reloaded.predict_proba(split.X_test), compressed.predict_proba(split.X_test))
+
+
+def test_trainer_promotes_compressed_model_only_within_tolerance(tmp_path: Path, monkeypatch) -> None:
+    models = tmp_path / "models"
+    monkeypatch.setattr(trainer, "AUTO_DATA_PATH", tmp_path / "auto_intents.csv")
+    monkeypatch.setattr(trainer, "MODEL_DIR", models)
+    monkeypatch.setattr(trainer, "LEGACY_MODEL", models / "intent_model.pkl")
+    monkeypatch.setattr(trainer, "METRICS_PATH", models / "model_metrics.json")
+    monkeypatch.setattr(trainer, "VERSION_PATH", models / "model_version.json")
+    settings = dataclasses.replace(trainer.SETTINGS, model_compression="int8", model_max_features=50)
+
+    monkeypatch.setattr(trainer, "SETTINGS", dataclasses.replace(settings, compression_accuracy_tolerance=0.0))
+    strict = trainer.train_and_compare()
+    assert strict["compression"]["accepted"] is False
+    assert not isinstance(joblib.load(trainer._current_model_path()), CompressedIntentModel)
+
+    shutil.rmtree(models / "registry")
+    monkeypatch.setattr(trainer, "SETTINGS", dataclasses.replace(settings, compression_accuracy_tolerance=1.0))
+    loose = trainer.train_and_compare()
+    assert loose["compression"]["accepted"] is True
+    assert isinstance(joblib.load(trainer._current_model_path()).clf, QuantizedLinearClassifier)
+    assert loose["candidate_accuracy"] == loose["compression"]["compressed"]["accuracy"]
+
+
+def test_trainer_rejects_unknown_compression_before_loading_data(monkeypatch) -> None:
+    monkeypatch.setattr(trainer, "SETTINGS", dataclasses.replace(trainer.SETTINGS, model_compression="int4"))
+    monkeypatch.setattr(trainer, "DATA_PATH", Path("/nonexistent/intents.csv"))
+
+    with pytest.raises(ValueError, match="MODEL_COMPRESSION='int4'"):
+        trainer.train_and_compare()
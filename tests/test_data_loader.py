@@ -0,0 +1,79 @@
+"""Tests for the streaming training data loader."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import trainer
+from personal_ai.learning.data_loader import load_training_data, normalize_series
+
+
+def test_normalize_series_matches_row_normalizer() -> None:
+    texts = pd.Series(["Open  Chrome!!", "what's_the time?", "Héllo\twörld ½", "", "  "])
+
+    assert normalize_series(texts).tolist() == [trainer._normalize(text) for text in texts]
+
+
+def test_loader_streams_dedupes_and_filters_low_confidence(tmp_path: Path) -> None:
+    data_path = tmp_path / "intents.csv"
+    auto_path = tmp_path / "auto_intents.csv"
+    data_path.write_text("text,intent\nOpen Chrome,open_app\nopen chrome!,open_app\nwhat time is it,time\n", encoding="utf-8")
+    auto_path.write_text(
+        "text,intent,confidence,source,timestamp\n"
+        "play music,play_music,0.9,auto,t\n"
+        "play noise,play_music,0.1,auto,t\n"
+        "open chrome,open_app,0.9,auto,t\n",
+        encoding="utf-8",
+    )
+
+    df, report = load_training_data(data_path, auto_path, memory_limit_mb=0, chunksize=1)
+
+    assert df.values.tolist() == [["open chrome", "open_app"], ["what time is it", "time"], ["play music", "play_music"]]
+    assert report.rows_read == 5
+    assert report.duplicates == 2
+    assert not report.sampled
+
+
+def test_loader_enforces_memory_ceiling_with_per_intent_samples(tmp_path: Path) -> None:
+    data_path = tmp_path / "intents.csv"
+    rows = [f"open app number {i},open_app" for i in range(4000)] + [f"set timer for {i} minutes,timer" for i in range(4000)]
+    data_path.write_text("text,intent\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    limit_mb = 0.25
+
+    df, report = load_training_data(data_path, tmp_path / "missing.csv", memory_limit_mb=limit_mb, chunksize=500)
+
+    assert report.sampled
+    assert report.rows_read == 8000
+    assert report.estimated_mb <= limit_mb
+    assert report.per_intent_seen == {"open_app": 4000, "timer": 4000}
+    assert 0 < report.per_intent_kept["open_app"] < 4000
+    assert report.per_intent_kept["open_app"] == report.per_intent_kept["timer"]
+    assert len(df) == report.rows_kept
+    assert df["text"].is_unique
+
+
+def test_memory_ceiling_counts_vectorized_features(tmp_path: Path) -> None:
+    from personal_ai.learning.data_loader import estimated_nnz
+
+    data_path = tmp_path / "intents.csv"
+    rows = [f"open app number {i},open_app" for i in range(2000)] + [f"set timer for {i} minutes,timer" for i in range(2000)]
+    data_path.write_text("text,intent\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    missing = tmp_path / "missing.csv"
+
+    text_only, _ = load_training_data(data_path, missing, memory_limit_mb=1.0, feature_copies=0)
+    one_pair, one_report = load_training_data(data_path, missing, memory_limit_mb=1.0)
+    search, search_report = load_training_data(data_path, missing, memory_limit_mb=1.0, feature_copies=10)
+
+    assert len(text_only) == 4000
+    assert one_report.sampled and search_report.sampled
+    assert len(search) < len(one_pair) < len(text_only)
+    assert search_report.as_dict()["feature_copies"] == 10
+
+    features = trainer._build_features(trainer.DEFAULT_MODEL_CONFIG.features)
+    matrix = features.fit_transform(one_pair["text"])
+    config = trainer.DEFAULT_MODEL_CONFIG.features
+    bound = sum(estimated_nnz(text, config.word_ngram_range, config.char_ngram_range) for text in one_pair["text"])
+    assert matrix.nnz <= bound
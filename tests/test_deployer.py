@@ -0,0 +1,108 @@
+"""Tests for the change-driven retraining scheduler."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import collector
+from personal_ai.learning.deployer import RetrainPolicy, RetrainScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def paths(tmp_path: Path, monkeypatch):
+    auto_path = tmp_path / "auto_intents.csv"
+    data_path = tmp_path / "intents.csv"
+    data_path.write_text("text,intent\nopen chrome,open_app\n", encoding="utf-8")
+    monkeypatch.setattr(collector, "AUTO_DATA_PATH", auto_path)
+    return tmp_path, data_path, auto_path
+
+
+def _scheduler(paths, runs, clock, fingerprint="fp-1") -> RetrainScheduler:
+    tmp_path, data_path, auto_path = paths
+
+    def runner(previous):
+        runs.append(previous)
+        return {"action": "skipped" if previous == fingerprint else "promoted", "data_fingerprint": fingerprint}
+
+    policy = RetrainPolicy(
+        min_samples=10,
+        min_corrections=2,
+        debounce_seconds=60,
+        min_interval_seconds=300,
+        max_interval_seconds=3600,
+        poll_seconds=1,
+    )
+    return RetrainScheduler(
+        policy=policy,
+        state_path=tmp_path / "retrain_state.json",
+        data_path=data_path,
+        auto_path=auto_path,
+        runner=runner,
+        clock=clock,
+    )
+
+
+def test_first_run_waits_for_debounce_then_records_state(paths) -> None:
+    clock, runs = FakeClock(), []
+    scheduler = _scheduler(paths, runs, clock)
+
+    assert scheduler.step() is None
+    clock.now += 61
+    result = scheduler.step()
+
+    assert result["reason"] == "dataset changed"
+    assert runs == [None]
+    assert scheduler.state.fingerprint == "fp-1"
+    clock.now += 10_000
+    assert scheduler.step() is None
+
+
+def test_corrections_trigger_after_burst_settles(paths) -> None:
+    clock, runs = FakeClock(), []
+    scheduler = _scheduler(paths, runs, clock)
+    scheduler.step()
+    clock.now += 61
+    scheduler.step()
+    clock.now += 400
+
+    collector.log_sample("open chrome please", "open_app", 1.0, source="corrected")
+    collector.log_sample("play some music", "play_music", 0.9, source="auto")
+    assert scheduler.step() is None
+    assert (scheduler.pending_samples, scheduler.pending_corrections) == (1, 1)
+
+    collector.log_sample("launch the browser", "open_app", 1.0, source="corrected")
+    clock.now += 30
+    assert scheduler.step() is None
+    clock.now += 61
+    result = scheduler.step()
+
+    assert result["reason"] == "2 corrections"
+    assert result["action"] == "skipped"
+    assert runs == [None, "fp-1"]
+    assert scheduler.pending_corrections == 0
+
+
+def test_state_survives_restart_and_min_interval_applies(paths) -> None:
+    clock, runs = FakeClock(), []
+    _scheduler(paths, runs, clock).run("manual")
+
+    restarted = _scheduler(paths, runs, clock)
+    for index in range(12):
+        collector.log_sample(f"open app number {index}", "open_app", 0.9)
+    clock.now += 120
+    restarted.poll()
+    clock.now += 61
+    assert restarted.due() is None
+
+    clock.now += 300
+    assert restarted.due() == "12 new samples"
@@ -0,0 +1,95 @@
+"""Tests for resumable dialog flows."""
+
+import pytest
+
+from personal_ai.actions import app_actions
+from personal_ai.core import assistant
+from personal_ai.core.dialog import DialogManager, Prompt, run_blocking
+from personal_ai.voice import tts
+
+
+def _two_questions():
+    name = yield Prompt("Name?")
+    colour = yield Prompt("Colour?")
+    return f"{name} likes {colour}"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_flow_resumes_by_token_and_tokens_are_single_use() -> None:
+    dialogs = DialogManager(ttl_seconds=60)
+
+    step = dialogs.start(_two_questions(), {"intent": "demo"})
+    assert step.prompt.text == "Name?"
+    second = dialogs.resume(step.prompt.token, "Ada")
+    assert second.prompt.text == "Colour?"
+    with pytest.raises(LookupError):
+        dialogs.resume(step.prompt.token, "again")
+
+    done = dialogs.resume(second.prompt.token, "blue")
+    assert done.finished and done.result == "Ada likes blue"
+    assert done.context == {"intent": "demo"}
+    assert len(dialogs) == 0
+
+
+def test_parked_flows_expire() -> None:
+    clock = FakeClock()
+    dialogs = DialogManager(ttl_seconds=30, clock=clock)
+    token = dialogs.start(_two_questions()).prompt.token
+
+    clock.now = 31
+    with pytest.raises(LookupError):
+        dialogs.resume(token, "Ada")
+
+
+def test_run_blocking_answers_prompts_in_order() -> None:
+    answers = iter(["Ada", "blue"])
+    asked = []
+
+    result = run_blocking(_two_questions(), lambda question: asked.append(question) or next(answers))
+
+    assert result == "Ada likes blue"
+    assert asked == ["Name?", "Colour?"]
+
+
+def test_write_note_over_api_turns_then_runs_chained_command(tmp_path, monkeypatch) -> None:
+    intents = {"write a note": "write_file", "tell me a joke": "joke"}
+    monkeypatch.setattr(assistant, "predict_intent_with_confidence", lambda text: (intents[text], 0.95))
+    monkeypatch.setattr(assistant, "load_profile", lambda: {"last_intent": ""})
+    monkeypatch.setattr(assistant, "save_profile", lambda _profile: None)
+    spoken = []
+    monkeypatch.setattr(assistant, "speak", lambda text, priority=tts.PRIORITY_NORMAL: spoken.append((text, priority)))
+    monkeypatch.setattr(app_actions, "speak", lambda _text, *_priority: None)
+    interrupts = []
+    monkeypatch.setattr(assistant, "interrupt_speech", lambda: interrupts.append(True))
+    monkeypatch.setattr(app_actions, "listen_text", lambda: pytest.fail("must not block on input"))
+    monkeypatch.setattr(app_actions, "NOTES_FILE", tmp_path / "notes.txt")
+    jokes = []
+    monkeypatch.setattr(assistant, "joke_action", jokes.append)
+
+    first = assistant.handle_input("write a note and tell me a joke")
+    assert first["reply"] == "What should I write?"
+    assert jokes == []
+    assert spoken == [("What should I write?", tts.PRIORITY_PROMPT)]
+    assert interrupts == [True]
+
+    second = assistant.handle_input("buy milk", continuation=first["continuation"])
+    assert second["reply"] == "Append to notes or overwrite?"
+    assert spoken[-1] == ("Append to notes or overwrite?", tts.PRIORITY_PROMPT)
+    # Answering a question continues the request, so nothing is interrupted.
+    assert interrupts == [True]
+
+    third = assistant.handle_input("append", continuation=second["continuation"])
+    assert third["continuation"] is None
+    assert [command["reply"] for command in third["commands"]] == ["Saved.", "Told a joke."]
+    assert jokes == ["tell me a joke"]
+    assert "buy milk" in (tmp_path / "notes.txt").read_text(encoding="utf-8")
+
+    expired = assistant.handle_input("yes", continuation=first["continuation"])
+    assert "expired" in expired["reply"]
@@ -0,0 +1,53 @@
+"""Tests for the model benchmark report."""
+
+from pathlib import Path
+
+import joblib
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import evaluator, trainer
+
+
+@pytest.fixture(scope="module")
+def model_paths(tmp_path_factory) -> list[Path]:
+    split = trainer._split_dataset(trainer._load_dataset())
+    directory = tmp_path_factory.mktemp("models")
+    paths = []
+    for name, c in (("small_c.pkl", 0.5), ("large_c.pkl", 4.0)):
+        model = trainer._fit_candidate(split, trainer.ModelConfig(C=c))
+        path = directory / name
+        joblib.dump(model, path)
+        paths.append(path)
+    return paths
+
+
+def test_benchmark_models_reports_every_metric(model_paths: list[Path]) -> None:
+    benchmarks = evaluator.benchmark_models(model_paths)
+
+    assert [bench.name for bench in benchmarks] == ["small_c.pkl", "large_c.pkl"]
+    for bench in benchmarks:
+        assert 0.0 < bench.accuracy <= 1.0
+        assert 0.0 <= bench.hard_accuracy <= 1.0
+        assert len(bench.hard_failures) == round((1 - bench.hard_accuracy) * len(evaluator.HARD_TEST_CASES))
+        assert bench.size_bytes == Path(bench.path).stat().st_size
+        assert bench.load_seconds > 0
+        assert set(bench.latency_ms) == {"single_p50", "single_p99", "batch_p50", "batch_p99", "batch_per_item"}
+        assert bench.latency_ms["single_p50"] <= bench.latency_ms["single_p99"]
+
+    report = evaluator.format_report(benchmarks).splitlines()
+    assert report[0].split() == ["metric", "small_c.pkl", "large_c.pkl"]
+    assert {line.split()[0] for line in report[2:]} >= {"accuracy", "hard_accuracy", "single_p99_ms", "size_kb", "rss_delta_mb"}
+
+
+def test_hard_case_results_predicts_in_one_batch(model_paths: list[Path]) -> None:
+    model = joblib.load(model_paths[0])
+    calls = []
+    real = model.predict_proba
+    model.predict_proba = lambda texts: calls.append(len(texts)) or real(texts)
+
+    results = evaluator.hard_case_results(model)
+
+    assert calls == [len(evaluator.HARD_TEST_CASES)]
+    assert [row["text"] for row in results] == [text.lower() for text, _ in evaluator.HARD_TEST_CASES]
@@ -0,0 +1,47 @@
+"""Unit tests for dependency-aware command execution."""
+
+import threading
+
+from personal_ai.core.executor import CommandExecutor, PlannedCommand, dependencies, execution_levels
+
+
+def _plans(*specs):
+    return [PlannedCommand(index=i, text=text, target=target, exclusive=exclusive) for i, (text, target, exclusive) in enumerate(specs)]
+
+
+def test_independent_commands_share_a_level():
+    plans = _plans(("search python", None, False), ("time", None, False), ("open youtube", "app:youtube", False))
+    assert [[plan.index for plan in level] for level in execution_levels(plans)] == [[0, 1, 2]]
+
+
+def test_same_target_and_exclusive_commands_stay_ordered():
+    plans = _plans(
+        ("open chrome", "app:chrome", False),
+        ("tell me a joke", None, False),
+        ("close chrome", "app:chrome", False),
+        ("write a note", "notes", True),
+        ("time", None, False),
+    )
+    assert dependencies(plans)[2] == {0}
+    levels = [[plan.index for plan in level] for level in execution_levels(plans)]
+    assert levels == [[0, 1], [2], [3], [4]]
+
+
+def test_run_level_runs_concurrently_and_keeps_order():
+    executor = CommandExecutor(max_workers=3)
+    barrier = threading.Barrier(3, timeout=5)
+
+    def run(plan):
+        # Only returns if all three commands are running at the same time.
+        barrier.wait()
+        return plan.text.upper()
+
+    plans = _plans(("a", None, False), ("b", None, False), ("c", None, False))
+    assert executor.run_level(plans, run) == ["A", "B", "C"]
+
+
+def test_single_worker_runs_inline():
+    executor = CommandExecutor(max_workers=1)
+    caller = threading.current_thread()
+    threads = executor.run_level(_plans(("a", None, False), ("b", None, False)), lambda _plan: threading.current_thread())
+    assert threads == [caller, caller]
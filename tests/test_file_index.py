@@ -0,0 +1,124 @@
+"""Tests for the persistent allowed-folder file index."""
+
+import os
+import time
+from pathlib import Path
+
+from personal_ai.files import index as file_index
+from personal_ai.files.index import FileIndex, FileIndexRegistry
+
+
+def _make_tree(root: Path) -> None:
+    (root / "projects" / "budget").mkdir(parents=True)
+    (root / "projects" / "budget" / "report.txt").write_text("q1", encoding="utf-8")
+    (root / "Report.txt").write_text("top", encoding="utf-8")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "report.txt").write_text("skip", encoding="utf-8")
+
+
+def test_find_prefers_shallow_matches_and_skips_vendor_dirs(tmp_path: Path) -> None:
+    root = tmp_path / "home"
+    _make_tree(root)
+    index = FileIndex(root, store_path=tmp_path / "index.json")
+    index.refresh()
+
+    assert index.find("report.txt") == [root / "Report.txt", root / "projects/budget/report.txt"]
+    assert index.find("budget/report.txt") == [root / "projects/budget/report.txt"]
+    assert index.find("*.txt")[0] == root / "Report.txt"
+    assert index.find("budget") == [root / "projects/budget"]
+
+
+def test_index_persists_and_refreshes_only_changed_dirs(tmp_path: Path) -> None:
+    root = tmp_path / "home"
+    _make_tree(root)
+    store = tmp_path / "index.json"
+    FileIndex(root, store_path=store).refresh()
+
+    warm = FileIndex(root, store_path=store)
+    assert warm.load()
+    assert warm.find("report.txt")
+    assert warm.refresh() is False
+
+    new_file = root / "projects" / "notes.md"
+    new_file.write_text("new", encoding="utf-8")
+    stat = os.stat(root / "projects")
+    os.utime(root / "projects", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert warm.refresh() is True
+    assert warm.find("notes.md") == [new_file]
+
+
+def test_fuzzy_find_tolerates_typos_and_missing_extensions(tmp_path: Path) -> None:
+    root = tmp_path / "home"
+    (root / "finance").mkdir(parents=True)
+    (root / "finance" / "Budget_Spreadsheet_2024.xlsx").write_text("", encoding="utf-8")
+    (root / "finance" / "receipts").mkdir()
+    (root / "holiday photos").mkdir()
+    index = FileIndex(root, store_path=tmp_path / "index.json")
+    index.refresh()
+
+    best_path, best_score = index.fuzzy_find("budjet spreadsheet")[0]
+    assert best_path == root / "finance" / "Budget_Spreadsheet_2024.xlsx"
+    assert 0.5 < best_score < 1.0
+
+    assert index.fuzzy_find("holiday fotos", k=1)[0][0] == root / "holiday photos"
+    assert index.fuzzy_find("receipts")[0] == (root / "finance" / "receipts", 1.0)
+
+
+def test_trigram_index_respects_entry_budget() -> None:
+    from personal_ai.files.fuzzy import TrigramIndex
+
+    fuzzy = TrigramIndex(max_entries=2)
+    fuzzy.build([("deep.txt", ["a/b/c/deep.txt"]), ("top.txt", ["top.txt"]), ("mid.txt", ["a/mid.txt"])])
+
+    assert len(fuzzy) == 2
+    assert fuzzy.search("deep") == []
+    assert fuzzy.search("top dot txt", k=1)[0][0] == "top.txt"
+
+
+def test_registry_get_builds_cold_roots_in_the_background(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_index, "INDEX_DIR", tmp_path / "file_index")
+    root = tmp_path / "home"
+    _make_tree(root)
+    registry = FileIndexRegistry()
+    refreshed = []
+    monkeypatch.setattr(FileIndex, "refresh", lambda self: refreshed.append(self.root) or True)
+    started = []
+    monkeypatch.setattr(registry, "refresh_in_background", started.extend)
+
+    index = registry.get(root)
+
+    assert not index.ready
+    assert index.find("report.txt") == []
+    assert refreshed == []
+    assert started == [root]
+
+
+def test_registry_refresh_in_background_walks_once(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_index, "INDEX_DIR", tmp_path / "file_index")
+    root = tmp_path / "home"
+    _make_tree(root)
+    registry = FileIndexRegistry()
+
+    registry.refresh_in_background([root])
+    deadline = time.monotonic() + 5
+    while not registry.get(root).ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert registry.get(root).find("report.txt")
+    assert registry.get(root).refresh() is False
+
+
+def test_registry_prune_deletes_indexes_of_dropped_roots(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(file_index, "INDEX_DIR", tmp_path / "file_index")
+    kept, dropped = tmp_path / "kept", tmp_path / "dropped"
+    _make_tree(kept)
+    _make_tree(dropped)
+    registry = FileIndexRegistry()
+    registry.refresh_all([kept, dropped])
+    assert len(list(file_index.INDEX_DIR.glob("*.json"))) == 2
+
+    assert registry.prune([kept]) == 1
+
+    assert [path.name for path in file_index.INDEX_DIR.glob("*.json")] == [registry.get(kept).store_path.name]
+    assert registry.get(kept).ready
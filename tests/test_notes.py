@@ -0,0 +1,131 @@
+"""Tests for the indexed notes store."""
+
+import os
+from pathlib import Path
+
+from personal_ai.notes.store import NotesStore
+
+
+def test_append_tail_and_search(tmp_path: Path) -> None:
+    store = NotesStore(tmp_path / "notes.txt")
+    for note in ["Buy milk", "Call mom about budget", "budget review friday", "Pay rent"]:
+        store.append(note)
+
+    assert store.tail(2) == ["budget review friday", "Pay rent"]
+    assert store.tail(10)[0] == "Buy milk"
+    assert store.search("budget") == ["Call mom about budget", "budget review friday"]
+    assert store.search("call mom") == ["Call mom about budget"]
+    assert store.search("bud") == ["Call mom about budget", "budget review friday"]
+    assert store.search("groceries") == []
+
+
+def test_reopen_uses_side_files_and_catches_up_external_appends(tmp_path: Path) -> None:
+    log = tmp_path / "notes.txt"
+    store = NotesStore(log)
+    store.append("first note")
+    store.flush()
+
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write("added by hand\n")
+
+    reopened = NotesStore(log)
+    assert len(reopened) == 2
+    assert reopened.search("hand") == ["added by hand"]
+    assert reopened.tail(1) == ["added by hand"]
+
+    reopened.append("third")
+    assert NotesStore(log).tail(3) == ["first note", "added by hand", "third"]
+
+
+def test_appends_leave_snapshot_to_close_and_catch_up_after_a_crash(tmp_path: Path) -> None:
+    log = tmp_path / "notes.txt"
+    store = NotesStore(log)
+    store.append("kept across restarts")
+    store.flush()
+    snapshot = store.terms_path.read_bytes()
+
+    for index in range(200):
+        store.append(f"note {index}")
+    assert store.terms_path.read_bytes() == snapshot
+
+    # No flush: the reopened store indexes the newer notes from the log.
+    reopened = NotesStore(log)
+    assert len(reopened) == 201
+    assert reopened.search("199") == ["note 199"]
+    assert reopened.terms_path.read_bytes() != snapshot
+
+
+def _edit_in_place(log: Path, old: str, new: str) -> None:
+    """Rewrite ``log`` as an editor would, moving its mtime even on coarse clocks."""
+    mtime = log.stat().st_mtime_ns
+    log.write_text(log.read_text(encoding="utf-8").replace(old, new), encoding="utf-8")
+    os.utime(log, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+
+
+def test_same_size_edit_mid_file_is_reindexed(tmp_path: Path) -> None:
+    log = tmp_path / "notes.txt"
+    store = NotesStore(log)
+    for note in ["first note", "meeting on tusday", "last note"]:
+        store.append(note)
+    store.flush()
+
+    _edit_in_place(log, "tusday", "monday")
+    assert [hit.note_id for hit in NotesStore(log).ranked_search("monday")] == [1]
+    assert NotesStore(log).search("tusday") == []
+    # A store that was already open notices the edit on its next read.
+    assert store.search("monday") == ["meeting on monday"]
+
+
+def test_longer_edit_and_append_is_reindexed(tmp_path: Path) -> None:
+    log = tmp_path / "notes.txt"
+    store = NotesStore(log)
+    for note in ["alpha", "beta", "gamma"]:
+        store.append(note)
+    store.flush()
+
+    _edit_in_place(log, "beta", "beta blocker")
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write("delta\n")
+
+    reopened = NotesStore(log)
+    assert reopened.search("blocker") == ["beta blocker"]
+    assert [hit.snippet for hit in reopened.ranked_search("gamma")] == ["gamma"]
+    assert reopened.tail(2) == ["gamma", "delta"]
+
+
+def test_replace_overwrites_notes_and_index(tmp_path: Path) -> None:
+    log = tmp_path / "notes.txt"
+    store = NotesStore(log)
+    store.append("old secret")
+    store.replace("fresh start")
+
+    assert log.read_text(encoding="utf-8") == "fresh start\n"
+    assert store.search("secret") == []
+    assert NotesStore(log).search("fresh") == ["fresh start"]
+
+
+def test_ranked_search_orders_by_bm25_and_persists_index(tmp_path: Path) -> None:
+    log = tmp_path / "notes.txt"
+    store = NotesStore(log)
+    store.append("budget meeting moved to friday")
+    store.append("groceries: milk, eggs, bread")
+    store.append("budget budget budget: finalize quarterly budget numbers")
+    store.append("call the bank about the mortgage")
+
+    hits = store.ranked_search("budget", k=2)
+    assert [hit.note_id for hit in hits] == [2, 0]
+    assert hits[0].score > hits[1].score
+    assert store.ranked_search("groc")[0].snippet == "groceries: milk, eggs, bread"
+
+    store.flush()
+    reopened = NotesStore(log)
+    assert [hit.note_id for hit in reopened.ranked_search("budget friday")][:1] == [0]
+
+
+def test_ranked_search_snippet_centres_long_notes(tmp_path: Path) -> None:
+    store = NotesStore(tmp_path / "notes.txt")
+    store.append("filler " * 30 + "remember the passport renewal form " + "filler " * 30)
+
+    snippet = store.ranked_search("passport")[0].snippet
+    assert "passport" in snippet
+    assert snippet.startswith("…") and snippet.endswith("…")
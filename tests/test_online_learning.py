@@ -0,0 +1,102 @@
+"""Tests for online incremental intent learning."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import collector, online
+
+_ROWS = {
+    "open_app": ["open chrome", "open youtube", "launch spotify", "start notepad"],
+    "time": ["what time is it", "tell me the time", "current time please"],
+    "joke": ["tell me a joke", "say something funny", "make me laugh"],
+    "search": ["search python tutorials", "look up the weather", "google best pizza"],
+}
+
+
+def _learner(tmp_path: Path) -> online.OnlineLearner:
+    data_path = tmp_path / "intents.csv"
+    lines = ["text,intent"] + [f"{text},{intent}" for intent, texts in _ROWS.items() for text in texts]
+    data_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return online.OnlineLearner(
+        checkpoint_path=tmp_path / "online.pkl",
+        data_path=data_path,
+        auto_data_path=tmp_path / "auto_intents.csv",
+    )
+
+
+def _top_intent(learner: online.OnlineLearner, text: str) -> str:
+    probs = learner.predict_proba([text])[0]
+    return learner.classes_[probs.argmax()]
+
+
+def test_bootstrap_checkpoints_and_reloads(tmp_path: Path) -> None:
+    learner = _learner(tmp_path)
+    learner.bootstrap()
+
+    assert (tmp_path / "online.pkl").exists()
+    assert _top_intent(learner, "open chrome") == "open_app"
+
+    reloaded = _learner(tmp_path)
+    reloaded.bootstrap()
+    assert list(reloaded.classes_) == list(learner.classes_)
+
+
+def test_logged_corrections_update_the_model(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(collector, "AUTO_DATA_PATH", tmp_path / "auto_intents.csv")
+    monkeypatch.setattr(collector, "_listeners", [])
+    learner = _learner(tmp_path)
+    learner.bootstrap()
+    collector.add_sample_listener(learner.submit)
+
+    phrase = "make me laugh zorblax"
+    for _ in range(8):
+        collector.log_sample(phrase, "joke", 1.0, source="corrected")
+    collector.log_sample("unknown thing", "not an intent", 1.0, source="corrected")
+
+    batch = [learner._samples.get_nowait() for _ in range(learner._samples.qsize())]
+    assert batch[0] == ("make me laugh zorblax", "joke", 5.0)
+    assert learner.update(batch) == 8
+    assert _top_intent(learner, phrase) == "joke"
+
+
+def test_log_sample_keeps_intent_identifiers(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(collector, "AUTO_DATA_PATH", tmp_path / "auto_intents.csv")
+    monkeypatch.setattr(collector, "_listeners", [])
+
+    collector.log_sample("Open Chrome!", "open app", 0.9)
+
+    rows = (tmp_path / "auto_intents.csv").read_text(encoding="utf-8").splitlines()
+    assert rows[0].startswith("text,intent")
+    assert rows[1].startswith("open chrome,open_app,0.9000,auto,")
+
+
+def test_close_applies_queued_samples_and_checkpoints(tmp_path: Path) -> None:
+    learner = _learner(tmp_path)
+    learner.bootstrap()
+    for _ in range(8):
+        learner.submit("make me laugh zorblax", "joke", 1.0, "corrected")
+
+    learner.close()
+
+    assert learner._samples.empty()
+    reloaded = _learner(tmp_path)
+    reloaded.bootstrap()
+    assert reloaded.model.updates == learner.model.updates
+    assert _top_intent(reloaded, "make me laugh zorblax") == "joke"
+
+
+def test_unsaved_updates_are_checkpointed_without_another_batch(tmp_path: Path, monkeypatch) -> None:
+    learner = _learner(tmp_path)
+    learner.bootstrap()
+    assert learner._checkpoint_wait() is None
+
+    learner.update([("make me laugh zorblax", "joke", 5.0)])
+    wait = learner._checkpoint_wait()
+    assert wait is not None and wait > 0
+    assert learner._next_batch(timeout=0.01) == []
+
+    learner._last_checkpoint -= online.SETTINGS.online_checkpoint_seconds
+    assert learner._checkpoint_wait() == 0.0
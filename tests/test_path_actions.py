@@ -1,8 +1,12 @@
 """Tests for opening/closing user file and folder paths."""
 
+import json
 from pathlib import Path
 
 from personal_ai.actions import app_actions
+from personal_ai.files import index as file_index
+from personal_ai.security import permissions
+from personal_ai.voice import tts
 
 
 def test_extract_path_query_prefers_quoted_path() -> None:
@@ -22,6 +26,10 @@ def test_resolve_target_path_from_allowed_folder(tmp_path: Path, monkeypatch) ->
     target.write_text("hello", encoding="utf-8")
 
     monkeypatch.setattr(app_actions, "load_permissions", lambda: {"allowed_apps": {}, "allowed_folders": [str(docs)]})
+    monkeypatch.setattr(file_index, "INDEX_DIR", tmp_path / "file_index")
+    registry = file_index.FileIndexRegistry()
+    monkeypatch.setattr(app_actions, "FILE_INDEXES", registry)
+    registry.refresh_all([docs])
 
     resolved = app_actions._resolve_target_path("report.txt")
 
@@ -33,11 +41,22 @@ def test_ensure_folder_permission_accepts_and_saves(tmp_path: Path, monkeypatch)
     target.parent.mkdir()
     target.write_text("todo", encoding="utf-8")
 
-    saved = {}
-    monkeypatch.setattr(app_actions, "load_permissions", lambda: {"allowed_apps": {}, "allowed_folders": []})
-    monkeypatch.setattr(app_actions, "save_permissions", lambda perms: saved.update(perms))
+    perm_file = tmp_path / "app_permissions.json"
+    warmed = []
+    monkeypatch.setattr(permissions, "PERM_FILE", perm_file)
     monkeypatch.setattr(app_actions, "listen_text", lambda: "yes")
-    monkeypatch.setattr(app_actions, "speak", lambda _msg: None)
-
+    spoken = []
+    monkeypatch.setattr(app_actions, "speak", lambda msg, priority=tts.PRIORITY_NORMAL: spoken.append((msg, priority)))
+    monkeypatch.setattr(file_index, "INDEX_DIR", tmp_path / "file_index")
+    registry = file_index.FileIndexRegistry()
+    monkeypatch.setattr(registry, "refresh_in_background", warmed.extend)
+    monkeypatch.setattr(app_actions, "FILE_INDEXES", registry)
+
+    assert not permissions.is_path_allowed(target)
     assert app_actions._ensure_folder_permission(target)
-    assert str(target.parent) in saved["allowed_folders"]
+    assert str(target.parent) in json.loads(perm_file.read_text(encoding="utf-8"))["allowed_folders"]
+    assert permissions.is_path_allowed(target)
+    assert warmed == [target.parent]
+    # The permission question is a prompt; the confirmation is an ordinary reply.
+    assert spoken[0][1] == tts.PRIORITY_PROMPT
+    assert spoken[-1] == ("Folder permission saved.", tts.PRIORITY_NORMAL)
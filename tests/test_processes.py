@@ -0,0 +1,70 @@
+"""Unit tests for the process registry and shell-free process lookup."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from personal_ai.actions.processes import ProcessRegistry, find_pids, kill_pid
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_reaper_forgets_exited_children():
+    registry = ProcessRegistry(reap_interval=0.05)
+    proc = registry.launch([sys.executable, "-c", "pass"], key="quick")
+
+    assert _wait_for(lambda: len(registry) == 0)
+    assert proc.returncode == 0
+    assert registry.get("quick") is None
+
+
+def test_terminate_tracked_process():
+    registry = ProcessRegistry(reap_interval=0.05)
+    proc = registry.launch(SLEEPER, key="app:sleeper")
+
+    assert registry.get("app:sleeper") is proc
+    assert registry.terminate("app:sleeper")
+    assert registry.get("app:sleeper") is None
+    assert _wait_for(lambda: proc.poll() is not None)
+    assert _wait_for(lambda: len(registry) == 0)
+    assert not registry.terminate("app:sleeper")
+
+
+def test_registry_is_bounded():
+    registry = ProcessRegistry(max_entries=2, reap_interval=60)
+    procs = [registry.launch(SLEEPER, key=f"p{index}") for index in range(3)]
+    try:
+        assert len(registry) == 2
+        assert registry.get("p0") is None
+        assert registry.get("p2") is procs[2]
+    finally:
+        for proc in procs:
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="needs /proc")
+def test_find_and_kill_by_executable_name():
+    proc = subprocess.Popen(SLEEPER)
+    try:
+        assert proc.pid in find_pids(Path(sys.executable).name)
+        assert proc.pid in find_pids(Path(sys.executable).name.upper() + ".exe")
+        assert kill_pid(proc.pid)
+        assert proc.wait(timeout=5) != 0
+    finally:
+        proc.kill()
+        proc.wait()
+    assert proc.pid not in find_pids(Path(sys.executable).name)
+    assert find_pids("definitely-not-running-here") == []
@@ -0,0 +1,63 @@
+"""Tests for the versioned model registry."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("joblib")
+
+from personal_ai.learning.registry import ModelRegistry
+
+
+def test_register_dedupes_identical_artifacts(tmp_path: Path) -> None:
+    registry = ModelRegistry(tmp_path)
+
+    first = registry.register({"weights": [1, 2, 3]}, metrics={"accuracy": 0.9})
+    again = registry.register({"weights": [1, 2, 3]})
+
+    assert again["version"] == first["version"] == 1
+    assert len(list(registry.artifacts_dir.iterdir())) == 1
+    assert registry.current_path() is None
+
+
+def test_activate_and_rollback_swap_the_pointer(tmp_path: Path) -> None:
+    registry = ModelRegistry(tmp_path)
+    one = registry.register({"model": 1})
+    two = registry.register({"model": 2})
+
+    registry.activate(one["version"])
+    registry.activate(two["sha256"][:10])
+    assert registry.current_sha() == two["sha256"]
+    assert registry.previous_path() == registry.artifact_path(one)
+
+    assert registry.rollback()["version"] == 1
+    assert registry.current_path() == registry.artifact_path(one)
+    with pytest.raises(LookupError):
+        registry.rollback()
+
+
+def test_prune_keeps_pinned_and_active_versions(tmp_path: Path) -> None:
+    registry = ModelRegistry(tmp_path)
+    entries = [registry.register({"model": index}) for index in range(5)]
+    registry.set_pinned(1, True)
+    registry.activate(2)
+
+    removed = registry.prune(keep=1)
+
+    assert sorted(entry["version"] for entry in removed) == [3, 4]
+    assert sorted(entry["version"] for entry in registry.versions()) == [1, 2, 5]
+    assert not registry.artifact_path(entries[2]).exists()
+    assert registry.current_sha() == entries[1]["sha256"]
+
+
+def test_register_file_adopts_an_existing_model(tmp_path: Path) -> None:
+    legacy = tmp_path / "intent_model.pkl"
+    legacy.write_bytes(b"legacy model")
+    registry = ModelRegistry(tmp_path / "registry")
+
+    entry = registry.register_file(legacy, source="legacy")
+    registry.activate(entry["version"])
+
+    assert registry.current_path().read_bytes() == b"legacy model"
+    with pytest.raises(LookupError):
+        registry.get("ffff")
@@ -0,0 +1,162 @@
+"""Unit tests for request cancellation and ordering."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from personal_ai.core.cancellation import CancelToken, RequestCancelled
+from personal_ai.core.request_queue import RequestQueue
+from personal_ai.llm import OpenAICompatibleProvider
+
+
+def test_cancel_token_runs_callbacks_once_and_tracks_deadline():
+    now = [100.0]
+    token = CancelToken(timeout_seconds=10, clock=lambda: now[0])
+    calls = []
+    token.on_cancel(lambda: calls.append("a"))
+    unregister = token.on_cancel(lambda: calls.append("b"))
+    unregister()
+
+    now[0] = 104.0
+    assert token.remaining(30) == pytest.approx(6.0)
+    assert token.remaining(2) == 2
+
+    token.cancel()
+    token.cancel()
+    assert calls == ["a"]
+    with pytest.raises(RequestCancelled):
+        token.raise_if_cancelled()
+    token.on_cancel(lambda: calls.append("late"))
+    assert calls == ["a", "late"]
+
+
+def test_cancel_if_interruptible_only_cancels_inside_interruptible_work():
+    token = CancelToken()
+    assert not token.cancel_if_interruptible()
+
+    with pytest.raises(RequestCancelled):
+        with token.interruptible():
+            assert token.cancel_if_interruptible()
+            # What the aborted call raises is replaced by the cancellation.
+            raise RuntimeError("connection reset")
+    assert not token.cancel_if_interruptible()
+
+
+def test_new_message_supersedes_request_waiting_on_llm():
+    queue = RequestQueue()
+    first = queue.submit("hello")
+    with pytest.raises(RequestCancelled):
+        with first.token.interruptible():
+            second = queue.submit("are you there?")
+
+    assert first.token.cancelled
+    assert second.text == "are you there?"
+    assert second.earlier == ("hello",)
+    assert second.request_id > first.request_id
+    assert queue.finish(first.request_id) == (False, None)
+    assert queue.finish(second.request_id) == (True, None)
+
+
+def test_request_past_its_llm_call_is_not_superseded():
+    # E.g. the LLM failed and the fallback is running the commands.
+    queue = RequestQueue()
+    first = queue.submit("open chrome")
+
+    assert queue.submit("search python") is None
+    assert not first.token.cancelled
+    with first.token.interruptible():
+        # A message is already waiting, so the next one queues behind it.
+        assert queue.submit("tell me the time") is None
+    assert not first.token.cancelled
+
+    deliver, following = queue.finish(first.request_id)
+    assert deliver and following.text == "search python" and following.earlier == ()
+    assert queue.finish(following.request_id)[1].text == "tell me the time"
+
+
+def test_answers_are_not_superseded_and_later_messages_queue_in_order():
+    queue = RequestQueue()
+    answer = queue.submit("buy milk")
+    answer.continuation = "token-1"
+
+    with answer.token.interruptible():
+        assert queue.submit("tell me a joke") is None
+    assert queue.submit("and the time") is None
+    assert not answer.token.cancelled
+
+    deliver, following = queue.finish(answer.request_id)
+    assert deliver
+    assert following.text == "tell me a joke"
+    assert queue.is_current(following.request_id)
+    assert queue.finish(following.request_id)[1].text == "and the time"
+
+
+def test_expire_cancels_and_starts_next():
+    queue = RequestQueue(timeout_seconds=5)
+    request = queue.submit("slow question")
+    request.continuation = "token-1"
+    queue.submit("next")
+
+    deliver, following = queue.expire(request.request_id)
+    assert deliver and request.token.cancelled
+    assert following.text == "next"
+    assert following.token.deadline is not None
+
+
+class _StallingHandler(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.paths.append(self.path)
+        self.server.received.set()
+        self.server.release.wait(5)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def stalling_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StallingHandler)
+    server.received = threading.Event()
+    server.paths = []
+    server.release = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_provider_call_is_aborted_by_cancel(stalling_server):
+    host, port = stalling_server.server_address
+    provider = OpenAICompatibleProvider(api_key="k", model="m", base_url=f"http://{host}:{port}/v1")
+    token = CancelToken()
+    threading.Thread(target=lambda: stalling_server.received.wait(5) and token.cancel(), daemon=True).start()
+
+    started = time.monotonic()
+    with pytest.raises(RequestCancelled):
+        provider.generate([{"role": "user", "content": "hi"}], cancel=token)
+    assert time.monotonic() - started < 3
+
+
+def test_provider_call_times_out_at_token_deadline(stalling_server):
+    host, port = stalling_server.server_address
+    provider = OpenAICompatibleProvider(api_key="k", model="m", base_url=f"http://{host}:{port}/v1")
+
+    with pytest.raises(RuntimeError, match="timed out"):
+        provider.generate([{"role": "user", "content": "hi"}], cancel=CancelToken(timeout_seconds=0.3))
+
+
+def test_provider_honours_http_proxy(stalling_server, monkeypatch):
+    host, port = stalling_server.server_address
+    for name in ("NO_PROXY", "no_proxy", "HTTPS_PROXY", "https_proxy", "http_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", f"http://{host}:{port}")
+    provider = OpenAICompatibleProvider(api_key="k", model="m", base_url="http://llm.invalid/v1")
+
+    with pytest.raises(RuntimeError, match="timed out"):
+        provider.generate([{"role": "user", "content": "hi"}], cancel=CancelToken(timeout_seconds=0.3))
+    assert stalling_server.paths == ["http://llm.invalid/v1/chat/completions"]
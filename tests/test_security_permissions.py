@@ -33,3 +33,41 @@ def test_blocked_exe_list_includes_powershell_variants():
     assert permissions.is_blocked_exe("powershell.exe")
     assert permissions.is_blocked_exe("pwsh.exe")
     assert permissions.is_blocked_exe("powershell_ise.exe")
+
+
+def test_load_permissions_reuses_cache_until_file_changes(tmp_path, monkeypatch):
+    fake_perm_file = tmp_path / "app_permissions.json"
+    fake_perm_file.write_text(json.dumps({"allowed_apps": {"chrome": "chrome.exe"}}), encoding="utf-8")
+    monkeypatch.setattr(permissions, "PERM_FILE", fake_perm_file)
+    monkeypatch.setattr(permissions, "_STAT_INTERVAL_SECONDS", 0.0)
+
+    reads = []
+    real_parse = permissions._parse_permissions
+    monkeypatch.setattr(permissions, "_parse_permissions", lambda path: reads.append(path) or real_parse(path))
+
+    assert permissions.load_permissions()["allowed_apps"] == {"chrome": "chrome.exe"}
+    assert permissions.load_permissions()["allowed_apps"] == {"chrome": "chrome.exe"}
+    assert len(reads) == 1
+
+    perms = permissions.load_permissions()
+    perms["allowed_apps"]["notepad"] = "notepad.exe"
+    permissions.save_permissions(perms)
+
+    assert permissions.allowed_apps() == {"chrome": "chrome.exe", "notepad": "notepad.exe"}
+    assert not fake_perm_file.with_name("app_permissions.json.tmp").exists()
+
+
+def test_is_path_allowed_uses_precomputed_roots(tmp_path, monkeypatch):
+    fake_perm_file = tmp_path / "app_permissions.json"
+    docs = tmp_path / "docs"
+    fake_perm_file.write_text(
+        json.dumps({"allowed_folders": [str(docs), str(docs / "nested"), str(tmp_path / "docs-archive")]}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(permissions, "PERM_FILE", fake_perm_file)
+
+    assert permissions.is_path_allowed((docs / "nested" / "a.txt").resolve())
+    assert permissions.is_path_allowed(docs.resolve())
+    assert permissions.is_path_allowed((tmp_path / "docs-archive" / "old.txt").resolve())
+    assert not permissions.is_path_allowed((tmp_path / "docsx" / "a.txt").resolve())
+    assert not permissions.is_path_allowed(tmp_path.resolve())
@@ -0,0 +1,78 @@
+"""Unit tests for the server-side chat session store."""
+
+from personal_ai.core.sessions import SessionStore, is_valid_session_id, new_session_id
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_history_keeps_last_turns_and_char_budget():
+    store = SessionStore(max_turns=2, max_chars=40)
+    for index in range(4):
+        store.record_turn("session-1", f"question {index}", f"answer {index}")
+
+    history = store.history("session-1")
+    assert [message["content"] for message in history] == ["question 2", "answer 2", "question 3", "answer 3"]
+
+    store.record_turn("session-1", "x" * 30, "y" * 5)
+    assert [message["content"] for message in store.history("session-1")] == ["x" * 30, "y" * 5]
+
+
+def test_history_is_a_copy():
+    store = SessionStore()
+    store.record_turn("session-1", "hi", "hello")
+    store.history("session-1")[0]["content"] = "changed"
+    assert store.history("session-1")[0]["content"] == "hi"
+
+
+def test_lru_session_is_spilled_and_reloaded(tmp_path):
+    store = SessionStore(max_sessions=2, spill_dir=tmp_path)
+    store.record_turn("session-a", "a", "A")
+    store.record_turn("session-b", "b", "B")
+    store.record_turn("session-c", "c", "C")
+
+    assert len(store) == 2
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    assert "session-a" not in str(list(tmp_path.iterdir()))
+
+    assert store.history("session-a") == [{"role": "user", "content": "a"}, {"role": "assistant", "content": "A"}]
+    # Reloading "a" pushed "b" out to disk in turn.
+    assert len(store) == 2
+    assert store.history("session-b")[1]["content"] == "B"
+
+
+def test_lru_session_is_dropped_without_spill():
+    store = SessionStore(max_sessions=1)
+    store.record_turn("session-a", "a", "A")
+    store.record_turn("session-b", "b", "B")
+    assert store.history("session-a") == []
+
+
+def test_idle_sessions_expire_in_memory_and_on_disk(tmp_path):
+    clock = FakeClock()
+    store = SessionStore(max_sessions=1, idle_seconds=60, spill_dir=tmp_path, clock=clock)
+    store.record_turn("session-a", "a", "A")
+    store.record_turn("session-b", "b", "B")
+
+    clock.now += 61
+    assert store.history("session-b") == []
+    assert store.history("session-a") == []
+    assert len(store) == 0
+
+
+def test_clear_forgets_session():
+    store = SessionStore()
+    store.record_turn("session-1", "hi", "hello")
+    store.clear("session-1")
+    assert store.history("session-1") == []
+
+
+def test_session_id_validation():
+    assert is_valid_session_id(new_session_id())
+    assert not is_valid_session_id("../../etc")
+    assert not is_valid_session_id("short")
@@ -0,0 +1,188 @@
+"""Tests for the retraining and promotion pipeline."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from personal_ai.learning import trainer
+
+
+@pytest.fixture
+def model_dir(tmp_path: Path, monkeypatch) -> Path:
+    models = tmp_path / "models"
+    monkeypatch.setattr(trainer, "AUTO_DATA_PATH", tmp_path / "auto_intents.csv")
+    monkeypatch.setattr(trainer, "MODEL_DIR", models)
+    monkeypatch.setattr(trainer, "LEGACY_MODEL", models / "intent_model.pkl")
+    monkeypatch.setattr(trainer, "METRICS_PATH", models / "model_metrics.json")
+    monkeypatch.setattr(trainer, "VERSION_PATH", models / "model_version.json")
+    return models
+
+
+def test_train_and_compare_promotes_first_model_without_reloading_it(model_dir: Path, monkeypatch) -> None:
+    loads = []
+    real_load = trainer.joblib.load
+    monkeypatch.setattr(trainer.joblib, "load", lambda path: loads.append(path) or real_load(path))
+
+    result = trainer.train_and_compare()
+
+    assert result["action"] == "promoted"
+    assert result["version"] == 1
+    assert loads == []
+    registry = trainer._registry()
+    version = json.loads(trainer.VERSION_PATH.read_text(encoding="utf-8"))
+    assert registry.current_path() == registry.root / version["model_file"]
+    assert [entry["version"] for entry in registry.versions()] == [1]
+    assert not list(registry.artifacts_dir.glob("*.tmp"))
+    metrics = json.loads(trainer.METRICS_PATH.read_text(encoding="utf-8"))
+    assert metrics["candidate_accuracy"] == result["candidate_accuracy"]
+
+
+def test_train_and_compare_keeps_incumbent_without_writing_candidate(model_dir: Path) -> None:
+    trainer.train_and_compare()
+    incumbent_sha = trainer._registry().current_sha()
+
+    result = trainer.train_and_compare()
+
+    assert result["action"] == "kept"
+    assert result["version"] == 1
+    registry = trainer._registry()
+    assert registry.current_sha() == incumbent_sha
+    assert len(registry.versions()) == 1
+
+
+def test_search_reports_every_config_and_trains_best(model_dir: Path) -> None:
+    from personal_ai.learning.tuning import SearchSpace
+
+    space = SearchSpace(word_ngram_ranges=((1, 2),), char_ngram_ranges=((3, 4), (3, 5)), C=(1.0, 4.0), max_workers=2)
+
+    result = trainer.train_and_compare(search=space)
+
+    assert len(result["search"]) == 4
+    best = result["search"][0]
+    assert best["f1_macro"] == max(row["f1_macro"] for row in result["search"])
+    assert set(best["latency_ms"]) == {"single_p50", "single_p99", "batch_p50", "batch_p99", "batch_per_item"}
+    assert result["candidate_config"]["C"] == best["C"]
+    assert result["candidate_config"]["char_ngram_range"] == best["char_ngram_range"]
+
+
+def test_feature_cache_matches_plain_fit_and_reuses_rows(model_dir: Path) -> None:
+    import numpy as np
+
+    from personal_ai.learning.feature_cache import FeatureCache
+
+    config = trainer.DEFAULT_MODEL_CONFIG
+    cache = FeatureCache(config.features, model_dir / "feature_cache")
+    df = trainer._load_dataset()
+    df["key"] = cache.index(df["text"].tolist())
+    split = trainer._split_dataset(df)
+    cached_model, X_test = trainer._fit_candidate_cached(df, split, cache, config)
+    plain_model = trainer._fit_candidate(split, config)
+
+    np.testing.assert_allclose(
+        cached_model.predict_proba(split.X_test), plain_model.predict_proba(split.X_test), atol=1e-8
+    )
+    np.testing.assert_allclose(
+        cached_model.named_steps["clf"].predict_proba(X_test), plain_model.predict_proba(split.X_test), atol=1e-8
+    )
+    assert cache.misses == df["text"].nunique()
+
+    cache.save()
+    reloaded = FeatureCache(config.features, model_dir / "feature_cache").load()
+    reloaded.index(df["text"].tolist())
+    assert reloaded.misses == 0
+    assert reloaded.hits == len(df)
+
+
+def _synthetic_texts(rows: int, seed: int = 0) -> list:
+    import random
+
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(500)]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(3, 8))) for _ in range(rows)]
+
+
+def test_feature_cache_appends_new_rows_and_compacts_dropped_ones(tmp_path: Path) -> None:
+    import numpy as np
+
+    from personal_ai.learning.feature_cache import FeatureCache
+
+    config = trainer.DEFAULT_MODEL_CONFIG.features
+    first, later = _synthetic_texts(300, seed=1), _synthetic_texts(100, seed=2)
+    cache = FeatureCache(config, tmp_path)
+    cache.index(first)
+    cache.save()
+
+    # Later rows arrive and some earlier ones leave the corpus.
+    texts = first[50:] + later
+    warm = FeatureCache(config, tmp_path).load()
+    _features, X = warm.fit_features(warm.index(texts))
+    assert warm.misses == len(set(later) - set(first))
+    plain = trainer._build_features(config)
+    np.testing.assert_allclose(X.toarray(), plain.fit_transform(texts).toarray(), atol=1e-12)
+    for (_name, cached), (_plain_name, expected) in zip(_features.transformer_list, plain.transformer_list):
+        assert cached.vocabulary_ == expected.vocabulary_
+
+    warm.save()
+    assert len(json.loads((warm.path / "manifest.json").read_text(encoding="utf-8"))["blocks"]) == 1
+    reloaded = FeatureCache(config, tmp_path).load()
+    _features, X_reloaded = reloaded.fit_features(reloaded.index(texts))
+    assert reloaded.misses == 0
+    np.testing.assert_allclose(X_reloaded.toarray(), X.toarray())
+
+
+def test_warm_feature_cache_tokenizes_only_new_rows(tmp_path: Path, monkeypatch) -> None:
+    from personal_ai.learning import feature_cache
+
+    counted = []
+
+    class CountingVectorizer(feature_cache.CountVectorizer):
+        def fit_transform(self, raw_documents, y=None):
+            counted.append(len(raw_documents))
+            return super().fit_transform(raw_documents, y)
+
+    monkeypatch.setattr(feature_cache, "CountVectorizer", CountingVectorizer)
+    config = trainer.DEFAULT_MODEL_CONFIG.features
+    vectorizers = len(trainer._build_features(config).transformer_list)
+    texts = _synthetic_texts(400)
+    cold = feature_cache.FeatureCache(config, tmp_path)
+    cold.fit_features(cold.index(texts))
+    cold.save()
+    assert counted == [len(set(texts))] * vectorizers
+
+    counted.clear()
+    warm = feature_cache.FeatureCache(config, tmp_path).load()
+    warm.fit_features(warm.index(texts))
+    assert counted == [] and warm.misses == 0
+
+    added = [text for text in _synthetic_texts(20, seed=3) if text not in set(texts)]
+    warm.fit_features(warm.index(texts + added))
+    assert counted == [len(set(added))] * vectorizers
+
+
+def test_promotion_rejected_when_budget_exceeded(model_dir: Path, monkeypatch) -> None:
+    import dataclasses
+
+    monkeypatch.setattr(trainer, "SETTINGS", dataclasses.replace(trainer.SETTINGS, promotion_max_size_mb=0.001))
+
+    result = trainer.train_and_compare()
+
+    assert result["action"] == "rejected"
+    assert result["version"] == 0
+    assert trainer._current_model_path() is None
+    benchmark = json.loads(trainer.METRICS_PATH.read_text(encoding="utf-8"))["benchmark"]
+    assert benchmark["violations"] and benchmark["violations"][0].startswith("size_mb=")
+    assert set(benchmark["candidate"]) == {"size_mb", "load_seconds", "memory_mb", "latency_ms"}
+    assert benchmark["candidate"]["latency_ms"]["single_p99"] > 0
+
+
+def test_unchanged_data_fingerprint_skips_training(model_dir: Path) -> None:
+    first = trainer.train_and_compare()
+
+    result = trainer.train_and_compare(previous_fingerprint=first["data_fingerprint"])
+
+    assert result["action"] == "skipped"
+    assert result["data_fingerprint"] == first["data_fingerprint"]
+    assert len(trainer._registry().versions()) == 1
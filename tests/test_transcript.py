@@ -0,0 +1,69 @@
+"""Unit tests for the paged chat transcript."""
+
+from personal_ai.core.transcript import Transcript
+
+
+def _texts(transcript):
+    return [message.text for message in transcript.messages]
+
+
+def test_window_is_capped_and_rest_stays_on_disk(tmp_path):
+    transcript = Transcript(tmp_path / "chat.jsonl", max_messages=3)
+    for index in range(10):
+        transcript.append("You", f"m{index}")
+        transcript.drop_oldest(transcript.overflow)
+
+    assert len(transcript) == 10
+    assert _texts(transcript) == ["m7", "m8", "m9"]
+    assert transcript.start == 7 and transcript.at_end
+
+
+def test_load_older_and_newer_page_through_history(tmp_path):
+    transcript = Transcript(tmp_path / "chat.jsonl", max_messages=3)
+    for index in range(10):
+        transcript.append("You", f"m{index}")
+    transcript.jump_to_end()
+
+    assert transcript.load_older(2) == 2
+    transcript.drop_newest(transcript.overflow)
+    assert _texts(transcript) == ["m5", "m6", "m7"]
+    assert not transcript.at_end
+
+    # Appending while scrolled back writes to disk without disturbing the window.
+    transcript.append("Assistant", "m10")
+    assert _texts(transcript) == ["m5", "m6", "m7"]
+
+    assert transcript.load_newer(5) == 3
+    transcript.drop_oldest(transcript.overflow)
+    assert _texts(transcript) == ["m8", "m9", "m10"]
+    assert transcript.messages[-1].role == "Assistant"
+    assert transcript.load_newer(5) == 0
+
+
+def test_reopen_indexes_file_and_drops_torn_line(tmp_path):
+    path = tmp_path / "chat.jsonl"
+    transcript = Transcript(path, max_messages=2)
+    for index in range(4):
+        transcript.append("You", f"m{index}")
+    with path.open("ab") as handle:
+        handle.write(b'{"role": "You", "te')
+
+    reopened = Transcript(path, max_messages=2)
+    assert len(reopened) == 4
+    assert _texts(reopened) == ["m2", "m3"]
+    reopened.append("You", "m4")
+    assert reopened.load_older(10) == 2
+    assert _texts(reopened) == ["m0", "m1", "m2", "m3", "m4"]
+
+
+def test_unicode_line_separators_stay_inside_one_message(tmp_path):
+    path = tmp_path / "chat.jsonl"
+    transcript = Transcript(path, max_messages=2)
+    texts = ["m0", "m1\u2028x", "m2\u2029y", "m3\x85z", "m4"]
+    for text in texts:
+        transcript.append("You", text)
+    transcript.jump_to_end()
+
+    assert transcript.load_older(3) == 3
+    assert _texts(transcript) == texts
+    assert Transcript(path, max_messages=5).messages[1].text == "m1\u2028x"
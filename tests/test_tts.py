@@ -0,0 +1,183 @@
+"""Tests for the background speech worker."""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from personal_ai.voice.phrase_cache import PhraseCache
+from personal_ai.voice.tts import PRIORITY_NORMAL, PRIORITY_REMINDER, SpeechWorker
+
+
+class StubEngine:
+    """Speaks one word every ``word_seconds`` and honours ``stop()`` from the word callback."""
+
+    instances = 0
+
+    def __init__(self, word_seconds: float = 0.01) -> None:
+        StubEngine.instances += 1
+        self.word_seconds = word_seconds
+        self.callbacks = []
+        self.queued = []
+        self.files = []
+        self.spoken = []
+        self.stopped = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def connect(self, topic, callback):
+        assert topic == "started-word"
+        self.callbacks.append(callback)
+
+    def say(self, text):
+        self.queued.append(text)
+
+    def save_to_file(self, text, path):
+        self.files.append((text, path))
+
+    def getProperty(self, name):
+        return {"voice": "stub-voice", "rate": 200}[name]
+
+    def stop(self):
+        self.stopped = True
+
+    def runAndWait(self):
+        self.gate.wait(2)
+        for text in self.queued:
+            words = []
+            for word in text.split():
+                for callback in self.callbacks:
+                    callback(text, 0, len(word))
+                if self.stopped:
+                    break
+                words.append(word)
+                time.sleep(self.word_seconds)
+            self.spoken.append(" ".join(words))
+        self.queued.clear()
+        for text, path in self.files:
+            Path(path).write_bytes(b"RIFF" + text.encode("utf-8") * 10)
+        self.files.clear()
+        self.stopped = False
+
+
+class StubPlayer:
+    def __init__(self) -> None:
+        self.played = []
+
+    def play(self, path):
+        self.played.append(Path(path).read_bytes())
+        return True
+
+    def stop(self):
+        pass
+
+
+def test_say_returns_immediately_and_engine_is_reused() -> None:
+    StubEngine.instances = 0
+    engine = StubEngine()
+    engine.gate.clear()
+    worker = SpeechWorker(engine_factory=lambda: engine)
+
+    started = time.perf_counter()
+    worker.say("first phrase")
+    worker.say("second phrase")
+    assert time.perf_counter() - started < 0.5
+    assert not worker.wait_idle(timeout=0.05)
+
+    engine.gate.set()
+    assert worker.wait_idle(timeout=2)
+    assert engine.spoken == ["first phrase", "second phrase"]
+    assert StubEngine.instances == 1
+    worker.close(timeout=1)
+
+
+def test_reminder_preempts_chatter_and_jumps_the_queue() -> None:
+    engine = StubEngine(word_seconds=0.02)
+    worker = SpeechWorker(engine_factory=lambda: engine)
+
+    worker.say(" ".join(["chatter"] * 50), PRIORITY_NORMAL)
+    worker.say("more chatter", PRIORITY_NORMAL)
+    time.sleep(0.1)
+    worker.say("reminder call mom", PRIORITY_REMINDER)
+    assert worker.wait_idle(timeout=3)
+
+    assert len(engine.spoken[0].split()) < 50
+    assert engine.spoken[1:] == ["reminder call mom", "more chatter"]
+    worker.close(timeout=1)
+
+
+def test_interrupt_drops_queue_and_broken_engine_falls_back() -> None:
+    engine = StubEngine(word_seconds=0.02)
+    worker = SpeechWorker(engine_factory=lambda: engine)
+    worker.say(" ".join(["long"] * 50))
+    worker.say("never spoken")
+    time.sleep(0.1)
+    worker.interrupt()
+    assert worker.wait_idle(timeout=2)
+    assert "never spoken" not in engine.spoken
+    worker.close(timeout=1)
+
+    printed = []
+
+    def broken():
+        raise RuntimeError("no audio device")
+
+    fallback_worker = SpeechWorker(engine_factory=broken, fallback=printed.append)
+    fallback_worker.say("Saved.")
+    assert fallback_worker.wait_idle(timeout=2)
+    assert printed == ["Saved."]
+    fallback_worker.close(timeout=1)
+
+
+def test_cached_phrases_are_played_instead_of_synthesized(tmp_path: Path) -> None:
+    engine, player = StubEngine(word_seconds=0), StubPlayer()
+    cache = PhraseCache(tmp_path, max_bytes=10_000, min_uses=2)
+    worker = SpeechWorker(engine_factory=lambda: engine, phrase_cache=cache, player=player)
+
+    worker.prerender(["Saved."])
+    time.sleep(0.1)
+    for _ in range(3):
+        worker.say("Saved.")
+        worker.say("Opening chrome.")
+        assert worker.wait_idle(timeout=2)
+        time.sleep(0.05)
+
+    assert engine.spoken == ["Opening chrome.", "Opening chrome."]
+    assert player.played == [b"RIFF" + b"Saved." * 10] * 3 + [b"RIFF" + b"Opening chrome." * 10]
+    assert cache.lookup("Saved.", "other-voice", 200) is None
+    worker.close(timeout=1)
+
+
+def test_phrase_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = PhraseCache(tmp_path, max_bytes=250)
+    for index, text in enumerate(["one", "two", "three"]):
+        incoming = cache.incoming_path(text, "voice", 200)
+        incoming.write_bytes(b"x" * 100)
+        path = cache.store(incoming, text, "voice", 200)
+        os.utime(path, (1000 + index, 1000 + index))
+        if text == "two":
+            os.utime(cache.lookup("one", "voice", 200), (2000, 2000))
+
+    assert cache.lookup("two", "voice", 200) is None
+    assert cache.lookup("one", "voice", 200) is not None
+    assert cache.lookup("three", "voice", 200) is not None
+    assert cache.size_bytes() == 200
+
+
+def test_interrupt_keeps_reminders_queued_and_speaking() -> None:
+    engine = StubEngine(word_seconds=0.02)
+    worker = SpeechWorker(engine_factory=lambda: engine)
+    reminder = "Reminder: " + " ".join(["call mom"] * 10)
+    worker.say(" ".join(["reply"] * 50))
+    time.sleep(0.1)
+    worker.say("stale reply")
+    worker.say(reminder, priority=PRIORITY_REMINDER)
+    time.sleep(0.1)
+    worker.say("Reminder: pay rent", priority=PRIORITY_REMINDER)
+    # The user types while the first reminder is being spoken.
+    worker.interrupt()
+
+    assert worker.wait_idle(timeout=3)
+    assert engine.spoken[-2:] == [reminder, "Reminder: pay rent"]
+    assert "stale reply" not in engine.spoken
+    worker.close(timeout=1)
@@ -2,6 +2,9 @@
 
 This UI is intentionally isolated from backend internals except for the
 `handle_input` function exposed by the assistant core.
+
+The transcript is a ``QListView`` over a bounded window of messages; the
+full conversation is kept on disk and paged in when scrolling back.
 """
 
 from __future__ import annotations
@@ -11,31 +14,47 @@ import traceback
 from dataclasses import dataclass
 from typing import Any, Dict
 
-from PySide6.QtCore import QObject, QRunnable, Qt, QThreadPool, Signal
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, QRect, QRunnable, QSize, Qt, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QFont, QFontMetrics, QPalette
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QApplication,
     QHBoxLayout,
     QLineEdit,
+    QListView,
     QMainWindow,
     QMessageBox,
     QPushButton,
-    QScrollArea,
     QSizePolicy,
     QStatusBar,
-    QTextEdit,
+    QStyle,
+    QStyledItemDelegate,
     QVBoxLayout,
     QWidget,
 )
 
 from personal_ai.core.assistant import MODE, handle_chat_input, model
+from personal_ai.core.cancellation import RequestCancelled
+from personal_ai.core.config import SETTINGS
+from personal_ai.core.request_queue import PendingRequest, RequestQueue
+from personal_ai.core.sessions import new_session_id
+from personal_ai.core.transcript import TRANSCRIPT_DIR, Transcript, TranscriptMessage
+
+# Messages loaded from disk per scroll past either end of the list.
+PAGE_SIZE = 100
+MESSAGE_PADDING = 6
+# Extra wait past the request deadline for the backend's own timeout fallback to answer.
+TIMEOUT_GRACE_MS = 3000
 
 
 @dataclass
 class WorkerResult:
     """Container for worker execution result."""
 
+    request_id: int
     payload: Dict[str, Any] | None = None
     error: str | None = None
+    cancelled: bool = False
 
 
 class WorkerSignals(QObject):
@@ -47,18 +66,146 @@ class WorkerSignals(QObject):
 class AskWorker(QRunnable):
     """Background worker to avoid blocking the UI thread."""
 
-    def __init__(self, text: str, history: list[dict[str, str]]) -> None:
+    def __init__(self, request: PendingRequest, session_id: str) -> None:
         super().__init__()
-        self._text = text
-        self._history = history
+        self._request = request
+        self._session_id = session_id
         self.signals = WorkerSignals()
 
     def run(self) -> None:
+        request = self._request
         try:
-            response = handle_chat_input(self._text, history=self._history)
-            self.signals.completed.emit(WorkerResult(payload=response))
+            response = handle_chat_input(
+                request.text,
+                continuation=request.continuation,
+                session_id=self._session_id,
+                cancel=request.token,
+                earlier=request.earlier,
+            )
+            self.signals.completed.emit(WorkerResult(request.request_id, payload=response))
+        except RequestCancelled:
+            self.signals.completed.emit(WorkerResult(request.request_id, cancelled=True))
         except Exception:  # noqa: BLE001
-            self.signals.completed.emit(WorkerResult(error=traceback.format_exc()))
+            self.signals.completed.emit(WorkerResult(request.request_id, error=traceback.format_exc()))
+
+
+class ChatModel(QAbstractListModel):
+    """List model over a :class:`Transcript` window; only the window is ever in memory."""
+
+    def __init__(self, transcript: Transcript, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.transcript = transcript
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self.transcript.messages)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        message = self.transcript.messages[index.row()]
+        if role == Qt.UserRole:
+            return message
+        if role == Qt.DisplayRole:
+            return f"{message.role}: {message.text}"
+        return None
+
+    def append(self, role: str, text: str) -> None:
+        transcript = self.transcript
+        if not transcript.at_end:
+            # Scrolled back into history: show the latest page again before adding.
+            self.beginResetModel()
+            transcript.jump_to_end()
+            self.endResetModel()
+        row = len(transcript.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        transcript.append(role, text)
+        self.endInsertRows()
+        overflow = transcript.overflow
+        if overflow:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            transcript.drop_oldest(overflow)
+            self.endRemoveRows()
+
+    def load_older(self) -> int:
+        """Prepend a page from disk and drop as many of the newest rows; returns rows added."""
+        transcript = self.transcript
+        count = min(PAGE_SIZE, transcript.older_available)
+        if count:
+            self.beginInsertRows(QModelIndex(), 0, count - 1)
+            transcript.load_older(count)
+            self.endInsertRows()
+            overflow = transcript.overflow
+            if overflow:
+                rows = len(transcript.messages)
+                self.beginRemoveRows(QModelIndex(), rows - overflow, rows - 1)
+                transcript.drop_newest(overflow)
+                self.endRemoveRows()
+        return count
+
+    def load_newer(self) -> int:
+        """Append a page from disk and drop as many of the oldest rows; returns rows added."""
+        transcript = self.transcript
+        count = min(PAGE_SIZE, transcript.newer_available)
+        if not count:
+            return 0
+        row = len(transcript.messages)
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        transcript.load_newer(count)
+        self.endInsertRows()
+        overflow = transcript.overflow
+        if overflow:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            transcript.drop_oldest(overflow)
+            self.endRemoveRows()
+        return count
+
+
+class MessageDelegate(QStyledItemDelegate):
+    """Paints a bold role line above the word-wrapped message text."""
+
+    def __init__(self, view: QListView) -> None:
+        super().__init__(view)
+        self._view = view
+
+    def _text_width(self) -> int:
+        return max(50, self._view.viewport().width() - 2 * MESSAGE_PADDING)
+
+    @staticmethod
+    def _fonts(base: QFont) -> tuple[QFont, QFont]:
+        header = QFont(base)
+        header.setBold(True)
+        return header, QFont(base)
+
+    def sizeHint(self, option: Any, index: QModelIndex) -> QSize:
+        message: TranscriptMessage = index.data(Qt.UserRole)
+        header_font, body_font = self._fonts(option.font)
+        width = self._text_width()
+        header_height = QFontMetrics(header_font).height()
+        body = QFontMetrics(body_font).boundingRect(QRect(0, 0, width, 0), Qt.TextWordWrap, message.text)
+        return QSize(width, header_height + body.height() + 2 * MESSAGE_PADDING)
+
+    def paint(self, painter: Any, option: Any, index: QModelIndex) -> None:
+        message: TranscriptMessage = index.data(Qt.UserRole)
+        header_font, body_font = self._fonts(option.font)
+        palette = option.palette
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, palette.highlight())
+            color = palette.color(QPalette.HighlightedText)
+        elif message.role == "System":
+            color = palette.color(QPalette.PlaceholderText)
+        else:
+            color = palette.color(QPalette.Text)
+        painter.setPen(color)
+
+        rect = option.rect.adjusted(MESSAGE_PADDING, MESSAGE_PADDING, -MESSAGE_PADDING, -MESSAGE_PADDING)
+        header_height = QFontMetrics(header_font).height()
+        painter.setFont(header_font)
+        painter.drawText(QRect(rect.left(), rect.top(), rect.width(), header_height), Qt.AlignLeft, message.role)
+        painter.setFont(body_font)
+        body_rect = rect.adjusted(0, header_height, 0, 0)
+        painter.drawText(body_rect, Qt.AlignLeft | Qt.TextWordWrap, message.text)
+        painter.restore()
 
 
 class MainWindow(QMainWindow):
@@ -70,21 +217,29 @@ class MainWindow(QMainWindow):
         self.resize(900, 600)
 
         self._thread_pool = QThreadPool.globalInstance()
-        self.chat_history: list[dict[str, str]] = []
-        self._last_user_message = ""
+        # Chat history is kept by the backend's session store; only new messages are sent.
+        self.session_id = new_session_id()
+        # Set while the assistant waits for an answer to its question.
+        self._continuation: str | None = None
+        # One request in flight at a time; rapid sends supersede it or queue behind it.
+        self._requests = RequestQueue(timeout_seconds=SETTINGS.desktop_request_timeout_seconds)
 
         root = QWidget(self)
         layout = QVBoxLayout(root)
 
-        self.chat_output = QTextEdit(self)
-        self.chat_output.setReadOnly(True)
-        self.chat_output.setPlaceholderText("Assistant conversation will appear here...")
+        # The whole session is written to disk; the list holds at most TRANSCRIPT_MAX_MESSAGES of it.
+        transcript = Transcript(TRANSCRIPT_DIR / f"{self.session_id}.jsonl", SETTINGS.transcript_max_messages)
+        self.chat_model = ChatModel(transcript, self)
+        self.chat_output = QListView(self)
+        self.chat_output.setModel(self.chat_model)
+        self.chat_output.setItemDelegate(MessageDelegate(self.chat_output))
+        self.chat_output.setSelectionMode(QAbstractItemView.NoSelection)
+        self.chat_output.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.chat_output.setResizeMode(QListView.Adjust)
+        self.chat_output.setWordWrap(True)
         self.chat_output.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-
-        self.output_scroll = QScrollArea(self)
-        self.output_scroll.setWidgetResizable(True)
-        self.output_scroll.setWidget(self.chat_output)
-        layout.addWidget(self.output_scroll)
+        self.chat_output.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        layout.addWidget(self.chat_output)
 
         input_row = QHBoxLayout()
         self.chat_input = QLineEdit(self)
@@ -106,14 +261,27 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(root)
 
         status = QStatusBar(self)
-        status.showMessage(f"Mode: {MODE.upper()} | Model loaded: {'Yes' if model is not None else 'No'}")
+        status.showMessage(self._status_text())
         self.setStatusBar(status)
 
     def append_message(self, role: str, message: str) -> None:
-        """Append a chat message in a simple chat-like transcript."""
-        safe = message.replace("\n", "<br>")
-        self.chat_output.append(f"<b>{role}:</b> {safe}")
-        self.chat_output.verticalScrollBar().setValue(self.chat_output.verticalScrollBar().maximum())
+        """Append a chat message to the transcript and scroll to it."""
+        self.chat_model.append(role, message)
+        self.chat_output.scrollToBottom()
+
+    def _on_scrolled(self, value: int) -> None:
+        """Page older or newer messages in from disk at either end of the list."""
+        scroll_bar = self.chat_output.verticalScrollBar()
+        if value == scroll_bar.minimum():
+            added = self.chat_model.load_older()
+            if added:
+                # Keep the message that was at the top in place.
+                self.chat_output.scrollTo(self.chat_model.index(added, 0), QAbstractItemView.PositionAtTop)
+        elif value == scroll_bar.maximum():
+            added = self.chat_model.load_newer()
+            if added:
+                previous_last = self.chat_model.rowCount() - added - 1
+                self.chat_output.scrollTo(self.chat_model.index(previous_last, 0), QAbstractItemView.PositionAtBottom)
 
     def send_message(self) -> None:
         """Read input and dispatch worker task."""
@@ -123,21 +291,52 @@ class MainWindow(QMainWindow):
 
         self.chat_input.clear()
         self.append_message("You", text)
-        self._last_user_message = text
 
-        self.send_button.setEnabled(False)
-        self.chat_input.setEnabled(False)
+        request = self._requests.submit(text)
+        if request is not None:
+            self._start_request(request)
 
-        worker = AskWorker(text, history=list(self.chat_history))
+    def _start_request(self, request: PendingRequest) -> None:
+        # The answer to a pending question is bound when the request starts, not when it was typed.
+        request.continuation, self._continuation = self._continuation, None
+        worker = AskWorker(request, session_id=self.session_id)
         worker.signals.completed.connect(self._on_worker_completed)
         self._thread_pool.start(worker)
+        timeout_ms = SETTINGS.desktop_request_timeout_seconds * 1000 + TIMEOUT_GRACE_MS
+        QTimer.singleShot(timeout_ms, self, lambda: self._on_request_timeout(request.request_id))
+        self.statusBar().showMessage("Thinking...")
+
+    def _on_request_timeout(self, request_id: int) -> None:
+        deliver, next_request = self._requests.expire(request_id)
+        if not deliver:
+            return
+        self.append_message("Assistant", "Sorry, that took too long. Please try again.")
+        self._after_request(next_request)
+
+    def _after_request(self, next_request: PendingRequest | None) -> None:
+        if next_request is not None:
+            self._start_request(next_request)
+        else:
+            self.statusBar().showMessage(self._status_text())
+
+    def _status_text(self) -> str:
+        return f"Mode: {MODE.upper()} | Model loaded: {'Yes' if model is not None else 'No'}"
+
+    def closeEvent(self, event: Any) -> None:  # noqa: N802
+        self._requests.cancel_all()
+        super().closeEvent(event)
 
     def _on_worker_completed(self, result: WorkerResult) -> None:
         """Handle background response and update transcript safely."""
-        self.send_button.setEnabled(True)
-        self.chat_input.setEnabled(True)
-        self.chat_input.setFocus(Qt.OtherFocusReason)
+        deliver, next_request = self._requests.finish(result.request_id)
+        if not deliver:
+            # Superseded or timed out; whatever replaced it is already running.
+            return
+        if not result.cancelled:
+            self._deliver(result)
+        self._after_request(next_request)
 
+    def _deliver(self, result: WorkerResult) -> None:
         if result.error:
             self.append_message("Assistant", "Sorry, something went wrong while processing your message.")
             QMessageBox.warning(self, "Processing error", "The assistant failed to process your request.")
@@ -145,11 +344,9 @@ class MainWindow(QMainWindow):
             return
 
         payload = result.payload or {}
+        self._continuation = payload.get("continuation")
         reply = payload.get("reply", "Done.")
         self.append_message("Assistant", str(reply))
-        if self._last_user_message:
-            self.chat_history.append({"role": "user", "content": self._last_user_message})
-        self.chat_history.append({"role": "assistant", "content": str(reply)})
 
         commands = payload.get("commands", [])
         if commands: